@@ -1,68 +1,120 @@
 # AI_Trainer.py
 
 import numpy as np
-from sklearn.neural_network import MLPClassifier
-from sklearn.preprocessing import StandardScaler
 from A_Star_Pathfinder import d, get_path
 import random
-import pygame
-from Mapa import MAP_DATA, MURO, BLOQUE
+from Mapa import MAP_DATA
+from Grid import build_occupancy_grid, flat_view, LIBRE
+from Flow_Field import bfs_distances, UNREACHABLE
+from Model_Cache import training_cache_key
 
+# Etiqueta y desplazamiento (fila, columna) de cada dirección, en el orden en que se desempatan
+# los primeros pasos igual de cortos en el modo por lotes
+DIRECTIONS = ((0, -1, 0),  # Arriba
+              (1, 1, 0),  # Abajo
+              (2, 0, 1),  # Derecha
+              (3, 0, -1))  # Izquierda
 
-def generate_training_data(num_samples, map_walls, tile_size, screen_width, screen_height, max_retries_per_sample=10):
+
+class _TrainerSettings:
+    """Lo mínimo de Settings que necesita get_path para generar las muestras."""
+
+    def __init__(self, tile_size, width, height):
+        self.tile_size = tile_size
+        self.screen_width = width
+        self.screen_height = height
+
+
+class _TrainerGame:
+    def __init__(self, tile_size, width, height):
+        self.settings = _TrainerSettings(tile_size, width, height)
+
+
+# sklearn se importa dentro de las funciones que lo usan: tarda más de un segundo en cargar y el
+# juego solo lo necesita al entrenar (o al cargar un modelo guardado), no para abrir la ventana.
+
+def create_model():
+    """Crea el clasificador (sin entrenar) que usan todas las IAs."""
+    from sklearn.neural_network import MLPClassifier
+    return MLPClassifier(hidden_layer_sizes=(64, 32), max_iter=2000, activation='relu', solver='adam', random_state=1)
+
+
+def scale_training_data(X, y):
+    """
+    Ajusta un StandardScaler a las muestras y las escala.
+
+    Returns:
+        tuple: (X escalado, y, StandardScaler); arreglos vacíos si no hay muestras.
+    """
+    from sklearn.preprocessing import StandardScaler
+    if X.size == 0:
+        return np.array([]), np.array([]), StandardScaler()
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    return X_scaled, y, scaler
+
+
+def generate_training_data(num_samples, occupancy_grid, tile_size, screen_width, screen_height,
+                           max_retries_per_sample=10, obstacles_version=None, rng=None):
     """
     Genera datos sintéticos para entrenar la IA.
+
+    Usa la misma cuadrícula de ocupación que el jugador y los enemigos (Map.occupancy_grid).
+    Si se indica obstacles_version (Map.obstacle_version), las búsquedas pasan por la caché de
+    rutas compartida, de modo que los pares (inicio, meta) repetidos no se recalculan.
+
+    Los pares se eligen con rng (un random.Random propio, para repetir los datos sin tocar el
+    estado global); con None se usa el módulo random.
+    """
+    X, y = generate_raw_training_data(num_samples, occupancy_grid, tile_size, screen_width, screen_height,
+                                      max_retries_per_sample, obstacles_version, rng)
+    return scale_training_data(X, y)
+
+
+def generate_raw_training_data(num_samples, occupancy_grid, tile_size, screen_width, screen_height,
+                               max_retries_per_sample=10, obstacles_version=None, rng=None):
     """
+    Como generate_training_data, pero devuelve las muestras sin escalar.
+
+    Returns:
+        tuple: (X, y) como arreglos de NumPy; vacíos si no se pudo generar ninguna muestra.
+    """
+    rng = rng or random
     X = []
     y = []
 
-    graph_nodes = []
-    map_height_pixels = screen_height
-    map_width_pixels = screen_width
-
-    # Este bucle sigue siendo útil para encontrar puntos de inicio/fin válidos que no estén en una pared.
-    for y_coord in range(0, map_height_pixels, tile_size):
-        for x_coord in range(0, map_width_pixels, tile_size):
-            temp_rect = pygame.Rect(x_coord, y_coord, tile_size, tile_size)
-            if temp_rect.collidelist(map_walls) == -1:
-                # Almacenamos directamente la posición (tupla) en lugar de un objeto Nodo.
-                graph_nodes.append((x_coord, y_coord))
+    # Los puntos de inicio/fin válidos son los tiles libres de la cuadrícula dentro de la pantalla.
+    # Almacenamos directamente la posición (tupla) en lugar de un objeto Nodo.
+    free_grid = occupancy_grid[:screen_height // tile_size, :screen_width // tile_size] == LIBRE
+    graph_nodes = [(int(col) * tile_size, int(row) * tile_size) for row, col in np.argwhere(free_grid)]
 
     if not graph_nodes:
         print("Error: No se pudieron generar nodos de grafo válidos. Revise el mapa y el tamaño de los tiles.")
-        return np.array([]), np.array([]), StandardScaler()
+        return np.array([]), np.array([])
+
+    # Pasamos las dimensiones de la pantalla al mock_game para que A* pueda verificar los límites.
+    mock_game = _TrainerGame(tile_size, screen_width, screen_height)
 
     print(f"  Generando {num_samples} muestras de entrenamiento...")
     for i in range(num_samples):
-        start_node_pos = random.choice(graph_nodes)
-        end_node_pos = random.choice(graph_nodes)
+        start_node_pos = rng.choice(graph_nodes)
+        end_node_pos = rng.choice(graph_nodes)
 
         retries = 0
         while start_node_pos == end_node_pos and retries < max_retries_per_sample:
-            end_node_pos = random.choice(graph_nodes)
+            end_node_pos = rng.choice(graph_nodes)
             retries += 1
         if start_node_pos == end_node_pos:
             continue
 
-        class MockGame:
-            def __init__(self, tile_size_val, width, height):
-                self.settings = self.MockSettings(tile_size_val, width, height)
-
-            class MockSettings:
-                def __init__(self, tile_size_val, width, height):
-                    self.tile_size = tile_size_val
-                    self.screen_width = width
-                    self.screen_height = height
-
-        # Pasamos las dimensiones de la pantalla al mock_game para que A* pueda verificar los límites.
-        mock_game = MockGame(tile_size, screen_width, screen_height)
-
         start_pos = start_node_pos
         end_pos = end_node_pos
 
         ### CAMBIO: Corregir la llamada a get_path para que coincida con la nueva firma de 4 argumentos.
         # Se elimina el argumento 'graph_nodes' que ya no es necesario.
-        optimal_path = get_path(mock_game, start_pos, end_pos, map_walls)
+        optimal_path = get_path(mock_game, start_pos, end_pos, occupancy_grid, version=obstacles_version)
 
         if optimal_path and len(optimal_path) > 1:
             next_step_pos = optimal_path[1]
@@ -95,33 +147,186 @@ def generate_training_data(num_samples, map_walls, tile_size, screen_width, scre
 
     if not X:
         print("Advertencia: No se generaron datos de entrenamiento. Asegúrese de que el mapa permite rutas.")
-        return np.array([]), np.array([]), StandardScaler()
+        return np.array([]), np.array([])
 
-    X = np.array(X)
-    y = np.array(y)
+    return np.array(X), np.array(y)
 
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
 
-    return X_scaled, y, scaler
+def label_directions_to_goal(occupancy_grid, goal):
+    """
+    Etiqueta, con una sola BFS inversa desde la meta, la dirección del primer paso óptimo de cada tile.
 
+    Es la misma etiqueta que daría un A* desde cada tile (salvo empates entre pasos igual de
+    cortos, que se resuelven en el orden de DIRECTIONS).
 
-def train_ia(num_samples, map_walls, tile_size, screen_width, screen_height):
+    Args:
+        occupancy_grid (np.ndarray): Cuadrícula de ocupación (ver Grid.py).
+        goal (int): Índice plano del tile meta.
+
+    Returns:
+        np.ndarray: Etiquetas de dirección con la forma de la cuadrícula; -1 en la meta, en los
+                    tiles bloqueados y en los que no llegan a la meta.
+    """
+    rows, cols = occupancy_grid.shape
+    distances = np.array(bfs_distances(flat_view(occupancy_grid), rows, cols, goal)).reshape(rows, cols)
+
+    # Con un borde de UNREACHABLE, el vecino en cada dirección es un simple desplazamiento del arreglo
+    padded = np.full((rows + 2, cols + 2), UNREACHABLE, dtype=distances.dtype)
+    padded[1:-1, 1:-1] = distances
+    has_step = distances > 0
+
+    labels = np.full((rows, cols), -1, dtype=np.int64)
+    for label, d_row, d_col in reversed(DIRECTIONS):  # La primera dirección que sirve gana
+        neighbor = padded[1 + d_row:1 + d_row + rows, 1 + d_col:1 + d_col + cols]
+        labels[has_step & (neighbor == distances - 1)] = label
+    return labels
+
+
+def generate_training_data_batch(num_goals, occupancy_grid, tile_size, screen_width, screen_height,
+                                 samples_per_goal=None, rng=None, np_rng=None):
+    """
+    Genera datos de entrenamiento por lotes: una BFS inversa por meta en lugar de un A* por muestra.
+
+    Cada BFS etiqueta de una vez todos los tiles de inicio que llegan a su meta (ver
+    label_directions_to_goal) y las filas se construyen con NumPy, sin bucles por muestra.
+
+    Args:
+        num_goals (int): Número de metas (tiles libres al azar dentro de la pantalla).
+        samples_per_goal (int | None): Filas por meta, elegidas al azar; None usa todos los inicios.
+        rng (random.Random | None): Elige las metas; None = el módulo random.
+        np_rng (np.random.Generator | None): Elige las filas de cada meta; None = np.random.
+
+    Returns:
+        tuple: (X escalado, y, StandardScaler), igual que generate_training_data.
+    """
+    X, y = generate_raw_training_data_batch(num_goals, occupancy_grid, tile_size, screen_width, screen_height,
+                                            samples_per_goal, rng, np_rng)
+    return scale_training_data(X, y)
+
+
+def _training_tiles(occupancy_grid, tile_size, screen_width, screen_height):
+    """Máscara plana de los inicios y metas válidos: los tiles libres de la cuadrícula dentro de la pantalla."""
+    rows, cols = occupancy_grid.shape
+    in_screen = np.zeros((rows, cols), dtype=bool)
+    in_screen[:screen_height // tile_size, :screen_width // tile_size] = True
+    return (in_screen & (occupancy_grid == LIBRE)).ravel()
+
+
+def pick_training_goals(num_goals, occupancy_grid, tile_size, screen_width, screen_height, rng=None):
+    """
+    Elige las metas del etiquetado por lotes: num_goals tiles libres distintos dentro de la pantalla.
+
+    Args:
+        rng (random.Random | None): Generador con el que se eligen; None = el módulo random.
+
+    Returns:
+        list[int]: Índices planos de las metas; vacía si no hay tiles válidos.
+    """
+    goal_candidates = [int(index) for index in np.flatnonzero(_training_tiles(occupancy_grid, tile_size,
+                                                                               screen_width, screen_height))]
+    if not goal_candidates:
+        print("Error: No se pudieron generar nodos de grafo válidos. Revise el mapa y el tamaño de los tiles.")
+        return []
+    return (rng or random).sample(goal_candidates, min(num_goals, len(goal_candidates)))
+
+
+def generate_raw_training_data_batch(num_goals, occupancy_grid, tile_size, screen_width, screen_height,
+                                     samples_per_goal=None, rng=None, np_rng=None, goals=None):
+    """
+    Como generate_training_data_batch, pero devuelve las muestras sin escalar.
+
+    Con goals (índices planos elegidos antes con pick_training_goals) se etiquetan esas metas y se
+    ignoran num_goals y rng: así TrainingOrchestrator reparte entre sus procesos partes disjuntas
+    de una misma lista de metas.
+
+    Returns:
+        tuple: (X, y) como arreglos de NumPy; vacíos si no se pudo generar ninguna muestra.
+    """
+    cols = occupancy_grid.shape[1]
+    candidates = _training_tiles(occupancy_grid, tile_size, screen_width, screen_height)
+    if goals is None:
+        goals = pick_training_goals(num_goals, occupancy_grid, tile_size, screen_width, screen_height, rng)
+    if not goals:
+        return np.array([]), np.array([])
+    print(f"  Generando muestras de entrenamiento por lotes ({len(goals)} metas)...")
+
+    X_parts = []
+    y_parts = []
+    for goal in goals:
+        labels = label_directions_to_goal(occupancy_grid, goal).ravel()
+        starts = np.flatnonzero(candidates & (labels != -1))
+        if samples_per_goal is not None and len(starts) > samples_per_goal:
+            starts = (np_rng or np.random).choice(starts, samples_per_goal, replace=False)
+        if len(starts) == 0:
+            continue
+
+        start_rows, start_cols = np.divmod(starts, cols)
+        goal_row, goal_col = divmod(goal, cols)
+        start_x = start_cols * tile_size
+        start_y = start_rows * tile_size
+        goal_x = np.full(len(starts), goal_col * tile_size)
+        goal_y = np.full(len(starts), goal_row * tile_size)
+        # Mismas columnas que generate_training_data: inicio, meta y distancia euclidiana
+        X_parts.append(np.column_stack((start_x, start_y, goal_x, goal_y,
+                                        np.hypot(start_x - goal_x, start_y - goal_y))))
+        y_parts.append(labels[starts])
+
+    if not X_parts:
+        print("Advertencia: No se generaron datos de entrenamiento. Asegúrese de que el mapa permite rutas.")
+        return np.array([]), np.array([])
+
+    return np.concatenate(X_parts).astype(float), np.concatenate(y_parts)
+
+
+def train_ia(num_samples, occupancy_grid, tile_size, screen_width, screen_height, obstacles_version=None,
+             num_goals=0, model_cache=None, seed=None):
     """
     Entrena un modelo de IA (MLPClassifier) con datos generados.
+
+    Con num_goals > 0 los datos se generan por lotes (generate_training_data_batch), repartiendo
+    num_samples entre las metas; con 0 se hace un A* por muestra (generate_training_data).
+
+    Con seed, los datos se generan con un random.Random y un np.random.Generator propios creados a
+    partir de ella (mismo modelo con la misma semilla, sin tocar el estado global de random ni de
+    np.random); con None se usan los generadores globales.
+
+    Con model_cache (ver Model_Cache.py) primero se busca un modelo ya entrenado con el mismo mapa,
+    tamaño de tile, pantalla, muestras, hiperparámetros y semilla, y el modelo nuevo se guarda en ella.
     """
-    X, y, scaler = generate_training_data(num_samples, map_walls, tile_size, screen_width, screen_height)
+    cache_key = None
+    if model_cache is not None:
+        cache_key = training_cache_key(occupancy_grid, tile_size, screen_width, screen_height, num_samples,
+                                       num_goals, create_model().get_params(), seed)
+        cached = model_cache.load(cache_key)
+        if cached is not None:
+            print("  Modelo de IA cargado de la caché.")
+            return cached
+
+    rng = np_rng = None
+    if seed is not None:
+        rng = random.Random(seed)
+        np_rng = np.random.default_rng(seed)
+
+    if num_goals > 0:
+        X, y, scaler = generate_training_data_batch(num_goals, occupancy_grid, tile_size, screen_width,
+                                                    screen_height, samples_per_goal=max(1, num_samples // num_goals),
+                                                    rng=rng, np_rng=np_rng)
+    else:
+        X, y, scaler = generate_training_data(num_samples, occupancy_grid, tile_size, screen_width, screen_height,
+                                              obstacles_version=obstacles_version, rng=rng)
 
     if X.size == 0 or y.size == 0:
         print("No hay datos suficientes para entrenar la IA. Abortando entrenamiento.")
         return None, None
 
-    model = MLPClassifier(hidden_layer_sizes=(64, 32), max_iter=2000, activation='relu', solver='adam', random_state=1)
+    model = create_model()
 
     print("  Entrenando el modelo de IA. Esto puede tomar un momento...")
     model.fit(X, y)
     print("  Entrenamiento del modelo de IA finalizado.")
 
+    if model_cache is not None:
+        model_cache.store(cache_key, model, scaler)
     return model, scaler
 
 
@@ -135,34 +340,19 @@ if __name__ == '__main__':
 
     settings = MockSettings()
 
-
-    class MockMap:
-        def __init__(self, map_data, tile_s):
-            self.map_data = map_data
-            self.tile_size = tile_s
-            self.walls_rects = []
-            for y_idx, row in enumerate(self.map_data):
-                for x_idx, char in enumerate(row):
-                    if char == MURO or char == BLOQUE:
-                        self.walls_rects.append(pygame.Rect(x_idx * tile_s, y_idx * tile_s, tile_s, tile_s))
-
-        def get_collidable_rects(self):
-            return self.walls_rects
-
-
-    temp_map_instance = MockMap(MAP_DATA, settings.tile_size)
-    test_map_walls = temp_map_instance.get_collidable_rects()
+    # Misma cuadrícula de ocupación que construye Tile.Map al cargar el mapa
+    test_occupancy_grid = build_occupancy_grid(MAP_DATA)
 
     screen_width_for_training = len(MAP_DATA[0]) * settings.tile_size
     screen_height_for_training = len(MAP_DATA) * settings.tile_size
 
     print("Iniciando entrenamiento de prueba para AI_Trainer.py...")
-    model, scaler = train_ia(100, test_map_walls, settings.tile_size, screen_width_for_training,
+    model, scaler = train_ia(100, test_occupancy_grid, settings.tile_size, screen_width_for_training,
                              screen_height_for_training)
     if model and scaler:
         print("Entrenamiento de la IA de prueba finalizado.")
         # Generamos los datos de prueba de la misma forma que los de entrenamiento
-        X_test_scaled, y_test, _ = generate_training_data(10, test_map_walls, settings.tile_size,
+        X_test_scaled, y_test, _ = generate_training_data(10, test_occupancy_grid, settings.tile_size,
                                                           screen_width_for_training,
                                                           screen_height_for_training)
 
@@ -172,5 +362,19 @@ if __name__ == '__main__':
             print(f"Precisión del modelo en datos de prueba: {model.score(X_test_scaled, y_test):.2f}")
         else:
             print("No se pudieron generar datos de prueba para evaluar la precisión.")
+
+        # Comparación de velocidad: un A* por muestra frente a una BFS inversa por meta
+        import time
+
+        start_time = time.perf_counter()
+        _, y_search, _ = generate_training_data(600, test_occupancy_grid, settings.tile_size,
+                                                screen_width_for_training, screen_height_for_training)
+        search_rate = len(y_search) / (time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        _, y_batch, _ = generate_training_data_batch(20, test_occupancy_grid, settings.tile_size,
+                                                     screen_width_for_training, screen_height_for_training)
+        batch_rate = len(y_batch) / (time.perf_counter() - start_time)
+        print(f"Muestras por segundo: {search_rate:.0f} con A*, {batch_rate:.0f} por lotes "
+              f"({len(y_batch)} filas de 20 metas)")
     else:
         print("El entrenamiento de la IA de prueba no se completó debido a la falta de datos.")
\ No newline at end of file
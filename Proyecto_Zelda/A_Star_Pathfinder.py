@@ -1,8 +1,17 @@
 # A_Star_Pathfinder.py
 
 import heapq
+import math
+import threading
 import numpy as np
-import pygame ### CAMBIO: Importar pygame para usar Rect
+from Grid import LIBRE, flat_view, pos_to_index, index_to_pos
+import Jump_Point_Search
+from Jump_Point_Search import get_path_jps
+from Path_Cache import PATH_CACHE
+
+# Motor de búsqueda usado cuando la configuración no indica ninguno
+DEFAULT_ENGINE = 'indices'
+
 
 class Nodo:
     """
@@ -25,13 +34,72 @@ def d(p1, p2):
     return np.sqrt((p1[0] - p2[0]) ** 2 + (p1[1] - p2[1]) ** 2)
 
 
-### CAMBIO: La función ahora solo necesita una lista de todos los obstáculos.
-def get_path(game, start_pos, end_pos, all_obstacles):
+def get_path(game, start_pos, end_pos, occupancy_grid, version=None):
+    """
+    Calcula una ruta entre dos posiciones (esquinas de tile, en píxeles) con el motor
+    indicado en game.settings.pathfinding_engine.
+
+    Todos los motores devuelven el mismo formato: una secuencia de posiciones (x, y) de tiles
+    desde start_pos hasta end_pos, o una secuencia vacía si no existe ruta.
+
+    Si se indica version (la versión de los obstáculos de occupancy_grid, ver
+    Map.obstacle_version), la consulta pasa por la caché de rutas compartida y el resultado
+    es una tupla inmutable que no se debe modificar.
+
+    Con el perfilado activo (game.profiler, ver Profiler.py) cada consulta anota su tiempo,
+    nodos expandidos, longitud y si encontró ruta.
+    """
+    engine_name = getattr(game.settings, 'pathfinding_engine', DEFAULT_ENGINE)
+    engine = PATHFINDING_ENGINES.get(engine_name)
+    if engine is None:
+        raise ValueError(f"Motor de búsqueda desconocido: {engine_name!r}. "
+                         f"Opciones: {', '.join(PATHFINDING_ENGINES)}")
+    profiler = getattr(game, 'profiler', None)
+    start_time = profiler.start() if profiler is not None else 0.0
+
+    use_cache = version is not None and getattr(game.settings, 'use_path_cache', True)
+    if use_cache:
+        cached_path = PATH_CACHE.get(start_pos, end_pos, version)
+        if cached_path is not None:
+            if profiler is not None:
+                profiler.record_path(engine_name, start_time, cached_path, 0, cache_hit=True)
+            return cached_path
+
+    path = engine(game, start_pos, end_pos, occupancy_grid)
+    if profiler is not None:
+        profiler.record_path(engine_name, start_time, path, last_nodes_expanded(engine_name, game))
+
+    # Las rutas perezosas del motor jerárquico no se guardan: se refinan a medida que se usan.
+    if use_cache and isinstance(path, list):
+        path = PATH_CACHE.put(start_pos, end_pos, version, path)
+    return path
+
+
+def last_nodes_expanded(engine_name, game):
+    """Nodos expandidos por la última consulta del hilo actual, o None si el motor no los cuenta ('clasico')."""
+    if engine_name == 'indices':
+        engine = getattr(_thread_engines, 'indexed', None)
+    elif engine_name == 'jps':
+        engine = getattr(Jump_Point_Search._thread_engines, 'jps', None)
+    elif engine_name == 'jerarquico':
+        engine = getattr(getattr(game, 'map', None), 'hierarchy', None)
+    else:
+        return None
+    return None if engine is None else engine.nodes_expanded
+
+
+def get_path_classic(game, start_pos, end_pos, occupancy_grid):
     """
     Implementación de A* "sin estado" que maneja obstáculos dinámicos.
     Los nodos del grafo no se modifican. Todos los datos de la búsqueda
     se almacenan en diccionarios locales.
+
+    La comprobación de obstáculos se hace en O(1) por vecino sobre la cuadrícula de
+    ocupación (ver Grid.py). Los obstáculos dinámicos deben venir ya estampados en ella.
     """
+    tile_size = game.settings.tile_size
+    rows, cols = occupancy_grid.shape
+
     open_list = []
     heapq.heappush(open_list, (0, start_pos))  # La cola guarda (f_cost, position)
 
@@ -59,25 +127,21 @@ def get_path(game, start_pos, end_pos, all_obstacles):
 
         # Explorar vecinos
         for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            neighbor_pos = (current_pos[0] + dx * game.settings.tile_size,
-                            current_pos[1] + dy * game.settings.tile_size)
+            neighbor_pos = (current_pos[0] + dx * tile_size,
+                            current_pos[1] + dy * tile_size)
 
-            ### CAMBIO: Verificación de colisiones en tiempo real en lugar de usar un grafo pre-calculado.
-            # 1. Comprobar si el vecino está dentro de los límites de la pantalla.
-            if not (0 <= neighbor_pos[0] < game.settings.screen_width and
-                    0 <= neighbor_pos[1] < game.settings.screen_height):
+            # 1. Comprobar si el vecino está dentro de los límites del mapa.
+            col = neighbor_pos[0] // tile_size
+            row = neighbor_pos[1] // tile_size
+            if not (0 <= col < cols and 0 <= row < rows):
                 continue
 
-            # 2. Crear un rect para el vecino para la detección de colisiones.
-            neighbor_rect = pygame.Rect(neighbor_pos[0], neighbor_pos[1], game.settings.tile_size, game.settings.tile_size)
-
-            # 3. Comprobar si el vecino choca con CUALQUIER obstáculo (muros, enemigo, etc.).
-            if neighbor_rect.collidelist(all_obstacles) != -1:
+            # 2. Comprobar si el tile del vecino está ocupado (muros, bloques o zonas de peligro).
+            if occupancy_grid[row, col] != LIBRE:
                 continue
-            ### FIN DEL CAMBIO
 
             # El coste para moverse al vecino es siempre el tamaño del tile
-            new_g = g_costs[current_pos] + game.settings.tile_size
+            new_g = g_costs[current_pos] + tile_size
 
             # Si el vecino no ha sido visitado o encontramos un camino mejor
             if neighbor_pos not in g_costs or new_g < g_costs[neighbor_pos]:
@@ -87,4 +151,194 @@ def get_path(game, start_pos, end_pos, all_obstacles):
                 parents[neighbor_pos] = current_pos
                 heapq.heappush(open_list, (f_cost, neighbor_pos))
 
-    return []  # No se encontró un camino
\ No newline at end of file
+    return []  # No se encontró un camino
+
+
+class IndexedAStar:
+    """
+    Motor A* sobre índices planos de tiles (fila * columnas + columna).
+
+    Los costes g, los padres y las marcas de nodo visto/cerrado viven en arreglos preasignados
+    del tamaño del mapa que se reutilizan entre llamadas. En lugar de limpiarlos en cada
+    búsqueda se usa un identificador de búsqueda: un valor solo es válido si su marca coincide
+    con la búsqueda actual. Los arreglos son listas de Python porque indexarlas es más rápido
+    que indexar un np.ndarray escalar a escalar.
+
+    Devuelve las mismas rutas que el A* clásico: la heurística es la misma distancia euclídea
+    (en tiles) y la cola ordena igual, por f y, a igual f, por columna y después por fila (el
+    orden de las tuplas (x, y) de píxeles). Con otra heurística o con otro desempate la ruta
+    tendría la misma longitud pero pasaría por otros tiles, y el jugador esquivaría distinto.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+
+        self.g_costs = [0] * self.size
+        self.parents = [-1] * self.size
+        self.seen = [0] * self.size  # Búsqueda en la que se asignó g_costs/parents
+        self.closed = [0] * self.size  # Búsqueda en la que se cerró el nodo
+        self.search_id = 0
+
+        self.nodes_expanded = 0  # Nodos expandidos en la última búsqueda
+
+    def search(self, blocked, start, goal):
+        """
+        Busca la ruta más corta entre dos índices de tile.
+
+        Args:
+            blocked: Secuencia plana indexable por tile; un valor distinto de cero es un obstáculo.
+            start (int): Índice del tile de inicio (puede estar ocupado, como en el A* clásico).
+            goal (int): Índice del tile destino.
+
+        Returns:
+            list[int]: Índices de tiles desde start hasta goal, o lista vacía si no hay ruta.
+        """
+        self.search_id += 1
+        search_id = self.search_id
+        rows = self.rows
+        cols = self.cols
+        g_costs = self.g_costs
+        parents = self.parents
+        seen = self.seen
+        closed = self.closed
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        sqrt = math.sqrt
+
+        goal_row, goal_col = divmod(goal, cols)
+
+        # Las entradas de la cola son (f, columna * filas + fila): a igual f sale antes la
+        # columna menor y, en la misma columna, la fila menor, como (x, y) en el A* clásico.
+        g_costs[start] = 0
+        parents[start] = -1
+        seen[start] = search_id
+        start_row, start_col = divmod(start, cols)
+        open_heap = [(0, start_col * rows + start_row)]
+        expanded = 0
+
+        while open_heap:
+            col, row = divmod(heappop(open_heap)[1], rows)
+            current = row * cols + col
+            if closed[current] == search_id:
+                continue
+            closed[current] = search_id
+            expanded += 1
+
+            if current == goal:
+                self.nodes_expanded = expanded
+                path = []
+                while current != -1:
+                    path.append(current)
+                    current = parents[current]
+                path.reverse()
+                return path
+
+            new_g = g_costs[current] + 1
+            key = col * rows + row
+            row_offset = row - goal_row
+            col_offset = col - goal_col
+
+            # Vecinos en el mismo orden que el A* clásico: arriba, abajo, izquierda, derecha
+            if row > 0:
+                neighbor = current - cols
+                if not blocked[neighbor] and closed[neighbor] != search_id and (
+                        seen[neighbor] != search_id or new_g < g_costs[neighbor]):
+                    seen[neighbor] = search_id
+                    g_costs[neighbor] = new_g
+                    parents[neighbor] = current
+                    h = sqrt(col_offset * col_offset + (row_offset - 1) * (row_offset - 1))
+                    heappush(open_heap, (new_g + h, key - 1))
+            if row < rows - 1:
+                neighbor = current + cols
+                if not blocked[neighbor] and closed[neighbor] != search_id and (
+                        seen[neighbor] != search_id or new_g < g_costs[neighbor]):
+                    seen[neighbor] = search_id
+                    g_costs[neighbor] = new_g
+                    parents[neighbor] = current
+                    h = sqrt(col_offset * col_offset + (row_offset + 1) * (row_offset + 1))
+                    heappush(open_heap, (new_g + h, key + 1))
+            if col > 0:
+                neighbor = current - 1
+                if not blocked[neighbor] and closed[neighbor] != search_id and (
+                        seen[neighbor] != search_id or new_g < g_costs[neighbor]):
+                    seen[neighbor] = search_id
+                    g_costs[neighbor] = new_g
+                    parents[neighbor] = current
+                    h = sqrt((col_offset - 1) * (col_offset - 1) + row_offset * row_offset)
+                    heappush(open_heap, (new_g + h, key - rows))
+            if col < cols - 1:
+                neighbor = current + 1
+                if not blocked[neighbor] and closed[neighbor] != search_id and (
+                        seen[neighbor] != search_id or new_g < g_costs[neighbor]):
+                    seen[neighbor] = search_id
+                    g_costs[neighbor] = new_g
+                    parents[neighbor] = current
+                    h = sqrt((col_offset + 1) * (col_offset + 1) + row_offset * row_offset)
+                    heappush(open_heap, (new_g + h, key + rows))
+
+        self.nodes_expanded = expanded
+        return []  # No se encontró un camino
+
+
+# Cada hilo de búsqueda tiene su propio motor, porque los arreglos se reutilizan entre llamadas.
+_thread_engines = threading.local()
+
+
+def _get_indexed_engine(rows, cols):
+    """Devuelve el motor IndexedAStar del hilo actual, creándolo si cambia el tamaño del mapa."""
+    engine = getattr(_thread_engines, 'indexed', None)
+    if engine is None or engine.rows != rows or engine.cols != cols:
+        engine = IndexedAStar(rows, cols)
+        _thread_engines.indexed = engine
+    return engine
+
+
+def get_path_indexed(game, start_pos, end_pos, occupancy_grid):
+    """
+    A* sobre índices planos (ver IndexedAStar) con la misma firma y formato de ruta que get_path.
+    """
+    tile_size = game.settings.tile_size
+    rows, cols = occupancy_grid.shape
+
+    start = pos_to_index(start_pos, tile_size, occupancy_grid.shape)
+    goal = pos_to_index(end_pos, tile_size, occupancy_grid.shape)
+    if start == -1 or goal == -1:
+        return []
+
+    engine = _get_indexed_engine(rows, cols)
+    path = engine.search(flat_view(occupancy_grid), start, goal)
+    return [index_to_pos(index, tile_size, cols) for index in path]
+
+
+def get_path_hierarchical(game, start_pos, end_pos, occupancy_grid):
+    """
+    Búsqueda jerárquica HPA* (ver HPA_Star.py) con la misma firma que get_path.
+
+    Devuelve una LazyPath que se refina a medida que gen_next_route la consume. El grafo
+    abstracto solo conoce la cuadrícula estática del mapa: las consultas con una capa de
+    obstáculos dinámicos (la del jugador), sin jerarquía construida o que empiezan en un tile
+    ocupado (sin transiciones propias) usan el motor 'indices'.
+    """
+    hierarchy = getattr(getattr(game, 'map', None), 'hierarchy', None)
+    if hierarchy is None or occupancy_grid is not hierarchy.occupancy_grid:
+        return get_path_indexed(game, start_pos, end_pos, occupancy_grid)
+
+    tile_size = game.settings.tile_size
+    start = pos_to_index(start_pos, tile_size, occupancy_grid.shape)
+    goal = pos_to_index(end_pos, tile_size, occupancy_grid.shape)
+    if start == -1 or goal == -1:
+        return []
+    if occupancy_grid.flat[start] != LIBRE:
+        return get_path_indexed(game, start_pos, end_pos, occupancy_grid)
+    return hierarchy.find_path(start, goal, tile_size)
+
+
+# Motores disponibles para get_path (se eligen con settings.pathfinding_engine)
+PATHFINDING_ENGINES = {
+    'clasico': get_path_classic,
+    'indices': get_path_indexed,
+    'jps': get_path_jps,
+    'jerarquico': get_path_hierarchical,
+}
@@ -0,0 +1,184 @@
+# Agent_Store.py
+
+import numpy as np
+
+
+class AgentStore:
+    """
+    Registro de enemigos en arreglos contiguos (estructura de arreglos) con movimiento vectorizado.
+
+    Con muchos enemigos, el coste por tick lo domina el trabajo de Python por objeto (un
+    update() por sprite, un buffer de pasos y una lista de ruta por enemigo). Aquí las posiciones,
+    los tramos en curso y sus cursores de todos los enemigos viven en arreglos de NumPy y un solo
+    step() los avanza a la vez siguiendo el campo de flujo compartido (ver Flow_Field.py).
+
+    Cada tramo va de la posición actual al siguiente tile con los mismos pasos que
+    Utils.gen_next_route (como np.linspace), así que el movimiento se ve igual que antes.
+
+    Los sprites se conservan solo para dibujar: enemy.position es una vista de su fila en
+    positions (siempre al día sin copiar nada) y el rect solo se actualiza en sync_sprites()
+    para los enemigos visibles, que quedan en self.visible para que el juego los dibuje.
+    """
+
+    def __init__(self, sprites, tile_size, speed, sprite_size, spatial_hash=None):
+        """
+        Args:
+            sprites (list): Sprites de los enemigos (Enemy); su orden es el de las filas de los arreglos.
+            tile_size (int): El tamaño de cada tile.
+            speed (float): Velocidad de los enemigos (píxeles por tick, como enemy_speed).
+            sprite_size (tuple): (ancho, alto) del rect de cada enemigo, para la visibilidad.
+            spatial_hash (SpatialHash | None): Rejilla de enemigos que step() mantiene al día (solo
+                                               los que cambian de celda).
+        """
+        self.sprites = list(sprites)
+        self.tile_size = tile_size
+        self.speed = speed
+        self.sprite_size = np.array(sprite_size, dtype=float)
+
+        count = len(self.sprites)
+        self.positions = np.array([sprite.position for sprite in self.sprites], dtype=float).reshape(count, 2)
+        self.segment_starts = self.positions.copy()  # Inicio del tramo en curso
+        self.segment_ends = self.positions.copy()  # Tile destino del tramo en curso
+        self.step_sizes = np.zeros((count, 2))  # Desplazamiento por paso del tramo
+        self.step_index = np.zeros(count, dtype=np.int64)  # Siguiente paso del tramo
+        self.num_steps = np.zeros(count, dtype=np.int64)  # Pasos del tramo (0 = parado)
+
+        for row, sprite in enumerate(self.sprites):
+            sprite.position = self.positions[row]
+
+        self.spatial_hash = spatial_hash
+        self.cells = self._cells()  # Celda (columna, fila) de cada enemigo en la rejilla
+        if spatial_hash is not None:
+            for sprite, cell in zip(self.sprites, self.cells.tolist()):
+                spatial_hash.move_to_cell(sprite, tuple(cell))
+
+        self.visible = []  # Sprites sincronizados en el último sync_sprites()
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def _cells(self):
+        return np.floor(self.positions / self.tile_size).astype(np.int64)
+
+    def _start_segments(self, agents, flow_field, grid_shape):
+        """Empieza un tramo nuevo para los agentes indicados: hacia el siguiente tile del campo."""
+        rows, cols = grid_shape
+        positions = self.positions[agents]
+        tile_cols = np.floor(positions[:, 0] / self.tile_size).astype(np.int64)
+        tile_rows = np.floor(positions[:, 1] / self.tile_size).astype(np.int64)
+        inside = (tile_cols >= 0) & (tile_cols < cols) & (tile_rows >= 0) & (tile_rows < rows)
+        indices = np.where(inside, tile_rows * cols + tile_cols, -1)
+        next_indices = flow_field.next_indices(indices)
+
+        # Un agente fuera de la esquina de su tile (por ejemplo, al empezar en el centro) primero
+        # se alinea con ella, igual que la ruta del campo que empieza por el tile actual
+        tile_corners = np.column_stack((tile_cols, tile_rows)) * self.tile_size
+        aligned = np.all(positions == tile_corners, axis=1)
+        next_corners = np.column_stack((next_indices % cols, next_indices // cols)) * self.tile_size
+        ends = np.where(aligned[:, None], next_corners, tile_corners).astype(float)
+        moving = inside & (~aligned | (next_indices >= 0))
+
+        deltas = ends - positions
+        num_steps = np.maximum((np.abs(deltas) / self.speed).astype(np.int64).max(axis=1), 1)
+        self.segment_starts[agents] = positions
+        self.segment_ends[agents] = ends
+        self.step_sizes[agents] = deltas / np.maximum(num_steps - 1, 1)[:, None]
+        self.step_index[agents] = 0
+        self.num_steps[agents] = np.where(moving, num_steps, 0)
+
+    def step(self, flow_field, grid_shape, agents=None, steps=1):
+        """
+        Avanza un paso a todos los enemigos (o solo a algunos).
+
+        Args:
+            flow_field (FlowField): Campo de flujo hacia el jugador, ya actualizado en este tick.
+            grid_shape (tuple): Forma (filas, columnas) de la cuadrícula de ocupación.
+            agents (np.ndarray | None): Máscara booleana de los enemigos que avanzan en este tick
+                                        (ver ChunkManager.active_mask); None = todos.
+            steps (int): Pasos que avanzan (más de uno para ponerse al día tras ticks sin moverse).
+        """
+        if not self.sprites or (agents is not None and not agents.any()):
+            return
+        for _ in range(steps):
+            self._advance(flow_field, grid_shape, agents)
+
+        if self.spatial_hash is not None:
+            cells = self._cells()
+            for row in np.flatnonzero(np.any(cells != self.cells, axis=1)).tolist():
+                self.spatial_hash.move_to_cell(self.sprites[row], (int(cells[row, 0]), int(cells[row, 1])))
+            self.cells = cells
+
+    def _advance(self, flow_field, grid_shape, agents):
+        pending = self.step_index >= self.num_steps
+        if agents is not None:
+            pending &= agents
+        finished = np.flatnonzero(pending)
+        if len(finished):
+            self._start_segments(finished, flow_field, grid_shape)
+
+        moving = self.step_index < self.num_steps
+        if agents is not None:
+            moving &= agents
+        moving = np.flatnonzero(moving)
+        steps = self.step_index[moving]
+        self.positions[moving] = steps[:, None] * self.step_sizes[moving] + self.segment_starts[moving]
+        # El último paso de cada tramo cae exactamente en el tile destino
+        last = moving[(steps == self.num_steps[moving] - 1) & (steps > 0)]
+        self.positions[last] = self.segment_ends[last]
+        self.step_index[moving] += 1
+
+    def _rect_lefts_tops(self):
+        """Esquina superior izquierda de cada rect con el centro en la posición (redondeado como pygame)."""
+        return np.floor(self.positions + 0.5) - self.sprite_size // 2
+
+    def sync_sprites(self, view_rect):
+        """
+        Actualiza el rect solo de los enemigos que se ven en view_rect y los guarda en self.visible.
+
+        Args:
+            view_rect (pygame.Rect): Zona visible del mapa en píxeles.
+        """
+        if not self.sprites:
+            self.visible = []
+            return
+        corners = self._rect_lefts_tops()
+        width, height = self.sprite_size
+        on_screen = np.flatnonzero((corners[:, 0] < view_rect.right) & (view_rect.left < corners[:, 0] + width) &
+                                   (corners[:, 1] < view_rect.bottom) & (view_rect.top < corners[:, 1] + height))
+        self.visible = []
+        for row in on_screen.tolist():
+            sprite = self.sprites[row]
+            sprite.rect.center = self.positions[row]
+            self.visible.append(sprite)
+
+
+if __name__ == '__main__':
+    # Miles de enemigos sobre un mapa grande: coste por tick de un solo paso vectorizado.
+    import time
+    from Flow_Field import FlowField
+    from Grid import build_occupancy_grid, LIBRE
+    from Map_Generator import generate_map
+
+    tile_size = 32
+    map_data = generate_map('abierto', 256, 256, seed=0)
+    grid = build_occupancy_grid(map_data)
+    free_tiles = np.argwhere(grid == LIBRE)
+    rng = np.random.default_rng(0)
+
+    class _DemoEnemy:
+        def __init__(self, position):
+            self.position = np.array(position, dtype=float)
+
+    flow_field = FlowField(tile_size)
+    player_tile = free_tiles[len(free_tiles) // 2]
+    flow_field.update((player_tile[1] * tile_size, player_tile[0] * tile_size), grid)
+
+    for num_agents in (100, 1000, 5000):
+        starts = free_tiles[rng.choice(len(free_tiles), num_agents, replace=False)] * tile_size + tile_size // 2
+        store = AgentStore([_DemoEnemy((x, y)) for y, x in starts], tile_size, 3, (32, 32))
+        ticks = 200
+        start_time = time.perf_counter()
+        for _ in range(ticks):
+            store.step(flow_field, grid.shape)
+        per_tick = (time.perf_counter() - start_time) / ticks
+        print(f"{num_agents} enemigos: {per_tick * 1000:.3f} ms por tick")
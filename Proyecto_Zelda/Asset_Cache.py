@@ -0,0 +1,72 @@
+# Asset_Cache.py
+
+import os
+import pygame
+
+# Carpeta de las imágenes, relativa al directorio desde el que se lanza el juego
+IMAGE_DIR = 'imagenes'
+# Copias ya escaladas de las imágenes entre ejecuciones (None = decodificar siempre el original).
+# Algunos originales son enormes (enemigo.png mide 2500x2500) y decodificarlos domina el arranque.
+DISK_CACHE_DIR = '.asset_cache'
+
+# (archivo, tamaño, con transparencia) -> superficie ya convertida y escalada
+_IMAGE_CACHE = {}
+
+
+def load_image(file_name, size, alpha=True):
+    """
+    Carga una imagen de IMAGE_DIR, la convierte al formato de la pantalla y la escala.
+
+    Cada combinación se decodifica una sola vez por proceso: todas las entidades y tiles que la
+    piden comparten la misma superficie, así que no debe modificarse (dibujar sobre ella, etc.).
+    Necesita que la pantalla ya exista (pygame.display.set_mode), igual que convert().
+
+    Entre ejecuciones, la versión escalada se guarda en DISK_CACHE_DIR y se usa mientras el
+    original no cambie (mismo tamaño y fecha de modificación).
+
+    Args:
+        file_name (str): Nombre del archivo dentro de IMAGE_DIR (por ejemplo, 'enemigo.png').
+        size (tuple): (ancho, alto) final en píxeles.
+        alpha (bool): True para conservar la transparencia (convert_alpha), False para convert.
+
+    Returns:
+        pygame.Surface: La superficie compartida.
+    """
+    key = (file_name, tuple(size), alpha)
+    image = _IMAGE_CACHE.get(key)
+    if image is None:
+        image = _load_scaled(file_name, key[1])
+        image = image.convert_alpha() if alpha else image.convert()
+        _IMAGE_CACHE[key] = image
+    return image
+
+
+def _load_scaled(file_name, size):
+    """Devuelve la imagen original escalada, usando (y llenando) la copia en disco si está activa."""
+    source_path = os.path.join(IMAGE_DIR, file_name)
+    cached_path = None
+    if DISK_CACHE_DIR is not None:
+        stat = os.stat(source_path)
+        name, _ = os.path.splitext(file_name)
+        cached_path = os.path.join(DISK_CACHE_DIR, f"{name}_{size[0]}x{size[1]}_{stat.st_size}_{stat.st_mtime_ns}.png")
+        if os.path.exists(cached_path):
+            try:
+                return pygame.image.load(cached_path)
+            except pygame.error:
+                pass  # Copia dañada: se vuelve a generar
+
+    image = pygame.transform.scale(pygame.image.load(source_path).convert_alpha(), size)
+    if cached_path is not None:
+        try:
+            os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+            temporary_path = f"{cached_path}.{os.getpid()}.tmp.png"
+            pygame.image.save(image, temporary_path)
+            os.replace(temporary_path, cached_path)
+        except (OSError, pygame.error) as error:
+            print(f"Advertencia: no se pudo guardar la imagen escalada {cached_path} ({error}).")
+    return image
+
+
+def clear_image_cache():
+    """Descarta las superficies guardadas en memoria (por ejemplo, tras cambiar el modo de pantalla)."""
+    _IMAGE_CACHE.clear()
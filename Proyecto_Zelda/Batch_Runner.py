@@ -0,0 +1,405 @@
+# Batch_Runner.py
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from Flow_Field import bfs_distances, UNREACHABLE
+from Map_Format import MapFile, load_map, map_from_ascii, occupancy_from_tiles
+from Model_Cache import ModelCache
+from Training_Orchestrator import TrainingOrchestrator, training_jobs
+
+# Variantes de modelo: cambios de Settings que se aplican a los episodios de cada una
+MODEL_PRESETS = {
+    'astar': {'use_learned_policy': False},  # Rutas con A*/D* Lite (o el campo de flujo, si está activado)
+    'politica': {'use_learned_policy': True},  # Movimiento con los modelos entrenados (Learned_Policy.py)
+}
+
+# Tiles que la semilla de cada episodio puede desplazar a cada enemigo de su posición de inicio (ver
+# jitter_spawns). Sin desplazamiento, dos semillas con los mismos enemigos juegan la misma partida:
+# sin ventana todo es determinista y los modelos usan settings.training_seed, no la del episodio.
+SPAWN_JITTER = 2
+
+# Estado de cada proceso trabajador (ver _init_worker)
+_worker_state = {}
+
+
+class Episode:
+    """Una partida del lote: mapa, semilla, número de enemigos y variante de modelo."""
+
+    def __init__(self, map_spec, seed, num_enemies=None, model='astar', spawn_jitter=SPAWN_JITTER):
+        """
+        Args:
+            map_spec (str): Mapa (ver load_map_spec).
+            seed (int): Semilla de la partida (settings.random_seed) y de la colocación de enemigos.
+            num_enemies (int | None): Enemigos de la partida; None = los del mapa.
+            model (str): Variante de MODEL_PRESETS.
+            spawn_jitter (int): Tiles que la semilla puede desplazar a cada enemigo (0 = no se mueven).
+        """
+        if model not in MODEL_PRESETS:
+            raise ValueError(f"Variante de modelo desconocida: {model!r}. Opciones: {', '.join(MODEL_PRESETS)}")
+        self.map_spec = map_spec
+        self.seed = seed
+        self.num_enemies = num_enemies
+        self.model = model
+        self.spawn_jitter = spawn_jitter
+
+    def to_dict(self):
+        return {'mapa': self.map_spec, 'semilla': self.seed, 'enemigos': self.num_enemies, 'modelo': self.model}
+
+    def map_source(self, map_file):
+        """El mapa de la partida: map_file con los enemigos que eligen su número y su semilla."""
+        map_source = with_enemy_count(map_file, self.num_enemies, self.seed)
+        if self.spawn_jitter > 0:
+            map_source = jitter_spawns(map_source, self.spawn_jitter, self.seed)
+        return map_source
+
+
+def load_map_spec(spec):
+    """
+    Carga un mapa a partir de su descripción.
+
+    Args:
+        spec (str): 'base' (Mapa.MAP_DATA), un mapa generado 'tipo:ANCHOxALTO[:semilla]' (ver
+                    Map_Generator.MAP_KINDS) o la ruta de un archivo .zmap.
+
+    Returns:
+        MapFile: El mapa.
+    """
+    if spec == 'base':
+        from Mapa import MAP_DATA
+        return map_from_ascii(MAP_DATA)
+    if spec.endswith('.zmap'):
+        return load_map(spec)
+
+    from Map_Generator import generate_map
+    parts = spec.split(':')
+    try:
+        kind = parts[0]
+        width, height = (int(value) for value in parts[1].split('x'))
+        seed = int(parts[2]) if len(parts) > 2 else 0
+    except (IndexError, ValueError):
+        raise ValueError(f"Mapa no válido: {spec!r} (se esperaba 'base', 'tipo:ANCHOxALTO[:semilla]' o un .zmap)")
+    return map_from_ascii(generate_map(kind, width, height, seed))
+
+
+def with_enemy_count(map_file, num_enemies, seed, min_distance=6):
+    """
+    Devuelve una copia del mapa con num_enemies enemigos.
+
+    Si el mapa tiene más, se eligen num_enemies de ellos al azar; si tiene menos, se conservan y
+    el resto aparece en tiles libres alcanzables por el jugador a al menos min_distance pasos de él.
+    """
+    tiles = np.array(map_file.tiles)  # Copia: cada partida puede cambiar sus tiles (Map.set_tile_blocked)
+    spawns = map_file.enemies
+    if num_enemies is None:
+        return MapFile(tiles, map_file.player, map_file.goal, spawns)
+
+    rng = np.random.default_rng(seed)
+    if num_enemies <= len(spawns):
+        chosen = np.sort(rng.choice(len(spawns), num_enemies, replace=False))
+        return MapFile(tiles, map_file.player, map_file.goal, spawns[chosen])
+
+    distances = _player_distances(tiles, map_file.player)
+    cols = tiles.shape[1]
+    candidates = np.flatnonzero((distances >= min_distance) & (distances != UNREACHABLE))
+    taken = set((spawns[:, 1] * cols + spawns[:, 0]).tolist())
+    candidates = np.array([index for index in candidates.tolist() if index not in taken], dtype=np.int64)
+    extra = rng.choice(candidates, min(num_enemies - len(spawns), len(candidates)), replace=False)
+    new_spawns = np.column_stack((extra % cols, extra // cols))
+    return MapFile(tiles, map_file.player, map_file.goal, np.concatenate((spawns, new_spawns)))
+
+
+def _player_distances(tiles, player):
+    """Distancia en pasos de cada tile (índice plano) a la aparición del jugador, o UNREACHABLE."""
+    grid = occupancy_from_tiles(tiles)
+    rows, cols = grid.shape
+    player_col, player_row = player
+    return np.array(bfs_distances(grid.ravel().tolist(), rows, cols, player_row * cols + player_col))
+
+
+def jitter_spawns(map_file, radius, seed, min_distance=6):
+    """
+    Devuelve una copia del mapa con cada enemigo movido a un tile al azar a como mucho radius tiles
+    (en cada eje) de su aparición.
+
+    El tile nuevo es libre, alcanzable por el jugador, no lo ocupa otro enemigo y está a al menos
+    min_distance pasos del jugador (o a los que ya estaba, si el mapa lo pone más cerca). Si
+    ninguno cumple, el enemigo se queda donde estaba.
+    """
+    tiles = np.array(map_file.tiles)
+    spawns = map_file.enemies.copy()
+    if len(spawns) == 0:
+        return MapFile(tiles, map_file.player, map_file.goal, spawns)
+
+    rng = np.random.default_rng((seed, 1))  # Otra secuencia que la de with_enemy_count
+    distances = _player_distances(tiles, map_file.player)
+    rows, cols = tiles.shape
+    taken = set((spawns[:, 1] * cols + spawns[:, 0]).tolist())
+    for enemy, (col, row) in enumerate(spawns.tolist()):
+        near_cols, near_rows = np.meshgrid(np.arange(max(col - radius, 0), min(col + radius + 1, cols)),
+                                           np.arange(max(row - radius, 0), min(row + radius + 1, rows)))
+        candidates = (near_rows * cols + near_cols).ravel()
+        spawn_distance = distances[row * cols + col]
+        wanted = min_distance if spawn_distance == UNREACHABLE else min(min_distance, spawn_distance)
+        candidates = [index for index in candidates[(distances[candidates] >= wanted)
+                                                    & (distances[candidates] != UNREACHABLE)].tolist()
+                      if index not in taken]
+        if not candidates:
+            continue
+        index = candidates[rng.integers(len(candidates))]
+        taken.discard(row * cols + col)
+        taken.add(index)
+        spawns[enemy] = (index % cols, index // cols)
+    return MapFile(tiles, map_file.player, map_file.goal, spawns)
+
+
+def unique_episodes(episodes):
+    """
+    Quita los episodios que repetirían una partida anterior del lote: mismo mapa, misma variante y
+    los mismos enemigos en los mismos tiles (la semilla no cambia nada más de la partida).
+
+    Returns:
+        tuple: (episodios sin repetir, número de episodios quitados).
+    """
+    maps = {}
+    seen = set()
+    unique = []
+    for episode in episodes:
+        if episode.map_spec not in maps:
+            maps[episode.map_spec] = load_map_spec(episode.map_spec)
+        spawns = episode.map_source(maps[episode.map_spec]).enemies
+        key = (episode.map_spec, episode.model, spawns.tobytes())
+        if key not in seen:
+            seen.add(key)
+            unique.append(episode)
+    return unique, len(episodes) - len(unique)
+
+
+class SharedModelCache(ModelCache):
+    """
+    ModelCache que además conserva en memoria los modelos ya cargados: cada trabajador lee un
+    modelo del disco una sola vez y todas sus partidas comparten el mismo objeto.
+    """
+
+    def __init__(self, directory, max_bytes):
+        super().__init__(directory, max_bytes)
+        self.loaded = {}  # clave -> (modelo, escalador)
+
+    def load(self, key):
+        cached = self.loaded.get(key)
+        if cached is None:
+            cached = super().load(key)
+            if cached is not None:
+                self.loaded[key] = cached
+        return cached
+
+    def store(self, key, model, scaler):
+        super().store(key, model, scaler)
+        self.loaded[key] = (model, scaler)
+
+
+def _make_settings(overrides, episode=None):
+    from Settings import Settings
+    settings = Settings()
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    if episode is not None:
+        for name, value in MODEL_PRESETS[episode.model].items():
+            setattr(settings, name, value)
+        settings.random_seed = episode.seed
+    settings.headless = True
+    return settings
+
+
+def pretrain_models(map_specs, overrides):
+    """
+    Entrena (o encuentra en la caché de disco) los modelos de cada mapa antes de lanzar el lote,
+    para que ningún trabajador entrene: todos los cargan de la caché (ver SharedModelCache).
+
+    Los episodios entrenan con settings.training_seed, no con su propia semilla, así que la clave
+    de la caché (que incluye la semilla) es la misma aquí y en todos ellos.
+    """
+    settings = _make_settings(overrides)
+    model_cache = ModelCache(settings.model_cache_dir, settings.model_cache_max_mb * 1024 * 1024)
+    for spec in map_specs:
+        map_file = load_map_spec(spec)
+        trainer = TrainingOrchestrator(occupancy_from_tiles(map_file.tiles), settings.tile_size,
+                                       map_file.width * settings.tile_size, map_file.height * settings.tile_size,
+                                       settings.training_processes, model_cache)
+        print(f"Modelos para el mapa {spec}:")
+        trainer.run(training_jobs(settings), settings.training_seed)
+
+
+def _init_worker(overrides):
+    # Sin ventana ni audio en los trabajadores
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    settings = _make_settings(overrides)
+    _worker_state['overrides'] = overrides
+    _worker_state['model_cache'] = SharedModelCache(settings.model_cache_dir, settings.model_cache_max_mb * 1024 * 1024)
+    _worker_state['maps'] = {}  # descripción -> MapFile
+
+
+def _run_episode(episode):
+    """Juega un episodio sin ventana en un trabajador y devuelve su resultado (un error no detiene el lote)."""
+    from main import ZeldaLikeGame
+
+    start_time = time.perf_counter()
+    record = episode.to_dict()
+    try:
+        maps = _worker_state['maps']
+        if episode.map_spec not in maps:
+            maps[episode.map_spec] = load_map_spec(episode.map_spec)
+        map_source = episode.map_source(maps[episode.map_spec])
+        settings = _make_settings(_worker_state['overrides'], episode)
+
+        # La salida de cada partida (entrenamiento, resultado, caché) no se muestra
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = ZeldaLikeGame(headless=True, settings=settings, map_source=map_source)
+            game.trainer.model_cache = _worker_state['model_cache']
+            result = game.run_headless()
+        record.update(enemigos=len(map_source.enemies), resultado=result['result'], ticks=result['ticks'],
+                      rutas_pedidas=game.path_service.requests_made, segundos_simulacion=result['seconds'],
+                      modelos_de_cache=sum('cache' in timings for timings in game.trainer.timings.values()))
+    except Exception:
+        record.update(resultado='error', error=traceback.format_exc())
+    record['segundos_episodio'] = time.perf_counter() - start_time
+    record['pid'] = os.getpid()
+    return record
+
+
+def aggregate(records):
+    """
+    Resume los episodios por (mapa, modelo, enemigos).
+
+    Returns:
+        dict: 'mapa|modelo|enemigos' -> episodios, resultados, tasa de victorias y medias y
+              percentiles de ticks, rutas pedidas y tiempo.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(f"{record['mapa']}|{record['modelo']}|{record['enemigos']}", []).append(record)
+
+    summary = {}
+    for key, group in sorted(groups.items()):
+        finished = [record for record in group if record['resultado'] != 'error']
+        outcomes = [record['resultado'] for record in group]
+        entry = {
+            'episodios': len(group),
+            'ganados': outcomes.count('ganado'),
+            'perdidos': outcomes.count('perdido'),
+            'sin_terminar': outcomes.count('sin terminar'),
+            'errores': outcomes.count('error'),
+            'tasa_victoria': outcomes.count('ganado') / len(group),
+        }
+        if finished:
+            ticks = np.array([record['ticks'] for record in finished])
+            entry.update(ticks_media=float(ticks.mean()), ticks_p50=float(np.percentile(ticks, 50)),
+                         ticks_p95=float(np.percentile(ticks, 95)),
+                         rutas_pedidas_media=float(np.mean([record['rutas_pedidas'] for record in finished])),
+                         segundos_simulacion_media=float(np.mean([record['segundos_simulacion'] for record in finished])),
+                         segundos_episodio_media=float(np.mean([record['segundos_episodio'] for record in finished])))
+        summary[key] = entry
+    return summary
+
+
+def run_batch(episodes, output_path, num_processes, overrides=None):
+    """
+    Reparte los episodios en un pool de procesos y guarda los resultados.
+
+    Cada resultado se escribe en cuanto llega en <salida>.episodios.jsonl (una línea JSON por
+    episodio) y, al terminar, el resumen por grupo y el rendimiento total en output_path (JSON).
+    Los episodios que repetirían la partida de otro (ver unique_episodes) no se juegan, para que
+    las tasas y los percentiles no se calculen sobre copias.
+
+    Args:
+        episodes (list[Episode]): Episodios a jugar.
+        output_path (str): Archivo JSON del resumen.
+        num_processes (int): Procesos trabajadores.
+        overrides (dict | None): Cambios de Settings para todos los episodios. training_seed no
+                                 puede ser None: todo el lote usa los mismos modelos.
+
+    Returns:
+        dict: El resumen guardado.
+    """
+    overrides = dict(overrides or {})
+    overrides.setdefault('use_model_cache', True)
+    if _make_settings(overrides).training_seed is None:
+        raise ValueError("El lote necesita una semilla de entrenamiento fija (settings.training_seed)")
+    episodes, repeated = unique_episodes(episodes)
+    if repeated:
+        print(f"Aviso: {repeated} episodios repetían la partida de otro (mismo mapa, variante y enemigos en "
+              f"los mismos tiles) y no se juegan; use --spawn-jitter o --enemies para que la semilla cambie más")
+    pretrain_models(sorted({episode.map_spec for episode in episodes}), overrides)
+
+    stream_path = f"{output_path.rsplit('.', 1)[0]}.episodios.jsonl"
+    records = []
+    start_time = time.perf_counter()
+    context = multiprocessing.get_context('spawn')
+    with open(stream_path, 'w', encoding='utf-8') as stream, \
+            ProcessPoolExecutor(max_workers=num_processes, mp_context=context, initializer=_init_worker,
+                                initargs=(overrides,)) as executor:
+        futures = [executor.submit(_run_episode, episode) for episode in episodes]
+        for record in (future.result() for future in as_completed(futures)):
+            stream.write(json.dumps(record) + '\n')
+            stream.flush()
+            records.append(record)
+            if record['resultado'] == 'error':
+                print(f"Error en el episodio {record['mapa']} (semilla {record['semilla']}):\n{record['error']}")
+            if len(records) % 10 == 0 or len(records) == len(episodes):
+                print(f"  {len(records)}/{len(episodes)} episodios ({time.perf_counter() - start_time:.1f} s)")
+    elapsed = time.perf_counter() - start_time
+
+    summary = {
+        'episodios': len(records),
+        'procesos': num_processes,
+        'segundos': elapsed,
+        'episodios_por_segundo': len(records) / elapsed if elapsed > 0 else 0.0,
+        'grupos': aggregate(records),
+    }
+    with open(output_path, 'w', encoding='utf-8') as summary_output:
+        json.dump(summary, summary_output, indent=1)
+    return summary
+
+
+if __name__ == '__main__':
+    # Por ejemplo: python Batch_Runner.py resultados.json --maps base abierto:64x64:1 --seeds 20 \
+    #              --enemies 3 7 15 --models astar politica --processes 4
+    parser = argparse.ArgumentParser(description="Juega muchas partidas sin ventana en paralelo y resume los resultados.")
+    parser.add_argument('output', help="Archivo JSON del resumen (los episodios van a <salida>.episodios.jsonl)")
+    parser.add_argument('--maps', nargs='+', default=['base'], help="'base', 'tipo:ANCHOxALTO[:semilla]' o archivos .zmap")
+    parser.add_argument('--seeds', type=int, default=10, help="Semillas por combinación")
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('--enemies', nargs='+', type=int, help="Números de enemigos (por defecto, los del mapa)")
+    parser.add_argument('--spawn-jitter', type=int, default=SPAWN_JITTER,
+                        help="Tiles que cada semilla puede desplazar a cada enemigo (0 = donde los pone el mapa)")
+    parser.add_argument('--models', nargs='+', default=['astar'], choices=list(MODEL_PRESETS))
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-ticks', type=int, help="Límite de ticks por partida (settings.headless_max_ticks)")
+    parser.add_argument('--training-seed', type=int, help="Semilla de los modelos de todo el lote (settings.training_seed)")
+    args = parser.parse_args()
+
+    batch = [Episode(map_spec, seed, num_enemies, model, args.spawn_jitter)
+             for map_spec, model, num_enemies, seed in itertools.product(
+                 args.maps, args.models, args.enemies or [None],
+                 range(args.first_seed, args.first_seed + args.seeds))]
+    settings_overrides = {}
+    if args.max_ticks is not None:
+        settings_overrides['headless_max_ticks'] = args.max_ticks
+    if args.training_seed is not None:
+        settings_overrides['training_seed'] = args.training_seed
+    print(f"Jugando {len(batch)} episodios en {args.processes} procesos...")
+    batch_summary = run_batch(batch, args.output, args.processes, settings_overrides)
+    print(f"{batch_summary['episodios']} episodios en {batch_summary['segundos']:.1f} s "
+          f"({batch_summary['episodios_por_segundo']:.2f} episodios/s)")
+    for group, entry in batch_summary['grupos'].items():
+        ticks = f", ticks p50 {entry['ticks_p50']:.0f}" if 'ticks_p50' in entry else ''
+        print(f"  {group}: {entry['ganados']}/{entry['episodios']} ganados, {entry['perdidos']} perdidos{ticks}")
@@ -0,0 +1,182 @@
+# D_Star_Lite.py
+
+import heapq
+
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    Planificador incremental D* Lite sobre índices planos de tiles (movimiento en 4 direcciones).
+
+    La búsqueda se hace desde la meta hacia el inicio, así que el árbol de búsqueda sigue siendo
+    válido cuando la entidad se mueve. Entre consultas solo hay que indicarle qué tiles cambiaron
+    de estado (libre/bloqueado): el planificador repara la parte afectada del árbol en lugar de
+    empezar de cero, y el coste de cada replanificación depende de cuánto cambió, no del tamaño
+    del mapa.
+
+    Igual que en A*, un tile bloqueado no se puede pisar, pero se puede salir de él (el inicio
+    puede estar dentro de una zona de peligro).
+    """
+
+    def __init__(self, occupancy_grid, goal):
+        """
+        Args:
+            occupancy_grid (np.ndarray): Cuadrícula de ocupación inicial (se copia).
+            goal (int): Índice plano del tile meta (fijo durante la vida del planificador).
+        """
+        self.rows, self.cols = occupancy_grid.shape
+        self.size = self.rows * self.cols
+        self.blocked = bytearray(occupancy_grid.tobytes())
+        self.goal = goal
+
+        self.g = [INF] * self.size
+        self.rhs = [INF] * self.size
+        self.rhs[goal] = 0
+        self.km = 0
+        self.last_start = -1
+
+        # Cola de prioridad con borrado perezoso: una entrada solo es válida si su clave
+        # coincide con la registrada en queued_keys para ese tile.
+        self.queue = []
+        self.queued_keys = {}
+        # La clave real de la meta depende del inicio; (0, 0) es una cota inferior válida y se
+        # corrige al desencolarla en la primera consulta.
+        self._push(goal, (0, 0))
+
+        self.nodes_expanded = 0  # Nodos expandidos en la última consulta
+
+    # --- Utilidades internas ---
+
+    def _heuristic(self, a, b):
+        a_row, a_col = divmod(a, self.cols)
+        b_row, b_col = divmod(b, self.cols)
+        return abs(a_row - b_row) + abs(a_col - b_col)
+
+    def _neighbors(self, index):
+        cols = self.cols
+        row, col = divmod(index, cols)
+        if row > 0:
+            yield index - cols
+        if row < self.rows - 1:
+            yield index + cols
+        if col > 0:
+            yield index - 1
+        if col < cols - 1:
+            yield index + 1
+
+    def _key(self, index, start):
+        best = min(self.g[index], self.rhs[index])
+        return (best + self._heuristic(index, start) + self.km, best)
+
+    def _push(self, index, key):
+        self.queued_keys[index] = key
+        heapq.heappush(self.queue, (key[0], key[1], index))
+
+    def _top(self):
+        """Devuelve (clave, tile) de la entrada válida con menor clave, o (None, -1) si la cola está vacía."""
+        queue = self.queue
+        while queue:
+            k1, k2, index = queue[0]
+            if self.queued_keys.get(index) == (k1, k2):
+                return (k1, k2), index
+            heapq.heappop(queue)
+        return None, -1
+
+    def _update_vertex(self, index, start):
+        if index != self.goal:
+            best = INF
+            g = self.g
+            blocked = self.blocked
+            for neighbor in self._neighbors(index):
+                if not blocked[neighbor]:
+                    cost = g[neighbor] + 1
+                    if cost < best:
+                        best = cost
+            self.rhs[index] = best
+        self.queued_keys.pop(index, None)
+        if self.g[index] != self.rhs[index]:
+            self._push(index, self._key(index, start))
+
+    def _compute_shortest_path(self, start):
+        expanded = 0
+        g = self.g
+        rhs = self.rhs
+        while True:
+            top_key, index = self._top()
+            if index == -1:
+                break
+            if not (top_key < self._key(start, start) or rhs[start] != g[start]):
+                break
+
+            new_key = self._key(index, start)
+            if top_key < new_key:
+                self._push(index, new_key)
+                continue
+
+            expanded += 1
+            del self.queued_keys[index]
+            heapq.heappop(self.queue)
+            if g[index] > rhs[index]:
+                g[index] = rhs[index]
+                for neighbor in self._neighbors(index):
+                    self._update_vertex(neighbor, start)
+            else:
+                g[index] = INF
+                self._update_vertex(index, start)
+                for neighbor in self._neighbors(index):
+                    self._update_vertex(neighbor, start)
+        self.nodes_expanded = expanded
+
+    # --- Interfaz pública ---
+
+    def plan(self, start, changes=()):
+        """
+        Aplica los cambios de la cuadrícula y devuelve la ruta desde start hasta la meta.
+
+        Args:
+            start (int): Índice plano del tile actual de la entidad.
+            changes (iterable): Pares (índice, bloqueado) de los tiles que cambiaron de estado
+                                desde la consulta anterior. Los que no cambian se ignoran.
+
+        Returns:
+            list[int]: Índices de tiles desde start hasta la meta, o lista vacía si no hay ruta.
+        """
+        if self.last_start != -1 and self.last_start != start:
+            # Las claves ya encoladas se calcularon respecto al inicio anterior
+            self.km += self._heuristic(self.last_start, start)
+        self.last_start = start
+
+        blocked = self.blocked
+        for index, is_blocked in changes:
+            if bool(blocked[index]) == bool(is_blocked):
+                continue
+            blocked[index] = 1 if is_blocked else 0
+            # Cambia el coste de entrar en 'index', que afecta al rhs de sus vecinos
+            for neighbor in self._neighbors(index):
+                self._update_vertex(neighbor, start)
+
+        self._compute_shortest_path(start)
+        return self._extract_path(start)
+
+    def _extract_path(self, start):
+        """Sigue el gradiente de g desde start hasta la meta."""
+        g = self.g
+        blocked = self.blocked
+        if g[start] == INF and start != self.goal:
+            return []
+
+        path = [start]
+        current = start
+        while current != self.goal and len(path) <= self.size:
+            best = INF
+            best_neighbor = -1
+            for neighbor in self._neighbors(current):
+                if not blocked[neighbor] and g[neighbor] + 1 < best:
+                    best = g[neighbor] + 1
+                    best_neighbor = neighbor
+            if best_neighbor == -1:
+                return []
+            path.append(best_neighbor)
+            current = best_neighbor
+        return path if current == self.goal else []
@@ -3,25 +3,26 @@
 import pygame
 import numpy as np
 from A_Star_Pathfinder import get_path, d
-from Utils import gen_next_route, d, snap_to_grid
-import threading
+from Utils import gen_next_route, d, snap_to_grid, MovementBuffer
+from Asset_Cache import load_image
 
 
 class Enemy(pygame.sprite.Sprite):
     def __init__(self, game, position, initial_target_pos):
         super().__init__()
         self.game = game
-        self.image = pygame.image.load('imagenes/enemigo.png').convert_alpha()
-        self.image = pygame.transform.scale(self.image, game.settings.enemy_size)
+        self.image = load_image('enemigo.png', game.settings.enemy_size)  # Compartida por todos los enemigos
         self.rect = self.image.get_rect(center=position)
         self.position = np.array(position, dtype=float)
 
         self.ia_model = None
         self.scaler = None
         self.path = []
-        self.path_positions = []
+        self.path_positions = MovementBuffer()
         self.recalculating = False
-        self.last_path_update_time = pygame.time.get_ticks()
+        # True mientras la política aprendida mueve a la entidad (ver Learned_Policy.PolicyStep)
+        self.policy_controlled = False
+        self.last_path_update_time = self.game.get_time()
         ### CAMBIO: self.graph_nodes ya no es necesario.
         # self.graph_nodes = None
 
@@ -33,12 +34,22 @@ class Enemy(pygame.sprite.Sprite):
         self.decide_move(player_position, walls)
 
         if self.path_positions:
-            next_pos = self.path_positions.pop(0)
-            self.position = next_pos
+            self.position[:] = self.path_positions.pop()
             self.rect.center = self.position
 
     def decide_move(self, target_position, walls):
-        current_time = pygame.time.get_ticks()
+        if self.policy_controlled:
+            return
+
+        # Modo campo de flujo: seguir el campo compartido hacia el jugador (sin A* propio).
+        if self.game.settings.enemy_use_flow_field:
+            if not self.path_positions:
+                self.path = self.game.flow_field.get_path(self.position, max_steps=5)
+                if self.path:
+                    gen_next_route(self, self.game.settings.enemy_speed, m=len(self.path))
+            return
+
+        current_time = self.game.get_time()
 
         recalculate_needed = (
                     current_time - self.last_path_update_time > self.game.settings.enemy_recalculate_path_interval or
@@ -46,22 +57,29 @@ class Enemy(pygame.sprite.Sprite):
                     d(self.position, target_position) < self.game.settings.tile_size / 2)
 
         if recalculate_needed and not self.recalculating:
-            threading.Thread(target=self.calculate_path_async, args=(target_position, walls)).start()
+            # Inicio y destino se toman ahora (no desde el trabajador, que los leería ya movidos).
+            start_pos = snap_to_grid(self.position, self.game.settings.tile_size)
+            end_pos = snap_to_grid(target_position, self.game.settings.tile_size)
+            self.recalculating = True
+            self.game.path_service.request(self, self.calculate_path_async, start_pos, end_pos, walls,
+                                           self.game.map.obstacle_version(), len(self.game.map.tile_change_log))
             self.last_path_update_time = current_time
 
         if self.path and not self.path_positions:
             gen_next_route(self, self.game.settings.enemy_speed, m=5)
 
     ### CAMBIO: La firma del método y la llamada a get_path se actualizan.
-    def calculate_path_async(self, target_position, walls):
-        self.recalculating = True
-
-        start_pos = snap_to_grid(self.position, self.game.settings.tile_size)
-        end_pos = snap_to_grid(target_position, self.game.settings.tile_size)
-
-        # La llamada a get_path usa la nueva firma (solo necesita la lista de obstáculos).
-        path = get_path(self.game, start_pos, end_pos, walls)
-
+    def calculate_path_async(self, start_pos, end_pos, walls, obstacles_version=None, log_position=None):
+        """Se ejecuta en un trabajador del PathService; solo calcula, no modifica al enemigo."""
+        # La llamada a get_path usa la nueva firma (solo necesita la cuadrícula de ocupación).
+        # Con la versión de los obstáculos, enemigos cercanos comparten rutas de la caché.
+        if self.game.path_pool is not None:
+            return self.game.path_pool.get_path(start_pos, end_pos, version=obstacles_version,
+                                                log_position=log_position)
+        return get_path(self.game, start_pos, end_pos, walls, version=obstacles_version)
+
+    def on_path_ready(self, path):
+        """Recibe en el hilo principal la ruta de la última petición (PathService.deliver)."""
         if path:
             self.path = path
 
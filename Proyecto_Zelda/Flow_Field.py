@@ -0,0 +1,193 @@
+# Flow_Field.py
+
+from collections import deque
+import numpy as np
+from Grid import flat_view, pos_to_index, index_to_pos
+
+# Distancia de los tiles que no pueden alcanzar el objetivo
+UNREACHABLE = -1
+
+
+def bfs_distances(blocked, rows, cols, target):
+    """
+    Calcula la distancia en tiles de todos los tiles al objetivo con una BFS (coste uniforme).
+
+    Args:
+        blocked: Secuencia plana indexable por tile; un valor distinto de cero es un obstáculo.
+        rows (int): Número de filas de la cuadrícula.
+        cols (int): Número de columnas de la cuadrícula.
+        target (int): Índice plano del tile objetivo.
+
+    Returns:
+        list[int]: Distancia de cada tile al objetivo, o UNREACHABLE si no hay camino.
+    """
+    size = rows * cols
+    distances = [UNREACHABLE] * size
+    distances[target] = 0
+    queue = deque([target])
+    popleft = queue.popleft
+    append = queue.append
+
+    while queue:
+        current = popleft()
+        next_distance = distances[current] + 1
+        row, col = divmod(current, cols)
+
+        if row > 0:
+            neighbor = current - cols
+            if distances[neighbor] == UNREACHABLE and not blocked[neighbor]:
+                distances[neighbor] = next_distance
+                append(neighbor)
+        if row < rows - 1:
+            neighbor = current + cols
+            if distances[neighbor] == UNREACHABLE and not blocked[neighbor]:
+                distances[neighbor] = next_distance
+                append(neighbor)
+        if col > 0:
+            neighbor = current - 1
+            if distances[neighbor] == UNREACHABLE and not blocked[neighbor]:
+                distances[neighbor] = next_distance
+                append(neighbor)
+        if col < cols - 1:
+            neighbor = current + 1
+            if distances[neighbor] == UNREACHABLE and not blocked[neighbor]:
+                distances[neighbor] = next_distance
+                append(neighbor)
+
+    return distances
+
+
+class FlowField:
+    """
+    Campo de distancias compartido hacia un objetivo (el jugador).
+
+    Se recalcula con una sola BFS cuando el objetivo cambia de tile o cambian los obstáculos, y
+    cada enemigo lo sigue por descenso en O(1) por paso. Así el coste por tick no depende del
+    número de enemigos.
+    """
+
+    def __init__(self, tile_size):
+        self.tile_size = tile_size
+        self.distances = None
+        self.distance_array = None  # Las mismas distancias como arreglo, para next_indices
+        self.target_index = -1
+        self.occupancy_grid = None
+        self.obstacles_version = None
+        self.rows = 0
+        self.cols = 0
+
+    def update(self, target_position, occupancy_grid, obstacles_version=None):
+        """
+        Recalcula el campo si el objetivo cambió de tile, si la cuadrícula es otra o si cambió su versión.
+
+        Args:
+            target_position (tuple/list/np.ndarray): Posición del objetivo en píxeles.
+            occupancy_grid (np.ndarray): Cuadrícula de ocupación estática del mapa.
+            obstacles_version (tuple | None): Versión de los obstáculos (Map.obstacle_version). La
+                                              cuadrícula se modifica en el sitio al bloquear o liberar
+                                              un tile, así que sin ella esos cambios no se detectan.
+
+        Returns:
+            bool: True si el campo se recalculó en esta llamada.
+        """
+        target_index = pos_to_index(target_position, self.tile_size, occupancy_grid.shape)
+        if (target_index == self.target_index and occupancy_grid is self.occupancy_grid
+                and obstacles_version == self.obstacles_version):
+            return False
+
+        self.rows, self.cols = occupancy_grid.shape
+        self.occupancy_grid = occupancy_grid
+        self.obstacles_version = obstacles_version
+        self.target_index = target_index
+        self.distance_array = None
+        if target_index == -1:
+            self.distances = None
+        else:
+            self.distances = bfs_distances(flat_view(occupancy_grid), self.rows, self.cols, target_index)
+        return True
+
+    def next_index(self, index):
+        """
+        Devuelve el vecino con menor distancia al objetivo (descenso más pronunciado).
+
+        Args:
+            index (int): Índice plano del tile actual.
+
+        Returns:
+            int: Índice del siguiente tile, o -1 si ya está en el objetivo o no puede alcanzarlo.
+        """
+        distances = self.distances
+        current_distance = distances[index]
+        if current_distance <= 0:
+            return -1
+
+        # Mismo orden de vecinos que A*: arriba, abajo, izquierda, derecha
+        cols = self.cols
+        row, col = divmod(index, cols)
+        wanted = current_distance - 1
+        if row > 0 and distances[index - cols] == wanted:
+            return index - cols
+        if row < self.rows - 1 and distances[index + cols] == wanted:
+            return index + cols
+        if col > 0 and distances[index - 1] == wanted:
+            return index - 1
+        if col < cols - 1 and distances[index + 1] == wanted:
+            return index + 1
+        return -1
+
+    def next_indices(self, indices):
+        """
+        Versión vectorizada de next_index para muchos tiles a la vez (ver Agent_Store.py).
+
+        Args:
+            indices (np.ndarray): Índices planos de los tiles actuales (-1 = fuera de la cuadrícula).
+
+        Returns:
+            np.ndarray: Índice del siguiente tile de cada uno, o -1 igual que next_index.
+        """
+        result = np.full(len(indices), -1, dtype=np.int64)
+        if self.distances is None:
+            return result
+        if self.distance_array is None:
+            self.distance_array = np.array(self.distances, dtype=np.int64)
+        distances = self.distance_array
+
+        inside = indices >= 0
+        current_distance = np.where(inside, distances[np.where(inside, indices, 0)], UNREACHABLE)
+        wanted = current_distance - 1
+        row, col = np.divmod(indices, self.cols)
+        # Se asignan en orden inverso para que gane el primero en el orden de next_index
+        for offset, valid in ((1, col < self.cols - 1), (-1, col > 0),
+                              (self.cols, row < self.rows - 1), (-self.cols, row > 0)):
+            valid &= current_distance > 0
+            neighbors = np.where(valid, indices + offset, 0)
+            matches = valid & (distances[neighbors] == wanted)
+            result[matches] = neighbors[matches]
+        return result
+
+    def get_path(self, start_position, max_steps):
+        """
+        Sigue el campo desde una posición y devuelve una ruta en el formato de get_path.
+
+        Args:
+            start_position (tuple/list/np.ndarray): Posición actual de la entidad en píxeles.
+            max_steps (int): Número máximo de pasos (tiles) a seguir después del tile actual.
+
+        Returns:
+            list[tuple]: Posiciones (x, y) de tiles empezando por el tile actual, o lista vacía
+                         si el campo no existe o el tile no puede alcanzar el objetivo.
+        """
+        if self.distances is None:
+            return []
+
+        index = pos_to_index(start_position, self.tile_size, (self.rows, self.cols))
+        if index == -1 or self.distances[index] == UNREACHABLE:
+            return []
+
+        path = [index_to_pos(index, self.tile_size, self.cols)]
+        for _ in range(max_steps):
+            index = self.next_index(index)
+            if index == -1:
+                break
+            path.append(index_to_pos(index, self.tile_size, self.cols))
+        return path
@@ -0,0 +1,200 @@
+# Grid.py
+
+import hashlib
+import numpy as np
+from Mapa import MURO, BLOQUE
+
+# Valores de la cuadrícula de ocupación
+LIBRE = 0
+OCUPADO = 1
+
+
+def build_occupancy_grid(map_data):
+    """
+    Construye la cuadrícula de ocupación (caminable / bloqueado) a partir del mapa en texto.
+
+    Args:
+        map_data (list[str]): Filas del mapa con los caracteres definidos en Mapa.py.
+
+    Returns:
+        np.ndarray: Arreglo uint8 de forma (filas, columnas) indexado como grid[fila, columna].
+                    OCUPADO (1) para muros y bloques, LIBRE (0) para el resto.
+    """
+    rows = len(map_data)
+    cols = len(map_data[0]) if rows else 0
+    grid = np.zeros((rows, cols), dtype=np.uint8)
+
+    # Las filas más cortas que la primera se consideran libres en la parte que falta,
+    # igual que antes (no había ningún tile ni rect de muro en esas posiciones).
+    for y, row_str in enumerate(map_data):
+        for x, char in enumerate(row_str[:cols]):
+            if char == MURO or char == BLOQUE:
+                grid[y, x] = OCUPADO
+    return grid
+
+
+def hash_grid(grid):
+    """
+    Calcula un identificador de contenido de la cuadrícula (forma y valores).
+
+    Args:
+        grid (np.ndarray): Cuadrícula de ocupación.
+
+    Returns:
+        str: Resumen hexadecimal; dos cuadrículas iguales siempre dan el mismo valor.
+    """
+    digest = hashlib.sha1(repr(grid.shape).encode())
+    digest.update(np.ascontiguousarray(grid, dtype=np.uint8).tobytes())
+    return digest.hexdigest()
+
+
+def hash_tiles(tiles):
+    """
+    Calcula un identificador de contenido de un conjunto de índices de tile (por ejemplo, las
+    zonas de peligro que el jugador estampa sobre los muros).
+
+    Args:
+        tiles (iterable): Índices planos de tiles.
+
+    Returns:
+        str: Resumen hexadecimal; dos conjuntos iguales siempre dan el mismo valor.
+    """
+    return hashlib.sha1(np.array(sorted(tiles), dtype=np.int64).tobytes()).hexdigest()
+
+
+def rect_tile_bounds(rect, tile_size, shape):
+    """
+    Calcula el rango de tiles que un rectángulo (en píxeles) solapa con área positiva.
+
+    Args:
+        rect: Objeto con atributos left, top, right y bottom (por ejemplo, pygame.Rect).
+        tile_size (int): El tamaño de cada tile en la cuadrícula.
+        shape (tuple): Forma (filas, columnas) de la cuadrícula.
+
+    Returns:
+        tuple: (fila_inicio, fila_fin, columna_inicio, columna_fin), con los fines exclusivos
+               y recortados a los límites de la cuadrícula.
+    """
+    rows, cols = shape
+    # Igual que pygame.Rect.colliderect: tocar solo el borde no cuenta como colisión.
+    row_start = max(rect.top // tile_size, 0)
+    row_end = min(-(-rect.bottom // tile_size), rows)
+    col_start = max(rect.left // tile_size, 0)
+    col_end = min(-(-rect.right // tile_size), cols)
+    return row_start, row_end, col_start, col_end
+
+
+def stamp_rects(grid, rects, tile_size):
+    """
+    Estampa obstáculos dinámicos (rects) sobre una copia de la cuadrícula de ocupación.
+
+    La cuadrícula original no se modifica, de modo que cada consulta puede tener su propia capa.
+
+    Args:
+        grid (np.ndarray): Cuadrícula de ocupación estática.
+        rects (list): Rectángulos (en píxeles) a marcar como OCUPADO.
+        tile_size (int): El tamaño de cada tile en la cuadrícula.
+
+    Returns:
+        np.ndarray: La cuadrícula con los obstáculos dinámicos estampados.
+    """
+    if not rects:
+        return grid
+
+    overlay = grid.copy()
+    for rect in rects:
+        row_start, row_end, col_start, col_end = rect_tile_bounds(rect, tile_size, grid.shape)
+        if row_start < row_end and col_start < col_end:
+            overlay[row_start:row_end, col_start:col_end] = OCUPADO
+    return overlay
+
+
+def stamp_tiles(grid, tiles):
+    """
+    Igual que stamp_rects, pero con los tiles ya resueltos a índices planos (ver rect_tiles).
+
+    Es la forma compacta de enviar una capa de obstáculos dinámicos a otro proceso: solo viajan
+    los índices, no la cuadrícula entera.
+
+    Returns:
+        np.ndarray: La cuadrícula con los tiles marcados como OCUPADO (la original si no hay tiles).
+    """
+    if not tiles:
+        return grid
+
+    overlay = grid.copy()
+    overlay.flat[list(tiles)] = OCUPADO
+    return overlay
+
+
+def rect_tiles(rects, tile_size, shape):
+    """
+    Devuelve los índices planos de todos los tiles que solapan alguno de los rectángulos.
+
+    Args:
+        rects (list): Rectángulos en píxeles (por ejemplo, las zonas de peligro de los enemigos).
+        tile_size (int): El tamaño de cada tile en la cuadrícula.
+        shape (tuple): Forma (filas, columnas) de la cuadrícula.
+
+    Returns:
+        set[int]: Índices planos (fila * columnas + columna) de los tiles cubiertos.
+    """
+    cols = shape[1]
+    tiles = set()
+    for rect in rects:
+        row_start, row_end, col_start, col_end = rect_tile_bounds(rect, tile_size, shape)
+        for row in range(row_start, row_end):
+            tiles.update(range(row * cols + col_start, row * cols + col_end))
+    return tiles
+
+
+def flat_view(grid):
+    """
+    Devuelve una vista plana (sin copia) de la cuadrícula, indexable por índice de tile.
+
+    Indexar un memoryview devuelve un int de Python y es bastante más rápido que indexar
+    un np.ndarray elemento a elemento, por eso lo usan los bucles internos de búsqueda.
+
+    Args:
+        grid (np.ndarray): Cuadrícula de ocupación.
+
+    Returns:
+        memoryview: Vista de bytes con grid[fila, columna] en la posición fila * columnas + columna.
+    """
+    return memoryview(np.ascontiguousarray(grid, dtype=np.uint8)).cast('B')
+
+
+def pos_to_index(pos, tile_size, shape):
+    """
+    Convierte una posición en píxeles al índice plano de su tile.
+
+    Args:
+        pos (tuple/list): La posición (x, y) en píxeles.
+        tile_size (int): El tamaño de cada tile en la cuadrícula.
+        shape (tuple): Forma (filas, columnas) de la cuadrícula.
+
+    Returns:
+        int: El índice plano del tile, o -1 si la posición queda fuera de la cuadrícula.
+    """
+    rows, cols = shape
+    col = int(pos[0] // tile_size)
+    row = int(pos[1] // tile_size)
+    if not (0 <= col < cols and 0 <= row < rows):
+        return -1
+    return row * cols + col
+
+
+def index_to_pos(index, tile_size, cols):
+    """
+    Convierte un índice plano de tile a la posición (x, y) de su esquina superior izquierda.
+
+    Args:
+        index (int): El índice plano del tile.
+        tile_size (int): El tamaño de cada tile en la cuadrícula.
+        cols (int): Número de columnas de la cuadrícula.
+
+    Returns:
+        tuple: La posición (x, y) en píxeles, en el mismo formato que devuelve get_path.
+    """
+    row, col = divmod(index, cols)
+    return (col * tile_size, row * tile_size)
@@ -0,0 +1,354 @@
+# HPA_Star.py
+
+import heapq
+import threading
+from collections import deque
+from Grid import flat_view, index_to_pos
+
+# Las entradas más anchas que esto se representan con dos transiciones (una en cada extremo);
+# las más estrechas, con una sola transición en el centro.
+MAX_ENTRANCE_WIDTH = 6
+
+
+class HierarchicalPathfinder:
+    """
+    Búsqueda jerárquica HPA* sobre la cuadrícula de ocupación.
+
+    El mapa se divide en clusters de cluster_size x cluster_size tiles. En cada frontera entre
+    clusters vecinos se colocan transiciones (pares de tiles libres a ambos lados) y dentro de
+    cada cluster se precalculan las distancias entre sus nodos de entrada. Las consultas
+    planifican sobre ese grafo abstracto y solo refinan a nivel de tile los tramos que la
+    entidad va a recorrer (ver LazyPath).
+
+    Cuando un tile cambia (Map.set_tile_blocked), solo se reconstruye su cluster y las
+    fronteras que comparte con sus vecinos.
+    """
+
+    def __init__(self, occupancy_grid, cluster_size):
+        self.occupancy_grid = occupancy_grid
+        self.rows, self.cols = occupancy_grid.shape
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.rows // cluster_size)
+        self.cluster_cols = -(-self.cols // cluster_size)
+
+        self.transitions = {}  # (cluster_a, cluster_b) -> [(tile_a, tile_b), ...]
+        self.inter_edges = {}  # tile -> set de tiles en clusters vecinos (coste 1)
+        self.cluster_nodes = {}  # cluster -> set de tiles de entrada
+        self.intra_edges = {}  # cluster -> {tile: {tile: coste}}
+
+        self.lock = threading.RLock()
+        self.clusters_rebuilt = 0  # Contador de reconstrucciones (para depuración)
+        self.nodes_expanded = 0  # Nodos del grafo abstracto expandidos en la última búsqueda
+
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            for neighbor in self._forward_neighbors(cluster):
+                self._build_border(cluster, neighbor)
+        for cluster in range(self.cluster_rows * self.cluster_cols):
+            self._build_cluster(cluster)
+
+    # --- Geometría de los clusters ---
+
+    def cluster_of(self, index):
+        """Devuelve el cluster al que pertenece un índice de tile."""
+        row, col = divmod(index, self.cols)
+        return (row // self.cluster_size) * self.cluster_cols + col // self.cluster_size
+
+    def _cluster_bounds(self, cluster):
+        """Devuelve (fila_inicio, fila_fin, columna_inicio, columna_fin) del cluster, con fines exclusivos."""
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        row_start = cluster_row * self.cluster_size
+        col_start = cluster_col * self.cluster_size
+        return (row_start, min(row_start + self.cluster_size, self.rows),
+                col_start, min(col_start + self.cluster_size, self.cols))
+
+    def _forward_neighbors(self, cluster):
+        """Clusters a la derecha y debajo (cada frontera se procesa una sola vez)."""
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        neighbors = []
+        if cluster_col + 1 < self.cluster_cols:
+            neighbors.append(cluster + 1)
+        if cluster_row + 1 < self.cluster_rows:
+            neighbors.append(cluster + self.cluster_cols)
+        return neighbors
+
+    def _borders_of(self, cluster):
+        """Todas las fronteras (cluster_a, cluster_b) en las que participa el cluster."""
+        cluster_row, cluster_col = divmod(cluster, self.cluster_cols)
+        borders = [(cluster, neighbor) for neighbor in self._forward_neighbors(cluster)]
+        if cluster_col > 0:
+            borders.append((cluster - 1, cluster))
+        if cluster_row > 0:
+            borders.append((cluster - self.cluster_cols, cluster))
+        return borders
+
+    # --- Construcción del grafo abstracto ---
+
+    def _build_border(self, cluster_a, cluster_b):
+        """Calcula las transiciones de la frontera entre cluster_a y cluster_b (a la derecha o debajo)."""
+        blocked = flat_view(self.occupancy_grid)
+        cols = self.cols
+        row_start, row_end, col_start, col_end = self._cluster_bounds(cluster_a)
+        if cluster_b == cluster_a + 1 and cluster_b % self.cluster_cols != 0:
+            pairs = [(row * cols + col_end - 1, row * cols + col_end) for row in range(row_start, row_end)]
+        else:
+            pairs = [((row_end - 1) * cols + col, row_end * cols + col) for col in range(col_start, col_end)]
+
+        # Cada tramo continuo de tiles libres a ambos lados es una entrada
+        transitions = []
+        segment = []
+        for pair in pairs + [None]:
+            if pair is not None and not blocked[pair[0]] and not blocked[pair[1]]:
+                segment.append(pair)
+                continue
+            if segment:
+                if len(segment) >= MAX_ENTRANCE_WIDTH:
+                    transitions.extend((segment[0], segment[-1]))
+                else:
+                    transitions.append(segment[len(segment) // 2])
+                segment = []
+
+        # Sustituir las aristas entre clusters de la versión anterior de esta frontera
+        for tile_a, tile_b in self.transitions.get((cluster_a, cluster_b), []):
+            self.inter_edges.get(tile_a, set()).discard(tile_b)
+            self.inter_edges.get(tile_b, set()).discard(tile_a)
+        for tile_a, tile_b in transitions:
+            self.inter_edges.setdefault(tile_a, set()).add(tile_b)
+            self.inter_edges.setdefault(tile_b, set()).add(tile_a)
+        self.transitions[(cluster_a, cluster_b)] = transitions
+
+    def _build_cluster(self, cluster):
+        """Recalcula los nodos de entrada del cluster y las distancias entre ellos."""
+        nodes = set()
+        for cluster_a, cluster_b in self._borders_of(cluster):
+            for tile_a, tile_b in self.transitions.get((cluster_a, cluster_b), []):
+                nodes.add(tile_a if cluster_a == cluster else tile_b)
+        self.cluster_nodes[cluster] = nodes
+
+        blocked = flat_view(self.occupancy_grid)
+        edges = {}
+        for node in nodes:
+            distances = self._cluster_distances(node, cluster, blocked)
+            edges[node] = {other: distances[other] for other in nodes if other != node and other in distances}
+        self.intra_edges[cluster] = edges
+        self.clusters_rebuilt += 1
+
+    def update_tile(self, index):
+        """
+        Actualiza el grafo abstracto después de que un tile cambie de estado (libre/bloqueado).
+
+        Solo se recalculan las fronteras del cluster del tile y los clusters cuyos nodos de
+        entrada pueden haber cambiado (el propio y sus vecinos directos).
+        """
+        with self.lock:
+            cluster = self.cluster_of(index)
+            affected = {cluster}
+            for cluster_a, cluster_b in self._borders_of(cluster):
+                self._build_border(cluster_a, cluster_b)
+                affected.update((cluster_a, cluster_b))
+            for affected_cluster in affected:
+                self._build_cluster(affected_cluster)
+
+    # --- Búsquedas locales dentro de un cluster ---
+
+    def _cluster_distances(self, source, cluster, blocked, target=-1):
+        """
+        BFS limitada al rectángulo del cluster.
+
+        Returns:
+            dict: {tile: distancia} de los tiles alcanzados (se detiene al llegar a target).
+        """
+        row_start, row_end, col_start, col_end = self._cluster_bounds(cluster)
+        cols = self.cols
+        distances = {source: 0}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                break
+            row, col = divmod(current, cols)
+            next_distance = distances[current] + 1
+            for neighbor, inside in ((current - cols, row > row_start), (current + cols, row < row_end - 1),
+                                     (current - 1, col > col_start), (current + 1, col < col_end - 1)):
+                if inside and neighbor not in distances and not blocked[neighbor]:
+                    distances[neighbor] = next_distance
+                    queue.append(neighbor)
+        return distances
+
+    def refine_segment(self, tile_a, tile_b):
+        """
+        Devuelve los tiles entre dos nodos consecutivos de la ruta abstracta (sin incluir tile_a).
+
+        Returns:
+            list[int]: Tiles hasta tile_b, o lista vacía si el tramo ya no es transitable.
+        """
+        cluster = self.cluster_of(tile_a)
+        if cluster != self.cluster_of(tile_b):
+            return [tile_b]  # Transición entre clusters: los tiles son vecinos
+
+        blocked = flat_view(self.occupancy_grid)
+        distances = self._cluster_distances(tile_a, cluster, blocked, target=tile_b)
+        if tile_b not in distances:
+            return []
+
+        # Reconstruir el tramo retrocediendo por distancias decrecientes
+        cols = self.cols
+        segment = [tile_b]
+        current = tile_b
+        while distances[current] > 1:
+            row, col = divmod(current, cols)
+            wanted = distances[current] - 1
+            for neighbor in (current - cols, current + cols, current - 1, current + 1):
+                if distances.get(neighbor) == wanted and (neighbor // cols == row or neighbor % cols == col):
+                    current = neighbor
+                    break
+            segment.append(current)
+        segment.reverse()
+        return segment
+
+    # --- Consulta jerárquica ---
+
+    def _abstract_neighbors(self, node, start, start_edges, goal, goal_edges):
+        """Genera (vecino, coste) de un nodo en el grafo abstracto, incluidos start y goal temporales."""
+        if node == start:
+            yield from start_edges.items()
+        cluster_edges = self.intra_edges[self.cluster_of(node)].get(node)
+        if cluster_edges:
+            yield from cluster_edges.items()
+        for neighbor in self.inter_edges.get(node, ()):
+            yield neighbor, 1
+        if node in goal_edges and node != goal:
+            yield goal, goal_edges[node]
+
+    def find_path(self, start, goal, tile_size):
+        """
+        Planifica sobre el grafo abstracto entre dos índices de tile.
+
+        Args:
+            start (int): Índice del tile de inicio.
+            goal (int): Índice del tile destino.
+            tile_size (int): El tamaño de cada tile (para devolver posiciones en píxeles).
+
+        Returns:
+            LazyPath | list: Ruta perezosa en el formato de get_path, o lista vacía si no hay ruta.
+        """
+        if start == goal:
+            return [index_to_pos(start, tile_size, self.cols)]
+
+        with self.lock:
+            blocked = flat_view(self.occupancy_grid)
+            if blocked[goal]:
+                return []
+
+            # Conectar start y goal a los nodos de entrada de sus clusters
+            start_cluster = self.cluster_of(start)
+            goal_cluster = self.cluster_of(goal)
+            start_distances = self._cluster_distances(start, start_cluster, blocked)
+            start_edges = {node: start_distances[node] for node in self.cluster_nodes[start_cluster]
+                           if node in start_distances and node != start}
+            if start_cluster == goal_cluster and goal in start_distances:
+                start_edges[goal] = start_distances[goal]
+            goal_distances = self._cluster_distances(goal, goal_cluster, blocked)
+            goal_edges = {node: goal_distances[node] for node in self.cluster_nodes[goal_cluster]
+                          if node in goal_distances}
+
+            # A* sobre el grafo abstracto (heurística Manhattan en tiles)
+            cols = self.cols
+            goal_row, goal_col = divmod(goal, cols)
+            g_costs = {start: 0}
+            parents = {start: None}
+            closed = set()
+            open_heap = [(0, start)]
+            while open_heap:
+                _, current = heapq.heappop(open_heap)
+                if current in closed:
+                    continue
+                closed.add(current)
+                if current == goal:
+                    break
+                for neighbor, cost in self._abstract_neighbors(current, start, start_edges, goal, goal_edges):
+                    new_g = g_costs[current] + cost
+                    if neighbor not in closed and new_g < g_costs.get(neighbor, float('inf')):
+                        g_costs[neighbor] = new_g
+                        parents[neighbor] = current
+                        row, col = divmod(neighbor, cols)
+                        heapq.heappush(open_heap, (new_g + abs(row - goal_row) + abs(col - goal_col), neighbor))
+            else:
+                self.nodes_expanded = len(closed)
+                return []  # No se encontró un camino
+            self.nodes_expanded = len(closed)
+
+        abstract_path = []
+        current = goal
+        while current is not None:
+            abstract_path.append(current)
+            current = parents[current]
+        abstract_path.reverse()
+        return LazyPath(_Refinement(self, abstract_path, g_costs[goal] + 1, tile_size))
+
+
+class _Refinement:
+    """Estado compartido de una ruta jerárquica: los tiles ya refinados y el siguiente tramo."""
+
+    def __init__(self, pathfinder, abstract_path, length, tile_size):
+        self.pathfinder = pathfinder
+        self.abstract_path = abstract_path
+        self.tile_size = tile_size
+        self.length = length  # Número total de tiles (conocido por los costes abstractos)
+        self.positions = [index_to_pos(abstract_path[0], tile_size, pathfinder.cols)]
+        self.next_segment = 1
+
+    def ensure(self, count):
+        """Refina tramos hasta tener al menos 'count' posiciones (o hasta el final de la ruta)."""
+        cols = self.pathfinder.cols
+        while len(self.positions) < min(count, self.length) and self.next_segment < len(self.abstract_path):
+            tile_a = self.abstract_path[self.next_segment - 1]
+            tile_b = self.abstract_path[self.next_segment]
+            segment = self.pathfinder.refine_segment(tile_a, tile_b)
+            if not segment:
+                # El mapa cambió y el tramo ya no es transitable: la ruta termina aquí y la
+                # entidad volverá a planificar cuando la agote.
+                self.length = len(self.positions)
+                break
+            self.positions.extend(index_to_pos(tile, self.tile_size, cols) for tile in segment)
+            self.next_segment += 1
+
+
+class LazyPath:
+    """
+    Ruta jerárquica que se refina a nivel de tile solo a medida que se consume.
+
+    Se comporta como la lista de posiciones que devuelve get_path en lo que usa
+    Utils.gen_next_route: len(), bool(), indexación y cortes. path[:m] refina solo los
+    tramos necesarios para los primeros m nodos y path[m:] devuelve otra LazyPath que
+    comparte el trabajo ya hecho.
+    """
+
+    def __init__(self, refinement, offset=0):
+        self._refinement = refinement
+        self._offset = offset
+
+    def __len__(self):
+        return max(self._refinement.length - self._offset, 0)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if key.stop is None and step == 1:
+                return LazyPath(self._refinement, self._offset + start)
+            self._refinement.ensure(self._offset + stop)
+            stop = min(stop, len(self))
+            return self._refinement.positions[self._offset + start:self._offset + stop:step]
+
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("índice de ruta fuera de rango")
+        self._refinement.ensure(self._offset + index + 1)
+        if index >= len(self):
+            raise IndexError("índice de ruta fuera de rango")
+        return self._refinement.positions[self._offset + index]
+
+    def __iter__(self):
+        index = 0
+        while index < len(self):
+            yield self[index]
+            index += 1
@@ -0,0 +1,325 @@
+# Jump_Point_Search.py
+
+import heapq
+import threading
+from Grid import flat_view, pos_to_index, index_to_pos
+
+
+class JumpPointSearch:
+    """
+    Jump Point Search para cuadrículas de coste uniforme con movimiento en 4 direcciones.
+
+    En lugar de expandir cada tile, la búsqueda "salta" en línea recta hasta encontrar un
+    punto de salto (la meta, o un tile con un vecino forzado por un obstáculo). Solo esos
+    puntos entran en la cola, lo que reduce mucho las expansiones en zonas abiertas.
+    Al moverse en vertical también se buscan puntos de salto horizontales, que es lo que
+    mantiene la ruta óptima sin movimientos diagonales.
+
+    Usa los mismos arreglos preasignados e identificador de búsqueda que IndexedAStar.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+
+        self.g_costs = [0] * self.size
+        self.parents = [-1] * self.size
+        self.seen = [0] * self.size
+        self.closed = [0] * self.size
+        self.search_id = 0
+
+        # Memo de saltos horizontales por dirección (derecha, izquierda): el resultado de
+        # escanear desde un tile solo depende del tile, la dirección y la meta, así que todos
+        # los tiles de un mismo escaneo comparten resultado dentro de una búsqueda.
+        self.jump_results = ([-1] * self.size, [-1] * self.size)
+        self.jump_stamps = ([0] * self.size, [0] * self.size)
+
+        self.nodes_expanded = 0  # Puntos de salto expandidos en la última búsqueda
+
+        # Estado de la búsqueda en curso (se asigna en search)
+        self._blocked = None
+        self._goal = -1
+
+    def _walkable(self, row, col):
+        """Indica si (fila, columna) está dentro del mapa y libre."""
+        return 0 <= row < self.rows and 0 <= col < self.cols and not self._blocked[row * self.cols + col]
+
+    def _jump_horizontal(self, row, col, d_col):
+        """
+        Avanza en horizontal desde (fila, columna) hasta un punto de salto.
+
+        Returns:
+            int: Índice del punto de salto, o -1 si se choca con un obstáculo o el borde.
+        """
+        cols = self.cols
+        if not 0 <= col < cols:
+            return -1
+        blocked = self._blocked
+        goal = self._goal
+        search_id = self.search_id
+        direction = 0 if d_col > 0 else 1
+        results = self.jump_results[direction]
+        stamps = self.jump_stamps[direction]
+        has_up = row > 0
+        has_down = row < self.rows - 1
+        index = row * cols + col
+        end = index + (cols - col if d_col > 0 else -col - 1)
+        scanned = []
+        result = -1
+
+        # La columna anterior siempre está dentro del mapa (es de donde venimos).
+        while index != end:
+            if stamps[index] == search_id:
+                result = results[index]
+                break
+            if blocked[index]:
+                break
+            if index == goal:
+                result = index
+                break
+            # Vecino forzado: un tile libre arriba/abajo que estaba bloqueado en la columna anterior
+            previous = index - d_col
+            if (has_up and not blocked[index - cols] and blocked[previous - cols]) or \
+                    (has_down and not blocked[index + cols] and blocked[previous + cols]):
+                result = index
+                break
+            scanned.append(index)
+            index += d_col
+
+        for index in scanned:
+            stamps[index] = search_id
+            results[index] = result
+        return result
+
+    def _jump_vertical(self, row, col, d_row):
+        """
+        Avanza en vertical desde (fila, columna) hasta un punto de salto.
+
+        Returns:
+            int: Índice del punto de salto, o -1 si se choca con un obstáculo o el borde.
+        """
+        rows = self.rows
+        cols = self.cols
+        blocked = self._blocked
+        goal = self._goal
+        jump_horizontal = self._jump_horizontal
+        has_left = col > 0
+        has_right = col < cols - 1
+        step = d_row * cols
+
+        while 0 <= row < rows:
+            index = row * cols + col
+            if blocked[index]:
+                return -1
+            if index == goal:
+                return index
+            previous = index - step
+            if has_left and not blocked[index - 1] and blocked[previous - 1]:
+                return index
+            if has_right and not blocked[index + 1] and blocked[previous + 1]:
+                return index
+            # Sin diagonales, un punto de salto horizontal en esta fila convierte este tile en uno
+            if (has_right and jump_horizontal(row, col + 1, 1) != -1) or \
+                    (has_left and jump_horizontal(row, col - 1, -1) != -1):
+                return index
+            row += d_row
+        return -1
+
+    def _neighbors(self, row, col, parent):
+        """Devuelve las direcciones (d_fila, d_columna) a explorar desde un tile, podadas según su padre."""
+        walkable = self._walkable
+        if parent == -1:
+            return [(dr, dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)) if walkable(row + dr, col + dc)]
+
+        parent_row, parent_col = divmod(parent, self.cols)
+        d_row = (row > parent_row) - (row < parent_row)
+        d_col = (col > parent_col) - (col < parent_col)
+        if d_col != 0:
+            candidates = ((-1, 0), (1, 0), (0, d_col))
+        else:
+            candidates = ((0, -1), (0, 1), (d_row, 0))
+        return [(dr, dc) for dr, dc in candidates if walkable(row + dr, col + dc)]
+
+    def search(self, blocked, start, goal):
+        """
+        Busca la ruta más corta entre dos índices de tile.
+
+        Args:
+            blocked: Secuencia plana indexable por tile; un valor distinto de cero es un obstáculo.
+            start (int): Índice del tile de inicio.
+            goal (int): Índice del tile destino.
+
+        Returns:
+            list[int]: Índices de tiles (tile a tile, con los saltos ya expandidos) desde start
+                       hasta goal, o lista vacía si no hay ruta.
+        """
+        self.search_id += 1
+        search_id = self.search_id
+        self._blocked = blocked
+        self._goal = goal
+        cols = self.cols
+        size = self.size
+        g_costs = self.g_costs
+        parents = self.parents
+        seen = self.seen
+        closed = self.closed
+
+        goal_row, goal_col = divmod(goal, cols)
+        start_row, start_col = divmod(start, cols)
+        h_stride = size
+        f_stride = (self.rows + cols) * size
+
+        g_costs[start] = 0
+        parents[start] = -1
+        seen[start] = search_id
+        h = abs(start_row - goal_row) + abs(start_col - goal_col)
+        open_heap = [h * f_stride + h * h_stride + start]
+        expanded = 0
+
+        try:
+            while open_heap:
+                current = heapq.heappop(open_heap) % size
+                if closed[current] == search_id:
+                    continue
+                closed[current] = search_id
+                expanded += 1
+
+                if current == goal:
+                    return self._expand_path(current)
+
+                row, col = divmod(current, cols)
+                for d_row, d_col in self._neighbors(row, col, parents[current]):
+                    if d_row != 0:
+                        jump_point = self._jump_vertical(row + d_row, col, d_row)
+                    else:
+                        jump_point = self._jump_horizontal(row, col + d_col, d_col)
+                    if jump_point == -1 or closed[jump_point] == search_id:
+                        continue
+
+                    # El punto de salto está en línea recta, así que el coste es la distancia Manhattan
+                    jump_row, jump_col = divmod(jump_point, cols)
+                    new_g = g_costs[current] + abs(jump_row - row) + abs(jump_col - col)
+                    if seen[jump_point] != search_id or new_g < g_costs[jump_point]:
+                        seen[jump_point] = search_id
+                        g_costs[jump_point] = new_g
+                        parents[jump_point] = current
+                        h = abs(jump_row - goal_row) + abs(jump_col - goal_col)
+                        heapq.heappush(open_heap, (new_g + h) * f_stride + h * h_stride + jump_point)
+
+            return []  # No se encontró un camino
+        finally:
+            self.nodes_expanded = expanded
+            self._blocked = None
+
+    def _expand_path(self, goal):
+        """Reconstruye la ruta desde los padres y rellena los tiles entre puntos de salto."""
+        cols = self.cols
+        jump_points = []
+        current = goal
+        while current != -1:
+            jump_points.append(current)
+            current = self.parents[current]
+        jump_points.reverse()
+
+        path = [jump_points[0]]
+        for target in jump_points[1:]:
+            current = path[-1]
+            current_row, current_col = divmod(current, cols)
+            target_row, target_col = divmod(target, cols)
+            step = cols * ((target_row > current_row) - (target_row < current_row)) + \
+                ((target_col > current_col) - (target_col < current_col))
+            while current != target:
+                current += step
+                path.append(current)
+        return path
+
+
+# Un motor por hilo, igual que con IndexedAStar
+_thread_engines = threading.local()
+
+
+def get_path_jps(game, start_pos, end_pos, occupancy_grid):
+    """
+    Jump Point Search con la misma firma y formato de ruta que get_path.
+
+    Devuelve la ruta completa tile a tile, que es lo que espera Utils.gen_next_route.
+    """
+    tile_size = game.settings.tile_size
+    rows, cols = occupancy_grid.shape
+
+    start = pos_to_index(start_pos, tile_size, occupancy_grid.shape)
+    goal = pos_to_index(end_pos, tile_size, occupancy_grid.shape)
+    if start == -1 or goal == -1:
+        return []
+
+    engine = getattr(_thread_engines, 'jps', None)
+    if engine is None or engine.rows != rows or engine.cols != cols:
+        engine = JumpPointSearch(rows, cols)
+        _thread_engines.jps = engine
+
+    path = engine.search(flat_view(occupancy_grid), start, goal)
+    return [index_to_pos(index, tile_size, cols) for index in path]
+
+
+if __name__ == '__main__':
+    # Comparación de motores sobre el mapa incluido: nodos expandidos y tiempo de reloj.
+    import random
+    import time
+    from Mapa import MAP_DATA
+    from Grid import build_occupancy_grid, LIBRE
+    from A_Star_Pathfinder import IndexedAStar, get_path_classic
+
+    class MockSettings:
+        def __init__(self):
+            self.tile_size = 32
+
+    class MockGame:
+        def __init__(self):
+            self.settings = MockSettings()
+
+    mock_game = MockGame()
+    tile_size = mock_game.settings.tile_size
+    grid = build_occupancy_grid(MAP_DATA)
+    rows, cols = grid.shape
+    blocked = flat_view(grid)
+    free_tiles = [int(index) for index in (grid.ravel() == LIBRE).nonzero()[0]]
+
+    random.seed(0)
+    num_queries = 500
+    queries = [(random.choice(free_tiles), random.choice(free_tiles)) for _ in range(num_queries)]
+
+    engines = {'indices': IndexedAStar(rows, cols), 'jps': JumpPointSearch(rows, cols)}
+    print(f"Comparando motores en MAP_DATA ({cols}x{rows}), {num_queries} consultas aleatorias...")
+
+    start_time = time.perf_counter()
+    classic_paths = [get_path_classic(mock_game, index_to_pos(start, tile_size, cols),
+                                      index_to_pos(goal, tile_size, cols), grid) for start, goal in queries]
+    print(f"  clasico: {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    path_lengths = {}
+    indexed_paths = []
+    for name, engine in engines.items():
+        total_expanded = 0
+        lengths = []
+        start_time = time.perf_counter()
+        for start, goal in queries:
+            path = engine.search(blocked, start, goal)
+            lengths.append(len(path))
+            total_expanded += engine.nodes_expanded
+            if name == 'indices':
+                indexed_paths.append(path)
+        elapsed = time.perf_counter() - start_time
+        path_lengths[name] = lengths
+        print(f"  {name}: {elapsed * 1000:.1f} ms, {total_expanded / num_queries:.1f} nodos expandidos por consulta")
+
+    if path_lengths['indices'] == path_lengths['jps']:
+        print("  Las longitudes de ruta coinciden en todas las consultas.")
+    else:
+        print("  ¡Atención! Las longitudes de ruta no coinciden.")
+    # 'indices' debe pasar además por los mismos tiles que 'clasico' (mismo desempate)
+    if all([index_to_pos(index, tile_size, cols) for index in indexed] == classic
+           for indexed, classic in zip(indexed_paths, classic_paths)):
+        print("  'indices' y 'clasico' devuelven las mismas rutas.")
+    else:
+        print("  ¡Atención! 'indices' y 'clasico' devuelven rutas distintas.")
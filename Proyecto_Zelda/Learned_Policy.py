@@ -0,0 +1,180 @@
+# Learned_Policy.py
+
+import numpy as np
+from AI_Trainer import DIRECTIONS
+from Grid import LIBRE
+from Utils import gen_next_route, snap_to_grid
+
+# Etiqueta de dirección -> desplazamiento (fila, columna), las mismas etiquetas del entrenamiento
+DIRECTION_OFFSETS = {label: (d_row, d_col) for label, d_row, d_col in DIRECTIONS}
+
+
+def _relu(values):
+    return np.maximum(values, 0, out=values)
+
+
+def _logistic(values):
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+# Funciones de activación de las capas ocultas, por el nombre que usa MLPClassifier.activation
+_ACTIVATIONS = {
+    'relu': _relu,
+    'tanh': np.tanh,
+    'logistic': _logistic,
+    'identity': lambda values: values,
+}
+
+
+class CompiledPolicy:
+    """
+    Un MLPClassifier y su StandardScaler reducidos a arreglos de NumPy.
+
+    predict hace lo mismo que scaler.transform + model.predict, pero como multiplicaciones de
+    matrices sobre todas las filas a la vez, sin la validación de entrada de sklearn en cada llamada.
+    """
+
+    def __init__(self, model, scaler):
+        self.mean = np.asarray(scaler.mean_, dtype=float)
+        self.scale = np.asarray(scaler.scale_, dtype=float)
+        self.weights = [np.asarray(weights, dtype=float) for weights in model.coefs_]
+        self.biases = [np.asarray(bias, dtype=float) for bias in model.intercepts_]
+        self.activation = _ACTIVATIONS[model.activation]
+        self.classes = np.asarray(model.classes_)
+
+    def predict(self, features):
+        """
+        Args:
+            features (np.ndarray): Matriz (n, 5) en el formato de generate_training_data, sin escalar.
+
+        Returns:
+            np.ndarray: La etiqueta de dirección de cada fila.
+        """
+        values = (features - self.mean) / self.scale
+        for weights, bias in zip(self.weights[:-1], self.biases[:-1]):
+            values = self.activation(values @ weights + bias)
+        # La salida (softmax o logística) no cambia el orden, así que basta con los logits
+        logits = values @ self.weights[-1] + self.biases[-1]
+        if logits.shape[1] == 1:  # Con dos clases MLPClassifier usa una sola salida
+            return self.classes[(logits[:, 0] > 0).astype(int)]
+        return self.classes[np.argmax(logits, axis=1)]
+
+
+class PolicyStep:
+    """
+    Mueve con la política aprendida a todos los agentes que están parados, una vez por tick.
+
+    Construye una sola matriz de características (una fila por agente) y hace una pasada por
+    modelo distinto (uno para el jugador y otro compartido por los enemigos). Cada agente avanza
+    un tile en la dirección elegida; si ese tile está bloqueado, el agente usa su lógica A* de
+    siempre en ese tick (o se queda quieto si fallback_to_astar es False).
+
+    Marca entity.policy_controlled en cada agente: cuando es True, su decide_move no hace nada.
+    """
+
+    def __init__(self, game, fallback_to_astar=True):
+        self.game = game
+        self.fallback_to_astar = fallback_to_astar
+        self.compiled = {}  # id(modelo) -> (modelo, escalador, CompiledPolicy)
+
+        self.moves = 0
+        self.blocked_moves = 0
+
+    def _compile(self, model, scaler):
+        """Devuelve la CompiledPolicy de un modelo (se rehace si el modelo se cambió en caliente)."""
+        entry = self.compiled.get(id(model))
+        if entry is None or entry[0] is not model or entry[1] is not scaler:
+            entry = (model, scaler, CompiledPolicy(model, scaler))
+            self.compiled[id(model)] = entry
+        return entry[2]
+
+    def step(self, agents, occupancy_grid):
+        """
+        Args:
+            agents (list[tuple]): (entidad, posición objetivo, velocidad) de cada agente.
+            occupancy_grid (np.ndarray): Cuadrícula de ocupación para comprobar el tile elegido.
+        """
+        tile_size = self.game.settings.tile_size
+        idle = []
+        features = []
+        for entity, target_position, speed in agents:
+            entity.policy_controlled = entity.ia_model is not None
+            if not entity.policy_controlled or entity.path_positions:
+                continue
+            current = snap_to_grid(entity.position, tile_size)
+            goal = snap_to_grid(target_position, tile_size)
+            if current == goal:
+                # La aproximación final la hace la lógica de siempre de la entidad
+                entity.policy_controlled = False
+                continue
+            idle.append((entity, current, speed))
+            features.append((current[0], current[1], goal[0], goal[1],
+                             np.hypot(current[0] - goal[0], current[1] - goal[1])))
+
+        if not idle:
+            return
+
+        features = np.array(features, dtype=float)
+        directions = np.empty(len(idle), dtype=np.int64)
+        rows_by_model = {}
+        for row, (entity, _, _) in enumerate(idle):
+            rows_by_model.setdefault(id(entity.ia_model), []).append(row)
+        for model_rows in rows_by_model.values():
+            entity = idle[model_rows[0]][0]
+            directions[model_rows] = self._compile(entity.ia_model, entity.scaler).predict(features[model_rows])
+
+        grid_rows, grid_cols = occupancy_grid.shape
+        for (entity, current, speed), direction in zip(idle, directions.tolist()):
+            d_row, d_col = DIRECTION_OFFSETS[direction]
+            row = current[1] // tile_size + d_row
+            col = current[0] // tile_size + d_col
+            if not (0 <= row < grid_rows and 0 <= col < grid_cols) or occupancy_grid[row, col] != LIBRE:
+                self.blocked_moves += 1
+                if self.fallback_to_astar:
+                    entity.policy_controlled = False
+                continue
+
+            # Una ruta A* pedida antes de este movimiento ya no empieza donde estará la entidad
+            if entity.recalculating:
+                self.game.path_service.cancel(entity)
+                entity.recalculating = False
+            entity.path = [current, (col * tile_size, row * tile_size)]
+            gen_next_route(entity, speed, m=2)
+            self.moves += 1
+
+
+if __name__ == '__main__':
+    # Comparación con sklearn: mismas predicciones y tiempo por tick con muchos agentes.
+    import time
+    from Mapa import MAP_DATA
+    from Grid import build_occupancy_grid
+    from AI_Trainer import train_ia
+
+    tile_size = 32
+    grid = build_occupancy_grid(MAP_DATA)
+    width = len(MAP_DATA[0]) * tile_size
+    height = len(MAP_DATA) * tile_size
+    model, scaler = train_ia(600, grid, tile_size, width, height, num_goals=20)
+
+    rng = np.random.default_rng(0)
+    num_agents = 200
+    positions = rng.integers(0, [width, height, width, height], size=(num_agents, 4)) // tile_size * tile_size
+    features = np.column_stack((positions, np.hypot(positions[:, 0] - positions[:, 2],
+                                                    positions[:, 1] - positions[:, 3]))).astype(float)
+
+    policy = CompiledPolicy(model, scaler)
+    same = np.array_equal(policy.predict(features), model.predict(scaler.transform(features)))
+    print(f"Predicciones iguales a las de sklearn: {same}")
+
+    repeats = 100
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for row in features:
+            model.predict(scaler.transform(row.reshape(1, -1)))
+    per_agent = (time.perf_counter() - start_time) / repeats
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        policy.predict(features)
+    batched = (time.perf_counter() - start_time) / repeats
+    print(f"{num_agents} agentes por tick: sklearn uno a uno {per_agent * 1000:.2f} ms, "
+          f"por lotes {batched * 1000:.3f} ms")
@@ -0,0 +1,156 @@
+# Map_Format.py
+
+import argparse
+import os
+import struct
+import numpy as np
+from Mapa import MURO, CAMINO, BLOQUE, META, JUGADOR, ENEMIGO
+
+# Formato binario de mapa (.zmap), todo en little-endian:
+#   cabecera: firma, versión, ancho, alto, (col, fila) del jugador, (col, fila) de la meta, nº de enemigos
+#   tiles: alto x ancho bytes, un tipo de tile por byte (el código del carácter de Mapa.py)
+#   enemigos: nº de enemigos x (col, fila) en int32
+# Los tiles se leen con np.memmap: el sistema solo carga las páginas del mapa que se usan.
+MAGIC = b'ZMAP'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHII4iI')
+HEADER_SIZE = _HEADER.size
+
+# Tipos de tile del arreglo. VACIO son los huecos de las filas más cortas del mapa en texto
+# (libres y sin dibujo, igual que antes); jugador y enemigos no son tiles sino aparición.
+VACIO = 0
+TILE_MURO = ord(MURO)
+TILE_CAMINO = ord(CAMINO)
+TILE_BLOQUE = ord(BLOQUE)
+TILE_META = ord(META)
+
+
+class MapFile:
+    """
+    Un mapa como arreglo de tipos de tile más las listas de aparición de las entidades.
+
+    Attributes:
+        tiles (np.ndarray): uint8 (filas, columnas); un np.memmap al cargarlo de disco.
+        player (tuple | None): (columna, fila) de aparición del jugador.
+        goal (tuple | None): (columna, fila) de la meta.
+        enemies (np.ndarray): int32 (n, 2) con la (columna, fila) de cada enemigo.
+    """
+
+    def __init__(self, tiles, player, goal, enemies):
+        self.tiles = tiles
+        self.player = player
+        self.goal = goal
+        self.enemies = np.asarray(enemies, dtype=np.int32).reshape(-1, 2)
+
+    @property
+    def height(self):
+        return self.tiles.shape[0]
+
+    @property
+    def width(self):
+        return self.tiles.shape[1]
+
+
+def map_from_ascii(map_data):
+    """
+    Convierte un mapa en texto (como Mapa.MAP_DATA) al formato de arreglo.
+
+    Args:
+        map_data (list[str]): Filas del mapa; el ancho es el de la primera fila, como en
+                              Grid.build_occupancy_grid (lo que sobra de filas más largas se ignora).
+
+    Returns:
+        MapFile: El mapa en memoria.
+    """
+    rows = len(map_data)
+    cols = len(map_data[0]) if rows else 0
+    tiles = np.full((rows, cols), VACIO, dtype=np.uint8)
+    for row, row_str in enumerate(map_data):
+        encoded = np.frombuffer(row_str[:cols].encode('ascii'), dtype=np.uint8)
+        tiles[row, :len(encoded)] = encoded
+
+    def positions_of(char):
+        found = np.argwhere(tiles == ord(char))
+        return found[:, ::-1]  # (fila, columna) -> (columna, fila)
+
+    players = positions_of(JUGADOR)
+    goals = positions_of(META)
+    enemies = positions_of(ENEMIGO)
+    # Bajo el jugador y los enemigos hay camino
+    tiles[(tiles == ord(JUGADOR)) | (tiles == ord(ENEMIGO))] = TILE_CAMINO
+
+    player = tuple(int(value) for value in players[-1]) if len(players) else None
+    goal = tuple(int(value) for value in goals[-1]) if len(goals) else None
+    return MapFile(tiles, player, goal, enemies)
+
+
+def save_map(path, map_file):
+    """Guarda un MapFile en el formato binario (escritura atómica)."""
+    player = map_file.player if map_file.player is not None else (-1, -1)
+    goal = map_file.goal if map_file.goal is not None else (-1, -1)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, map_file.width, map_file.height, *player, *goal,
+                          len(map_file.enemies))
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as map_output:
+        map_output.write(header)
+        map_output.write(np.ascontiguousarray(map_file.tiles, dtype=np.uint8).tobytes())
+        map_output.write(np.ascontiguousarray(map_file.enemies, dtype='<i4').tobytes())
+    os.replace(temporary_path, path)
+
+
+def load_map(path):
+    """
+    Abre un mapa binario sin leer sus tiles: el arreglo es un np.memmap de copia en escritura
+    (los cambios, como un bloque movido, quedan en memoria y el archivo no se modifica).
+
+    Returns:
+        MapFile: El mapa, con tiles respaldados por el archivo.
+    """
+    with open(path, 'rb') as map_input:
+        header = map_input.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"{path} no es un mapa válido (cabecera incompleta)")
+    magic, version, width, height, player_col, player_row, goal_col, goal_row, num_enemies = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} no es un mapa válido (firma {magic!r})")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} tiene la versión de formato {version}; se esperaba {FORMAT_VERSION}")
+    expected_size = HEADER_SIZE + width * height + num_enemies * 8
+    if os.path.getsize(path) != expected_size:
+        raise ValueError(f"{path} no es un mapa válido (tamaño {os.path.getsize(path)}, esperado {expected_size})")
+
+    tiles = np.memmap(path, dtype=np.uint8, mode='c', offset=HEADER_SIZE, shape=(height, width))
+    enemies = np.fromfile(path, dtype='<i4', count=num_enemies * 2, offset=HEADER_SIZE + width * height)
+    player = (player_col, player_row) if player_col >= 0 else None
+    goal = (goal_col, goal_row) if goal_col >= 0 else None
+    return MapFile(tiles, player, goal, enemies)
+
+
+def occupancy_from_tiles(tiles):
+    """
+    Cuadrícula de ocupación a partir del arreglo de tipos (lo mismo que Grid.build_occupancy_grid).
+
+    Returns:
+        np.ndarray: uint8 (filas, columnas), una copia en memoria que se puede modificar.
+    """
+    return ((tiles == TILE_MURO) | (tiles == TILE_BLOQUE)).view(np.uint8)
+
+
+if __name__ == '__main__':
+    # Conversor: el mapa incluido o uno generado, al formato binario.
+    from Mapa import MAP_DATA
+    from Map_Generator import MAP_KINDS, generate_map
+
+    parser = argparse.ArgumentParser(description="Convierte un mapa de texto al formato binario .zmap.")
+    parser.add_argument('output', help="Archivo .zmap de salida")
+    parser.add_argument('--generate', choices=list(MAP_KINDS),
+                        help="Generar un mapa procedural en lugar de usar Mapa.MAP_DATA")
+    parser.add_argument('--size', nargs=2, type=int, default=(256, 256), metavar=('ANCHO', 'ALTO'))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    source = MAP_DATA if args.generate is None else generate_map(args.generate, *args.size, args.seed)
+    save_map(args.output, map_from_ascii(source))
+    loaded = load_map(args.output)
+    print(f"{args.output}: {loaded.width}x{loaded.height} tiles, {len(loaded.enemies)} enemigos, "
+          f"{os.path.getsize(args.output)} bytes")
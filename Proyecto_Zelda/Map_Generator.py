@@ -0,0 +1,166 @@
+# Map_Generator.py
+
+import random
+import numpy as np
+from Mapa import MURO, CAMINO, BLOQUE, META, JUGADOR, ENEMIGO
+from Grid import build_occupancy_grid, flat_view, LIBRE
+from Flow_Field import bfs_distances, UNREACHABLE
+
+_WALL = ord(MURO)
+_FLOOR = ord(CAMINO)
+_BLOCK = ord(BLOQUE)
+
+
+def _bordered(width, height, fill):
+    """Devuelve un lienzo (filas, columnas) de códigos de carácter con borde de muro."""
+    canvas = np.full((height, width), fill, dtype=np.uint8)
+    canvas[0, :] = canvas[-1, :] = _WALL
+    canvas[:, 0] = canvas[:, -1] = _WALL
+    return canvas
+
+
+def _open_field(width, height, rng):
+    """Campo abierto: solo el borde y algún pilar suelto (2 % de los tiles)."""
+    canvas = _bordered(width, height, _FLOOR)
+    noise = np.random.default_rng(rng.getrandbits(32)).random((height, width))
+    canvas[1:-1, 1:-1][noise[1:-1, 1:-1] < 0.02] = _WALL
+    return canvas
+
+
+def _rooms(width, height, rng, cell_size=16):
+    """
+    Habitaciones y pasillos: una habitación al azar dentro de cada celda de una rejilla, unida a
+    las de la celda de la derecha y la de abajo por pasillos en L.
+    """
+    canvas = _bordered(width, height, _WALL)
+    cell_size = min(cell_size, width - 2, height - 2)
+    inner = cell_size - 1  # Deja al menos un muro entre habitaciones de celdas vecinas
+    cell_rows = (height - 2) // cell_size
+    cell_cols = (width - 2) // cell_size
+
+    centers = {}
+    for cell_row in range(cell_rows):
+        for cell_col in range(cell_cols):
+            room_width = rng.randint(max(2, inner // 3), inner)
+            room_height = rng.randint(max(2, inner // 3), inner)
+            left = 1 + cell_col * cell_size + rng.randint(0, inner - room_width)
+            top = 1 + cell_row * cell_size + rng.randint(0, inner - room_height)
+            canvas[top:top + room_height, left:left + room_width] = _FLOOR
+            centers[(cell_row, cell_col)] = (top + room_height // 2, left + room_width // 2)
+
+    for (cell_row, cell_col), (row_a, col_a) in centers.items():
+        for neighbor in ((cell_row, cell_col + 1), (cell_row + 1, cell_col)):
+            if neighbor not in centers:
+                continue
+            row_b, col_b = centers[neighbor]
+            canvas[row_a, min(col_a, col_b):max(col_a, col_b) + 1] = _FLOOR
+            canvas[min(row_a, row_b):max(row_a, row_b) + 1, col_b] = _FLOOR
+    return canvas
+
+
+def _maze(width, height, rng):
+    """Laberinto perfecto (backtracking iterativo) sobre las celdas de coordenadas impares."""
+    canvas = _bordered(width, height, _WALL)
+    cell_rows = (height - 1) // 2
+    cell_cols = (width - 1) // 2
+    visited = bytearray(cell_rows * cell_cols)
+    visited[0] = 1
+    canvas[1, 1] = _FLOOR
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                   if 0 <= row + dr < cell_rows and 0 <= col + dc < cell_cols and
+                   not visited[(row + dr) * cell_cols + col + dc]]
+        if not options:
+            stack.pop()
+            continue
+        next_row, next_col = rng.choice(options)
+        visited[next_row * cell_cols + next_col] = 1
+        # Abrir la celda y la pared entre ambas celdas
+        canvas[2 * next_row + 1, 2 * next_col + 1] = _FLOOR
+        canvas[row + next_row + 1, col + next_col + 1] = _FLOOR
+        stack.append((next_row, next_col))
+    return canvas
+
+
+def _clutter(width, height, rng):
+    """Campo sembrado de bloques al azar (25 % de los tiles)."""
+    canvas = _bordered(width, height, _FLOOR)
+    noise = np.random.default_rng(rng.getrandbits(32)).random((height, width))
+    canvas[1:-1, 1:-1][noise[1:-1, 1:-1] < 0.25] = _BLOCK
+    return canvas
+
+
+# Tipos de mapa disponibles para generate_map
+MAP_KINDS = {
+    'abierto': _open_field,
+    'habitaciones': _rooms,
+    'laberinto': _maze,
+    'bloques': _clutter,
+}
+
+
+def _place_markers(canvas, rng):
+    """
+    Coloca jugador, meta y un enemigo en la zona conectada del jugador.
+
+    El jugador se coloca en una zona que abarque al menos la mitad de los tiles libres (en los
+    mapas con bloques puede haber huecos aislados), así que meta y enemigo siempre son alcanzables.
+    """
+    height, width = canvas.shape
+    grid = (canvas == _WALL) | (canvas == _BLOCK)
+    free_tiles = (~grid).ravel().nonzero()[0]
+    if len(free_tiles) < 3:
+        raise ValueError(f"El mapa de {width}x{height} no tiene tiles libres suficientes")
+
+    blocked = flat_view(grid.astype(np.uint8))
+    for _ in range(10):
+        player = int(free_tiles[rng.randrange(len(free_tiles))])
+        distances = np.array(bfs_distances(blocked, height, width, player))
+        reachable = np.flatnonzero((distances != UNREACHABLE) & (distances != 0))
+        if (len(reachable) + 1) * 2 >= len(free_tiles):
+            break
+    if len(reachable) < 2:
+        raise ValueError(f"El mapa de {width}x{height} no tiene una zona conectada suficiente")
+
+    goal, enemy = (int(reachable[choice]) for choice in rng.sample(range(len(reachable)), 2))
+    flat = canvas.ravel()
+    flat[player] = ord(JUGADOR)
+    flat[goal] = ord(META)
+    flat[enemy] = ord(ENEMIGO)
+
+
+def generate_map(kind, width, height, seed=0):
+    """
+    Genera un mapa procedural compatible con MAP_DATA.
+
+    Args:
+        kind (str): Tipo de mapa (ver MAP_KINDS).
+        width (int): Ancho en tiles (mínimo 8).
+        height (int): Alto en tiles (mínimo 8).
+        seed (int): Semilla; el mismo tipo, tamaño y semilla dan siempre el mismo mapa.
+
+    Returns:
+        list[str]: Filas del mapa con los caracteres de Mapa.py, incluidos 'P', 'M' y un 'E'.
+    """
+    generator = MAP_KINDS.get(kind)
+    if generator is None:
+        raise ValueError(f"Tipo de mapa desconocido: {kind!r}. Opciones: {', '.join(MAP_KINDS)}")
+    if width < 8 or height < 8:
+        raise ValueError(f"El mapa debe medir al menos 8x8 tiles (pedido: {width}x{height})")
+
+    rng = random.Random(seed)
+    canvas = generator(width, height, rng)
+    _place_markers(canvas, rng)
+    return [row.tobytes().decode('ascii') for row in canvas]
+
+
+if __name__ == '__main__':
+    # Vista previa de cada tipo de mapa en pequeño
+    for map_kind in MAP_KINDS:
+        map_data = generate_map(map_kind, 40, 16, seed=1)
+        free_ratio = (build_occupancy_grid(map_data) == LIBRE).mean()
+        print(f"{map_kind} ({free_ratio:.0%} libre):")
+        print("\n".join(map_data))
+        print()
@@ -0,0 +1,162 @@
+# Model_Cache.py
+
+import hashlib
+import json
+import os
+import pickle
+from importlib import metadata
+from Grid import hash_grid
+
+# Aumentar si cambia lo que se guarda o cómo se generan los datos: invalida todas las entradas
+MODEL_CACHE_FORMAT = 3
+_MAGIC = b'ZELDA-IA-MODEL\n'
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+def training_cache_key(occupancy_grid, tile_size, screen_width, screen_height, num_samples, num_goals,
+                       model_params, seed, num_shards=1):
+    """
+    Calcula la clave de un modelo entrenado: todo lo que cambia el resultado del entrenamiento.
+
+    La semilla y el reparto en partes forman parte de la clave: con otra semilla, o con las mismas
+    muestras repartidas entre otro número de procesos, se generan otros datos y sale otro modelo.
+
+    Args:
+        occupancy_grid (np.ndarray): Cuadrícula de ocupación del mapa (su contenido, no el objeto).
+        tile_size (int): El tamaño de cada tile.
+        screen_width (int): Ancho de la pantalla en píxeles (limita los tiles de las muestras).
+        screen_height (int): Alto de la pantalla en píxeles.
+        num_samples (int): Número de muestras.
+        num_goals (int): Metas del etiquetado por lotes (0 = un A* por muestra).
+        model_params (dict): Hiperparámetros del clasificador (MLPClassifier.get_params()).
+        seed (int | None): Semilla de la generación de datos; None = sin sembrar (cualquier modelo
+                           entrenado con la misma configuración sirve).
+        num_shards (int): Partes en que se generaron las muestras (una por proceso, ver
+                          TrainingOrchestrator).
+
+    Returns:
+        str: Resumen hexadecimal usado como nombre de archivo.
+    """
+    description = {
+        'format': MODEL_CACHE_FORMAT,
+        # Los modelos guardados no son portables entre versiones (se lee sin importar sklearn)
+        'sklearn': metadata.version('scikit-learn'),
+        'grid': hash_grid(occupancy_grid),
+        'tile_size': tile_size,
+        'screen': [screen_width, screen_height],
+        'num_samples': num_samples,
+        'num_goals': num_goals,
+        'model_params': {name: repr(value) for name, value in model_params.items()},
+        'seed': seed,
+        'num_shards': num_shards,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class ModelCache:
+    """
+    Caché en disco de modelos entrenados (modelo y escalador), con límite de tamaño.
+
+    Cada entrada es un archivo <clave>.pkl con una cabecera, el SHA-256 del contenido y el
+    pickle de (modelo, escalador). Al cargar se comprueba el resumen: un archivo truncado o
+    dañado se borra y se trata como un fallo. Al superar max_bytes se borran primero las
+    entradas usadas hace más tiempo (la fecha de modificación se actualiza en cada acierto).
+
+    La comprobación detecta archivos dañados, no manipulados: igual que cualquier pickle, el
+    directorio de la caché solo debe poder escribirlo el propio usuario.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def load(self, key):
+        """
+        Carga un modelo guardado.
+
+        Returns:
+            tuple | None: (modelo, escalador), o None si no está o el archivo no es válido.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        header_size = len(_MAGIC) + _DIGEST_SIZE
+        payload = data[header_size:]
+        if not data.startswith(_MAGIC) or data[len(_MAGIC):header_size] != hashlib.sha256(payload).digest():
+            print(f"Advertencia: el modelo guardado {os.path.basename(path)} está dañado; se volverá a entrenar.")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            model, scaler = pickle.loads(payload)
+        except Exception as error:
+            print(f"Advertencia: no se pudo cargar el modelo guardado {os.path.basename(path)} ({error}).")
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # Marca la entrada como usada recientemente
+        except OSError:
+            pass  # Borrada por otro proceso (o directorio de solo lectura): el modelo ya está cargado
+        self.hits += 1
+        return model, scaler
+
+    def store(self, key, model, scaler):
+        """Guarda un modelo (escritura atómica) y aplica el límite de tamaño."""
+        os.makedirs(self.directory, exist_ok=True)
+        payload = pickle.dumps((model, scaler), protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(key)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as cache_file:
+            cache_file.write(_MAGIC + hashlib.sha256(payload).digest() + payload)
+        os.replace(temporary_path, path)
+        self._evict(keep=path)
+
+    def _entries(self):
+        """Devuelve (fecha de uso, tamaño, ruta) de cada entrada del directorio."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Borrada por otro proceso
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self, keep=None):
+        """Borra las entradas menos usadas hasta quedar por debajo de max_bytes (nunca 'keep')."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Borra todos los modelos guardados."""
+        if os.path.isdir(self.directory):
+            for _, _, path in self._entries():
+                self._remove(path)
@@ -0,0 +1,125 @@
+# Path_Cache.py
+
+import threading
+from collections import OrderedDict
+
+# Tamaño por defecto; ZeldaLikeGame lo ajusta con settings.path_cache_size
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class PathCache:
+    """
+    Caché LRU de rutas compartida por todos los agentes y por el entrenador de la IA.
+
+    Las claves son (tile inicio, tile meta, versión de obstáculos). La versión la decide quien
+    consulta y debe identificar el contenido de los obstáculos (ver Map.obstacle_version), no
+    contar sus cambios: así nunca hace falta invalidar entradas (las de versiones viejas dejan
+    de usarse y acaban expulsadas por LRU) y varias partidas del mismo proceso comparten la
+    caché sin mezclar mapas.
+
+    Las rutas se guardan como tuplas inmutables para poder compartirlas entre entidades. Como
+    cualquier tramo final de una ruta óptima también es óptimo, una ruta guardada responde
+    además a las consultas con la misma meta y versión cuyo inicio está sobre ella.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (inicio, meta, versión) -> tupla de posiciones
+        self.subpath_index = {}  # (meta, versión) -> {tile: (clave dueña, posición en su ruta)}
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+
+    def get(self, start, goal, version):
+        """
+        Busca una ruta en la caché.
+
+        Returns:
+            tuple | None: La ruta (una tupla vacía si se sabe que no hay ruta), o None si no está.
+        """
+        key = (start, goal, version)
+        with self.lock:
+            path = self.entries.get(key)
+            if path is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return path
+
+            owner = self.subpath_index.get((goal, version), {}).get(start)
+            if owner is not None:
+                owner_key, position = owner
+                self.entries.move_to_end(owner_key)
+                self.subpath_hits += 1
+                return self.entries[owner_key][position:]
+
+            self.misses += 1
+            return None
+
+    def put(self, start, goal, version, path):
+        """
+        Guarda una ruta (también las fallidas, como tupla vacía) y expulsa la menos usada si hace falta.
+
+        Returns:
+            tuple: La ruta guardada, inmutable y lista para compartir.
+        """
+        path = tuple(path)
+        key = (start, goal, version)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = path
+
+            index = self.subpath_index.setdefault((goal, version), {})
+            for position, tile in enumerate(path):
+                index.setdefault(tile, (key, position))
+
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+        return path
+
+    def _remove(self, key):
+        """Quita una entrada y las referencias del índice de subrutas que apuntan a ella."""
+        path = self.entries.pop(key)
+        _, goal, version = key
+        index = self.subpath_index.get((goal, version))
+        if index is None:
+            return
+        for tile in path:
+            owner = index.get(tile)
+            if owner is not None and owner[0] == key:
+                del index[tile]
+        if not index:
+            del self.subpath_index[(goal, version)]
+
+    def set_max_entries(self, max_entries):
+        """Cambia el tamaño máximo y expulsa las entradas sobrantes."""
+        with self.lock:
+            self.max_entries = max_entries
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        """Vacía la caché y reinicia los contadores."""
+        with self.lock:
+            self.entries.clear()
+            self.subpath_index.clear()
+            self.hits = self.subpath_hits = self.misses = 0
+
+    def stats(self):
+        """Devuelve los contadores de aciertos y fallos para ajustar el tamaño."""
+        with self.lock:
+            lookups = self.hits + self.subpath_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'subpath_hits': self.subpath_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.subpath_hits) / lookups if lookups else 0.0,
+            }
+
+
+# Caché compartida por todo el proceso (agentes y entrenador)
+PATH_CACHE = PathCache()
@@ -0,0 +1,177 @@
+# Path_Service.py
+
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class PathService:
+    """
+    Servicio central de cálculo de rutas con un número fijo de hilos trabajadores.
+
+    Sustituye al hilo nuevo que cada entidad lanzaba en cada replanificación:
+
+    - Las peticiones de una misma entidad se fusionan: si ya tiene una petición en cola que
+      aún no empezó, la nueva la reemplaza (la entidad solo necesita la ruta más reciente).
+    - Cada petición lleva un número de generación. Un resultado más viejo que la última
+      petición de su entidad se descarta al entregarlo.
+    - Nunca se ejecutan dos peticiones de la misma entidad a la vez, así que el estado propio de
+      la entidad (por ejemplo, su planificador incremental) solo lo toca un trabajador.
+    - Los resultados no se aplican desde los hilos: se entregan en el hilo principal cuando el
+      bucle del juego llama a deliver() en cada tick.
+
+    Quien pide la ruta debe pasar todo lo que necesita el cálculo (posición de inicio incluida)
+    como argumentos, tomados en el momento de la petición.
+
+    Con num_workers=0 el servicio es síncrono: cada petición se calcula en el acto y su resultado
+    se entrega en el siguiente deliver(). Es el modo reproducible (misma semilla, misma partida)
+    que usa la simulación sin ventana.
+    """
+
+    def __init__(self, num_workers, profiler=None):
+        """
+        Args:
+            num_workers (int): Hilos trabajadores (0 = síncrono).
+            profiler (Profiler | None): Si se indica, anota cuánto espera cada petición en la cola.
+        """
+        self.profiler = profiler
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()  # Claves de entidades con una petición lista para ejecutar
+        self.pending = {}  # clave -> (entidad, generación, función, argumentos, hora de la petición) sin empezar
+        self.running = set()  # Claves con una petición en ejecución
+        self.generations = {}  # clave -> generación de la última petición
+        self.results = deque()  # (entidad, generación, resultado) pendientes de entregar
+
+        # Contadores para depuración y ajuste del número de trabajadores
+        self.requests_made = 0
+        self.requests_coalesced = 0
+        self.results_dropped = 0
+
+        self.workers = []
+        for worker_index in range(num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"PathWorker-{worker_index}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def request(self, entity, compute, *args):
+        """
+        Encola el cálculo de una ruta para una entidad.
+
+        Args:
+            entity: La entidad que recibirá el resultado en entity.on_path_ready(resultado).
+            compute (callable): Función que calcula la ruta; se llama como compute(*args) en un trabajador.
+            *args: Argumentos de compute, tomados en el momento de la petición.
+
+        Returns:
+            int: La generación asignada a esta petición.
+        """
+        key = id(entity)
+        if not self.workers:
+            with self.lock:
+                generation = self.generations.get(key, 0) + 1
+                self.generations[key] = generation
+                self.requests_made += 1
+            if self.profiler is not None:
+                self.profiler.begin_request(0.0)
+            result = self._compute(compute, args)
+            with self.lock:
+                self.results.append((entity, generation, result))
+            return generation
+
+        with self.lock:
+            generation = self.generations.get(key, 0) + 1
+            self.generations[key] = generation
+            self.requests_made += 1
+            if key in self.pending:
+                self.requests_coalesced += 1
+            must_enqueue = key not in self.pending and key not in self.running
+            self.pending[key] = (entity, generation, compute, args, time.perf_counter())
+        if must_enqueue:
+            self.queue.put(key)
+        return generation
+
+    def cancel(self, entity):
+        """
+        Descarta la petición en curso de una entidad: si aún no empezó se quita de la cola, y si ya
+        se está calculando su resultado se descartará al entregarlo.
+        """
+        key = id(entity)
+        with self.lock:
+            if key in self.generations:
+                self.generations[key] += 1
+            self.pending.pop(key, None)
+
+    def _worker_loop(self):
+        while True:
+            key = self.queue.get()
+            if key is None:
+                return
+            with self.lock:
+                request = self.pending.pop(key, None)
+                if request is None:
+                    continue
+                self.running.add(key)
+
+            entity, generation, compute, args, requested_at = request
+            if self.profiler is not None:
+                self.profiler.begin_request((time.perf_counter() - requested_at) * 1000)
+            result = self._compute(compute, args)
+
+            with self.lock:
+                self.results.append((entity, generation, result))
+                self.running.discard(key)
+                # Si llegó otra petición mientras esta se ejecutaba, ahora le toca a ella
+                if key in self.pending:
+                    self.queue.put(key)
+
+    def _compute(self, compute, args):
+        """Ejecuta un cálculo; si falla, se informa del error y la entidad recibe una ruta vacía."""
+        try:
+            return compute(*args)
+        except Exception:
+            traceback.print_exc()
+            return []
+
+    def deliver(self, accept=None):
+        """
+        Entrega los resultados listos a sus entidades. Debe llamarse desde el hilo principal.
+
+        Args:
+            accept (callable | None): accept(entidad) -> False para guardar su resultado hasta un
+                                      deliver() posterior (ver Replay.RunReplayer); None = entregar todo.
+
+        Returns:
+            int: Número de resultados entregados (sin contar los descartados por viejos).
+        """
+        delivered = 0
+        held = []
+        while True:
+            with self.lock:
+                if not self.results:
+                    break
+                entity, generation, result = self.results.popleft()
+                is_latest = generation == self.generations.get(id(entity))
+            if not is_latest:
+                self.results_dropped += 1
+                continue
+            if accept is not None and not accept(entity):
+                held.append((entity, generation, result))
+                continue
+            entity.on_path_ready(result)
+            delivered += 1
+        if held:
+            with self.lock:
+                self.results.extendleft(reversed(held))
+        return delivered
+
+    def shutdown(self):
+        """Detiene los trabajadores (las peticiones que queden sin empezar se descartan)."""
+        with self.lock:
+            self.pending.clear()
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+        self.workers = []
@@ -0,0 +1,242 @@
+# Pathfinding_Benchmark.py
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import numpy as np
+import A_Star_Pathfinder
+import Jump_Point_Search
+from A_Star_Pathfinder import PATHFINDING_ENGINES
+from Flow_Field import bfs_distances, UNREACHABLE
+from Grid import build_occupancy_grid, flat_view, index_to_pos
+from HPA_Star import HierarchicalPathfinder
+from Map_Generator import MAP_KINDS, generate_map
+from Mapa import JUGADOR
+
+# Aumentar si cambia el formato del JSON (los informes de versiones distintas no se comparan)
+REPORT_FORMAT_VERSION = 1
+
+DEFAULT_SIZES = (32, 128, 512)
+TILE_SIZE = 32
+# El motor clásico (diccionarios y tuplas) tarda demasiado en mapas más grandes que esto
+ENGINE_MAX_SIDE = {'clasico': 512}
+# Consultas que se repiten con tracemalloc activo para medir el pico de memoria
+MEMORY_SAMPLE_QUERIES = 10
+
+
+class _BenchmarkSettings:
+    def __init__(self, engine_name, cluster_size):
+        self.tile_size = TILE_SIZE
+        self.pathfinding_engine = engine_name
+        self.hpa_cluster_size = cluster_size
+        self.use_path_cache = False  # Se mide el motor, no la caché
+
+
+class _BenchmarkMap:
+    def __init__(self):
+        self.hierarchy = None
+
+
+class _BenchmarkGame:
+    def __init__(self, settings):
+        self.settings = settings
+        self.map = _BenchmarkMap()
+
+
+def generate_queries(map_data, num_queries, seed):
+    """
+    Genera pares (inicio, meta) reproducibles dentro de la zona conectada del jugador.
+
+    Returns:
+        list[tuple]: Pares de posiciones (x, y) de tiles, en el formato de get_path.
+    """
+    grid = build_occupancy_grid(map_data)
+    rows, cols = grid.shape
+    player_row = next(row for row, row_str in enumerate(map_data) if JUGADOR in row_str)
+    player = player_row * cols + map_data[player_row].index(JUGADOR)
+
+    distances = np.array(bfs_distances(flat_view(grid), rows, cols, player))
+    reachable = np.flatnonzero(distances != UNREACHABLE)
+
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(num_queries):
+        start = int(reachable[rng.randrange(len(reachable))])
+        goal = int(reachable[rng.randrange(len(reachable))])
+        queries.append((index_to_pos(start, TILE_SIZE, cols), index_to_pos(goal, TILE_SIZE, cols)))
+    return queries
+
+
+def _reset_engines():
+    """Descarta los motores por hilo para que la siguiente consulta vuelva a preasignar sus arreglos."""
+    A_Star_Pathfinder._thread_engines.indexed = None
+    Jump_Point_Search._thread_engines.jps = None
+
+
+def _run_query(engine, game, start_pos, end_pos, grid):
+    path = engine(game, start_pos, end_pos, grid)
+    # Las rutas perezosas se refinan por completo para medir el trabajo total
+    return path if isinstance(path, list) else list(path)
+
+
+def _percentile(sorted_values, fraction):
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def benchmark_engine(engine_name, map_data, queries, cluster_size=10):
+    """
+    Mide un motor de PATHFINDING_ENGINES sobre un mapa y un conjunto de consultas.
+
+    Hace tres pasadas: la preparación (solo el grafo de 'jerarquico'), las consultas cronometradas
+    una a una y, con tracemalloc activo, la creación del motor desde cero más las primeras
+    MEMORY_SAMPLE_QUERIES consultas para el pico de memoria.
+
+    Returns:
+        dict: Nodos expandidos, latencias (ms), longitud media de ruta y pico de memoria (bytes).
+    """
+    engine = PATHFINDING_ENGINES[engine_name]
+    game = _BenchmarkGame(_BenchmarkSettings(engine_name, cluster_size))
+    grid = build_occupancy_grid(map_data)
+
+    setup_start = time.perf_counter()
+    if engine_name == 'jerarquico':
+        game.map.hierarchy = HierarchicalPathfinder(grid, cluster_size)
+    setup_seconds = time.perf_counter() - setup_start
+
+    # Calentamiento: la primera consulta preasigna los arreglos del motor
+    _run_query(engine, game, *queries[0], grid)
+
+    latencies = []
+    nodes = []
+    path_lengths = []
+    for start_pos, end_pos in queries:
+        query_start = time.perf_counter()
+        path = _run_query(engine, game, start_pos, end_pos, grid)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+        nodes.append(A_Star_Pathfinder.last_nodes_expanded(engine_name, game))
+        path_lengths.append(len(path))
+
+    _reset_engines()
+    tracemalloc.start()
+    try:
+        if engine_name == 'jerarquico':
+            game.map.hierarchy = HierarchicalPathfinder(grid, cluster_size)
+        for start_pos, end_pos in queries[:MEMORY_SAMPLE_QUERIES]:
+            _run_query(engine, game, start_pos, end_pos, grid)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    found = [length for length in path_lengths if length]
+    return {
+        'queries': len(queries),
+        'found': len(found),
+        'mean_path_length': sum(found) / len(found) if found else 0.0,
+        'nodes_expanded_mean': None if nodes[0] is None else sum(nodes) / len(nodes),
+        'latency_ms_median': _percentile(latencies, 0.5),
+        'latency_ms_p99': _percentile(latencies, 0.99),
+        'latency_ms_mean': sum(latencies) / len(latencies),
+        'setup_seconds': setup_seconds,
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def run_benchmark(map_kinds=tuple(MAP_KINDS), sizes=DEFAULT_SIZES, engines=tuple(PATHFINDING_ENGINES),
+                  num_queries=100, seed=0, cluster_size=10):
+    """
+    Ejecuta el conjunto completo: cada tipo de mapa y tamaño (mapas cuadrados) con cada motor.
+
+    Returns:
+        dict: Informe listo para json.dump, con los parámetros usados y una entrada por combinación.
+    """
+    results = []
+    for size in sizes:
+        for map_kind in map_kinds:
+            map_data = generate_map(map_kind, size, size, seed)
+            queries = generate_queries(map_data, num_queries, seed)
+            for engine_name in engines:
+                if size > ENGINE_MAX_SIDE.get(engine_name, size):
+                    continue
+                print(f"  {map_kind} {size}x{size} - {engine_name}...", file=sys.stderr)
+                entry = {'map': map_kind, 'width': size, 'height': size, 'engine': engine_name}
+                entry.update(benchmark_engine(engine_name, map_data, queries, cluster_size))
+                results.append(entry)
+
+    return {
+        'format_version': REPORT_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'seed': seed,
+        'num_queries': num_queries,
+        'hpa_cluster_size': cluster_size,
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current, tolerance=0.10):
+    """
+    Busca regresiones entre dos informes de run_benchmark.
+
+    Se compara la latencia mediana y los nodos expandidos de cada combinación (mapa, tamaño,
+    motor) presente en ambos.
+
+    Returns:
+        list[str]: Una descripción por cada métrica que empeoró más que la tolerancia.
+    """
+    if baseline.get('format_version') != current.get('format_version'):
+        raise ValueError("Los informes tienen formatos distintos y no se pueden comparar")
+
+    def key(entry):
+        return entry['map'], entry['width'], entry['height'], entry['engine']
+
+    baseline_entries = {key(entry): entry for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        previous = baseline_entries.get(key(entry))
+        if previous is None:
+            continue
+        for metric in ('latency_ms_median', 'nodes_expanded_mean'):
+            old_value = previous.get(metric)
+            new_value = entry.get(metric)
+            if old_value and new_value is not None and new_value > old_value * (1 + tolerance):
+                regressions.append(f"{entry['map']} {entry['width']}x{entry['height']} {entry['engine']}: "
+                                   f"{metric} {old_value:.3f} -> {new_value:.3f} (+{new_value / old_value - 1:.0%})")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark de los motores de búsqueda de rutas.")
+    parser.add_argument('--maps', nargs='+', choices=list(MAP_KINDS), default=list(MAP_KINDS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help="Lados de los mapas cuadrados (p. ej. 32 128 512 2048)")
+    parser.add_argument('--engines', nargs='+', choices=list(PATHFINDING_ENGINES), default=list(PATHFINDING_ENGINES))
+    parser.add_argument('--queries', type=int, default=100, help="Consultas por mapa")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cluster-size', type=int, default=10, help="Lado de los clusters de 'jerarquico'")
+    parser.add_argument('--output', help="Archivo JSON de salida (por defecto, la salida estándar)")
+    parser.add_argument('--compare', help="Informe JSON anterior con el que buscar regresiones")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Empeoramiento tolerado (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.maps, args.sizes, args.engines, args.queries, args.seed, args.cluster_size)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            regressions = compare_reports(json.load(baseline_file), report, args.tolerance)
+        for regression in regressions:
+            print(f"Regresión: {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
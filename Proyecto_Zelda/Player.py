@@ -3,16 +3,17 @@
 import pygame
 import numpy as np
 from A_Star_Pathfinder import get_path, d
-from Utils import gen_next_route, d, snap_to_grid
-import threading
+from Utils import gen_next_route, d, snap_to_grid, MovementBuffer
+from Grid import stamp_tiles, rect_tiles, hash_tiles, pos_to_index, index_to_pos
+from D_Star_Lite import DStarLite
+from Asset_Cache import load_image
 
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, game, position, goal_pos):
         super().__init__()
         self.game = game
-        self.image = pygame.image.load('imagenes/jugador.png').convert_alpha()
-        self.image = pygame.transform.scale(self.image, game.settings.player_size)
+        self.image = load_image('jugador.png', game.settings.player_size)
         self.rect = self.image.get_rect(center=position)
         self.position = np.array(position, dtype=float)
         self.goal_pos = goal_pos
@@ -20,63 +21,167 @@ class Player(pygame.sprite.Sprite):
         self.ia_model = None
         self.scaler = None
         self.path = []
-        self.path_positions = []
+        self.path_positions = MovementBuffer()
         self.recalculating = False
-        # self.last_path_update_time ya no es necesario para la lógica principal de recálculo
+        # True mientras la política aprendida mueve a la entidad (ver Learned_Policy.PolicyStep)
+        self.policy_controlled = False
+        # Solo se usa con el planificador incremental (ver decide_move)
+        self.last_path_update_time = self.game.get_time()
+
+        # Planificador incremental (D* Lite) y lo que ya conoce de la cuadrícula
+        self.planner = None
+        self.planner_zone_tiles = set()  # Tiles de zonas de peligro marcados en el planificador
+        self.planner_log_position = 0  # Posición leída de Map.tile_change_log
+
+        # Resumen de la capa de zonas de peligro para la caché de rutas (modo A*): depende solo de
+        # los tiles cubiertos y se recalcula cuando cambian.
+        self.overlay_tiles = set()
+        self.overlay_hash = hash_tiles(self.overlay_tiles)
 
     def set_model(self, model, scaler):
         self.ia_model = model
         self.scaler = scaler
 
-    def update(self, walls, dynamic_obstacles):
-        self.decide_move(walls, dynamic_obstacles)
+    def update(self, walls, get_danger_zones):
+        """
+        Args:
+            walls (np.ndarray): Cuadrícula de ocupación estática del mapa.
+            get_danger_zones (callable): Devuelve los rects de las zonas de peligro de los enemigos;
+                                         solo se llama al pedir una ruta (ver ZeldaLikeGame._danger_zones).
+        """
+        self.decide_move(walls, get_danger_zones)
 
         # Si hay pasos de movimiento en el buffer, ejecutar el siguiente.
         if self.path_positions:
-            next_pos = self.path_positions.pop(0)
-            self.position = next_pos
+            self.position[:] = self.path_positions.pop()
             self.rect.center = self.position
 
-    def decide_move(self, walls, dynamic_obstacles):
+    def decide_move(self, walls, get_danger_zones):
+        if self.policy_controlled:
+            return
+
         player_tile_pos = snap_to_grid(self.position, self.game.settings.tile_size)
         goal_tile_pos = snap_to_grid(self.goal_pos, self.game.settings.tile_size)
 
         # Lógica para el movimiento final de aproximación a la meta.
         if player_tile_pos == goal_tile_pos:
             if not self.path_positions and not self.recalculating:
-                self.path.clear()
-                self.path.append(self.goal_pos)
+                self.path = [self.goal_pos]
                 gen_next_route(self, self.game.settings.player_speed, m=1)
             return
 
         ### --- LÓGICA DE MOVIMIENTO Y RECÁLCULO CORREGIDA --- ###
 
+        # Con el planificador incremental, reparar la ruta es barato: se hace cada
+        # player_recalculate_path_interval aunque todavía quede camino, para reaccionar a los enemigos.
+        current_time = self.game.get_time()
+        if (self.game.settings.player_use_incremental_planner and self.path and not self.recalculating and
+                current_time - self.last_path_update_time > self.game.settings.player_recalculate_path_interval):
+            self.start_path_calculation(walls, get_danger_zones)
+
         # 1. Si NO nos estamos moviendo Y NO estamos ya calculando una ruta...
         if not self.path_positions and not self.recalculating:
 
             # 2. Y si el camino A* está vacío (necesitamos una nueva ruta)...
             if not self.path:
                 # 3. Entonces, calcular una nueva ruta.
-                all_obstacles = walls + dynamic_obstacles
-                threading.Thread(target=self.calculate_path_async, args=(self.goal_pos, all_obstacles)).start()
+                self.start_path_calculation(walls, get_danger_zones)
 
             # 4. Si después de todo, TENEMOS una ruta A* (ya sea recién calculada o una que sobró)...
             if self.path:
                 # 5. Generar los pasos suaves para comenzar a movernos.
                 gen_next_route(self, self.game.settings.player_speed, m=5)
 
-    def calculate_path_async(self, target_position, all_obstacles):
-        self.recalculating = True
-
-        start_pos = snap_to_grid(self.position, self.game.settings.tile_size)
-        end_pos = snap_to_grid(target_position, self.game.settings.tile_size)
+    def start_path_calculation(self, walls, get_danger_zones):
+        """Pide una nueva ruta al PathService, con el planificador configurado."""
+        tile_size = self.game.settings.tile_size
+        self.last_path_update_time = self.game.get_time()
 
-        path = get_path(self.game, start_pos, end_pos, all_obstacles)
+        # El inicio y las zonas de peligro se toman ahora, no desde el trabajador. La ruta nueva
+        # continúa donde termina el movimiento ya encolado: si partiera del tile actual, al acabarse
+        # el buffer el jugador volvería a ese tile, que ya dejó atrás.
+        start_pos = self.route_anchor()
+        zone_tiles = rect_tiles(get_danger_zones(), tile_size, walls.shape)
+        self.recalculating = True
 
+        if self.game.settings.player_use_incremental_planner:
+            self.game.path_service.request(self, self.calculate_path_incremental, start_pos, zone_tiles, walls)
+        else:
+            if zone_tiles != self.overlay_tiles:
+                self.overlay_tiles = zone_tiles
+                self.overlay_hash = hash_tiles(zone_tiles)
+            obstacles_version = self.game.map.obstacle_version() + (self.overlay_hash,)
+            end_pos = snap_to_grid(self.goal_pos, tile_size)
+            self.game.path_service.request(self, self.calculate_path_async, start_pos, end_pos, walls, zone_tiles,
+                                           obstacles_version, len(self.game.map.tile_change_log))
+
+    def calculate_path_async(self, start_pos, end_pos, walls, zone_tiles, obstacles_version=None, log_position=None):
+        """Se ejecuta en un trabajador del PathService; solo calcula, no modifica al jugador."""
+        if self.game.path_pool is not None:
+            return self.game.path_pool.get_path(start_pos, end_pos, zone_tiles, obstacles_version, log_position)
+        # Las zonas de peligro se estampan en una capa propia de esta consulta.
+        all_obstacles = stamp_tiles(walls, zone_tiles)
+        return get_path(self.game, start_pos, end_pos, all_obstacles, version=obstacles_version)
+
+    def route_anchor(self):
+        """Tile donde termina el movimiento ya encolado (o el actual, si no queda ninguno)."""
+        position = self.path_positions.last() if self.path_positions else self.position
+        return snap_to_grid(position, self.game.settings.tile_size)
+
+    def on_path_ready(self, path):
+        """Recibe en el hilo principal la ruta de la última petición (PathService.deliver)."""
         if path:
-            self.path = path
+            # La ruta empieza en el tile de inicio, donde el jugador ya está (o termina el buffer)
+            self.path = path[1:] if tuple(path[0]) == self.route_anchor() else path
         else:
             # Si A* falla, limpiar la ruta para forzar un nuevo intento en el siguiente ciclo.
-            self.path.clear()
+            self.path = []
+
+        self.recalculating = False
+
+    def collect_planner_changes(self, walls, zone_tiles):
+        """
+        Calcula qué tiles cambiaron de estado para el planificador desde la última consulta.
+
+        Combina los cambios del mapa (Map.tile_change_log) con la diferencia entre las zonas de
+        peligro pedidas y las que el planificador ya tiene marcadas. Se ejecuta en el trabajador
+        junto con la planificación: como cada petición lleva el conjunto completo de zonas, una
+        petición fusionada con una posterior no pierde cambios.
+
+        Returns:
+            list[tuple]: Pares (índice, bloqueado) para DStarLite.plan.
+        """
+        tile_size = self.game.settings.tile_size
+        change_log = self.game.map.tile_change_log
+
+        if self.planner is None:
+            goal_index = pos_to_index(snap_to_grid(self.goal_pos, tile_size), tile_size, walls.shape)
+            self.planner = DStarLite(walls, goal_index)
+            self.planner_zone_tiles = set()
+            self.planner_log_position = len(change_log)
+
+        # Un tile que sigue dentro de una zona de peligro sigue bloqueado aunque el mapa lo libere
+        log_end = len(change_log)
+        changes = [(index, blocked or index in zone_tiles)
+                   for index, blocked in change_log[self.planner_log_position:log_end]]
+        self.planner_log_position = log_end
+
+        changes.extend((index, True) for index in zone_tiles - self.planner_zone_tiles)
+        changes.extend((index, bool(walls.flat[index])) for index in self.planner_zone_tiles - zone_tiles)
+        self.planner_zone_tiles = zone_tiles
+        return changes
+
+    def calculate_path_incremental(self, start_pos, zone_tiles, walls):
+        """Se ejecuta en un trabajador del PathService: repara la ruta con D* Lite."""
+        profiler = self.game.profiler
+        start_time = profiler.start() if profiler is not None else 0.0
+        tile_size = self.game.settings.tile_size
+        changes = self.collect_planner_changes(walls, zone_tiles)
+        start_index = pos_to_index(start_pos, tile_size, (self.planner.rows, self.planner.cols))
+        if start_index == -1:
+            return []
+        path = [index_to_pos(index, tile_size, self.planner.cols) for index in self.planner.plan(start_index, changes)]
+        if profiler is not None:
+            profiler.record_path('dstar', start_time, path, self.planner.nodes_expanded)
+        return path
 
-        self.recalculating = False
\ No newline at end of file
@@ -0,0 +1,202 @@
+# Process_Path_Pool.py
+
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+from A_Star_Pathfinder import get_path
+from Grid import stamp_tiles
+from Path_Cache import PATH_CACHE
+
+
+class _WorkerSettings:
+    """Lo mínimo de Settings que necesita get_path dentro de un proceso trabajador."""
+
+    def __init__(self, tile_size, pathfinding_engine):
+        self.tile_size = tile_size
+        self.pathfinding_engine = pathfinding_engine
+        self.use_path_cache = False  # La caché vive en el proceso principal
+
+
+class _WorkerGame:
+    def __init__(self, settings):
+        self.settings = settings
+        self.map = None  # Sin jerarquía: el motor 'jerarquico' usa 'indices' en los trabajadores
+
+
+# Estado de cada proceso trabajador (lo rellena _init_worker)
+_worker_state = {}
+
+
+def _init_worker(shm_name, shape, tile_size, pathfinding_engine):
+    """Conecta el trabajador a la cuadrícula compartida una sola vez, al arrancar."""
+    # Con 'spawn' los trabajadores comparten el resource_tracker del proceso principal, que es
+    # quien libera el bloque en close().
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state['shm'] = shm
+    _worker_state['grid'] = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    _worker_state['game'] = _WorkerGame(_WorkerSettings(tile_size, pathfinding_engine))
+
+
+def _find_path(start_pos, end_pos, overlay_tiles):
+    """Tarea del trabajador: estampa la capa dinámica (si la hay) y busca la ruta."""
+    grid = stamp_tiles(_worker_state['grid'], overlay_tiles)
+    return list(get_path(_worker_state['game'], start_pos, end_pos, grid))
+
+
+class ProcessPathPool:
+    """
+    Pool de procesos para buscar rutas en paralelo de verdad (sin competir por el GIL).
+
+    La cuadrícula de ocupación del mapa se copia una vez a memoria compartida y los trabajadores
+    se conectan a ella al arrancar, así que cada tarea solo envía el inicio, la meta y los índices
+    de los tiles de su capa dinámica. Los cambios del mapa (Map.tile_change_log) se aplican a la
+    copia compartida antes de cada consulta, nunca durante una búsqueda.
+
+    get_path bloquea hasta tener la ruta: está pensado para llamarse desde los hilos del
+    PathService, que son los que reparten las consultas entre los procesos. La caché de rutas
+    se consulta y se llena en el proceso principal.
+    """
+
+    def __init__(self, settings, game_map, num_processes):
+        """
+        Args:
+            settings: Settings del juego (tile_size, pathfinding_engine, use_path_cache).
+            game_map: Objeto con occupancy_grid y tile_change_log (normalmente Map).
+            num_processes (int): Número de procesos trabajadores.
+        """
+        self.settings = settings
+        self.map = game_map
+        # Cerrojo de lectores (búsquedas en curso) y escritor (cambios del mapa), ver _begin_search
+        self.condition = threading.Condition()
+        self.active_searches = 0
+
+        grid = game_map.occupancy_grid
+        self.shm = shared_memory.SharedMemory(create=True, size=grid.nbytes)
+        self.grid = np.ndarray(grid.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.grid[:] = grid
+        self.log_position = len(game_map.tile_change_log)
+
+        # 'spawn' en lugar de 'fork': el proceso principal ya tiene hilos en marcha
+        context = multiprocessing.get_context('spawn')
+        self.pool = context.Pool(num_processes, initializer=_init_worker,
+                                 initargs=(self.shm.name, grid.shape, settings.tile_size,
+                                           settings.pathfinding_engine))
+
+    def _begin_search(self):
+        """
+        Aplica a la cuadrícula compartida los tiles que cambiaron y registra una búsqueda en curso.
+
+        Es un cerrojo de lectores y escritor: las búsquedas leen la cuadrícula en paralelo y los
+        cambios solo se escriben cuando no hay ninguna en curso, así que un trabajador nunca ve
+        una cuadrícula a medio actualizar. Las búsquedas que llegan mientras hay cambios
+        pendientes también esperan a que se apliquen.
+
+        Returns:
+            int: Posición de Map.tile_change_log que refleja la cuadrícula durante la búsqueda.
+        """
+        with self.condition:
+            change_log = self.map.tile_change_log
+            while len(change_log) != self.log_position:
+                if self.active_searches:
+                    self.condition.wait()
+                    continue
+                log_end = len(change_log)
+                for index, blocked in change_log[self.log_position:log_end]:
+                    self.grid.flat[index] = 1 if blocked else 0
+                self.log_position = log_end
+            self.active_searches += 1
+            return self.log_position
+
+    def _end_search(self):
+        """Marca el fin de una búsqueda; la última en terminar deja pasar los cambios pendientes."""
+        with self.condition:
+            self.active_searches -= 1
+            if not self.active_searches:
+                self.condition.notify_all()
+
+    def get_path(self, start_pos, end_pos, overlay_tiles=(), version=None, log_position=None):
+        """
+        Busca una ruta en un proceso trabajador, con la misma semántica que A_Star_Pathfinder.get_path.
+
+        Args:
+            start_pos (tuple): Posición (x, y) del tile de inicio.
+            end_pos (tuple): Posición (x, y) del tile destino.
+            overlay_tiles (iterable): Índices planos de tiles ocupados solo para esta consulta.
+            version: Versión de los obstáculos (estáticos y capa) para la caché, o None.
+            log_position (int | None): Longitud de Map.tile_change_log cuando se tomó version. Si
+                el mapa cambió después, la ruta se busca sobre la cuadrícula nueva y no se guarda
+                en la caché con una versión que ya no le corresponde.
+
+        Returns:
+            list | tuple: La ruta (una tupla si pasó por la caché), o una secuencia vacía si no hay ruta.
+        """
+        use_cache = version is not None and getattr(self.settings, 'use_path_cache', True)
+        if use_cache:
+            cached_path = PATH_CACHE.get(start_pos, end_pos, version)
+            if cached_path is not None:
+                return cached_path
+
+        # La capa dinámica viaja entera con cada tarea: es de una consulta (las zonas de peligro
+        # del jugador, unas pocas decenas de tiles; los enemigos no tienen) y la puede atender
+        # cualquier trabajador, así que no hay un estado anterior sobre el que enviar diferencias.
+        searched_position = self._begin_search()
+        try:
+            path = self.pool.apply(_find_path, (start_pos, end_pos, tuple(overlay_tiles)))
+        finally:
+            self._end_search()
+
+        if use_cache and searched_position == log_position:
+            path = PATH_CACHE.put(start_pos, end_pos, version, path)
+        return path
+
+    def close(self):
+        """Detiene los procesos y libera la memoria compartida."""
+        self.pool.close()
+        self.pool.join()
+        self.grid = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+if __name__ == '__main__':
+    # Rendimiento con 1, 2 y 4 procesos sobre el mapa incluido (consultas lanzadas desde hilos,
+    # como hace el PathService).
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from Mapa import MAP_DATA
+    from Grid import build_occupancy_grid, index_to_pos, LIBRE
+
+    class MockSettings:
+        def __init__(self):
+            self.tile_size = 32
+            self.pathfinding_engine = 'indices'
+            self.use_path_cache = False
+
+    class MockMap:
+        def __init__(self):
+            self.occupancy_grid = build_occupancy_grid(MAP_DATA)
+            self.tile_change_log = []
+
+    mock_settings = MockSettings()
+    mock_map = MockMap()
+    tile_size = mock_settings.tile_size
+    cols = mock_map.occupancy_grid.shape[1]
+    free_tiles = [int(index) for index in (mock_map.occupancy_grid.ravel() == LIBRE).nonzero()[0]]
+
+    random.seed(0)
+    num_queries = 2000
+    queries = [(index_to_pos(random.choice(free_tiles), tile_size, cols),
+                index_to_pos(random.choice(free_tiles), tile_size, cols)) for _ in range(num_queries)]
+
+    print(f"{num_queries} consultas, {multiprocessing.cpu_count()} núcleos disponibles")
+    for num_processes in (1, 2, 4):
+        path_pool = ProcessPathPool(mock_settings, mock_map, num_processes)
+        path_pool.get_path(*queries[0])  # Esperar a que arranquen los trabajadores
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(num_processes) as executor:
+            list(executor.map(lambda query: path_pool.get_path(*query), queries))
+        elapsed = time.perf_counter() - start_time
+        path_pool.close()
+        print(f"  {num_processes} procesos: {elapsed * 1000:.1f} ms ({num_queries / elapsed:.0f} consultas/s)")
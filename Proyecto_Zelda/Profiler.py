@@ -0,0 +1,193 @@
+# Profiler.py
+
+import csv
+import json
+import threading
+import time
+from collections import deque
+import numpy as np
+import pygame
+
+# Columnas de cada búsqueda de ruta en la traza (ver Profiler.record_path)
+TRACE_FIELDS = ('frame', 'motor', 'ms', 'espera_cola_ms', 'nodos_expandidos', 'longitud', 'exito', 'cache')
+
+
+class RingCounter:
+    """
+    Últimas capacity muestras de una métrica en un arreglo circular preasignado.
+
+    Añadir una muestra no crea objetos ni hace crecer nada; los percentiles se calculan solo al
+    pedir el resumen.
+    """
+
+    def __init__(self, capacity):
+        self.values = np.zeros(capacity)
+        self.count = 0  # Muestras añadidas en total (también las que ya se sobrescribieron)
+        self.total = 0.0  # Suma de todas ellas
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+        self.total += value
+
+    def summary(self):
+        """
+        Returns:
+            dict: Número de muestras y su suma, y p50, p95, p99 y máximo de las que siguen en el anillo.
+        """
+        samples = self.values[:min(self.count, len(self.values))]
+        if not len(samples):
+            return {'n': 0, 'total': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+        return {'n': self.count, 'total': self.total, 'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                'max': float(samples.max())}
+
+
+class Profiler:
+    """
+    Tiempos por frame del bucle del juego y de cada búsqueda de ruta.
+
+    Cada métrica (fases del frame en ms, gen_next_route, get_path, espera en la cola del
+    PathService, nodos expandidos, longitud de ruta) va a su propio RingCounter, y cada búsqueda
+    se anota además en una traza acotada que export() guarda en CSV o JSON.
+
+    Las búsquedas se anotan desde los hilos del PathService, así que las escrituras van con un
+    lock. Con el perfilado desactivado el juego no crea ningún Profiler (game.profiler es None) y
+    cada punto de medida se reduce a esa comprobación.
+    """
+
+    def __init__(self, capacity=1024, trace_capacity=None):
+        """
+        Args:
+            capacity (int): Muestras que guarda cada contador.
+            trace_capacity (int | None): Búsquedas que guarda la traza (None = las mismas que capacity).
+        """
+        self.capacity = capacity
+        self.counters = {}  # nombre -> RingCounter
+        self.trace = deque(maxlen=trace_capacity or capacity)
+        self.frame = 0  # Frames terminados (ver end_frame)
+        self.lock = threading.Lock()
+        self._request_state = threading.local()  # Espera en cola de la petición en curso de cada hilo
+
+        self._overlay = None
+        self._overlay_frame = -1
+        self._font = None
+
+    # Medida de fases: start = profiler.start(); ...; profiler.stop('fase', start)
+    start = staticmethod(time.perf_counter)
+
+    def stop(self, name, start_time):
+        """Anota en el contador name los milisegundos transcurridos desde start_time."""
+        self.add(name, (time.perf_counter() - start_time) * 1000)
+
+    def add(self, name, value):
+        with self.lock:
+            counter = self.counters.get(name)
+            if counter is None:
+                counter = self.counters[name] = RingCounter(self.capacity)
+            counter.add(value)
+
+    def end_frame(self):
+        self.frame += 1
+
+    def begin_request(self, queue_wait_ms):
+        """Lo llama el PathService en el hilo que va a ejecutar una petición, antes de empezarla."""
+        self._request_state.queue_wait_ms = queue_wait_ms
+        self.add('cola_rutas', queue_wait_ms)
+
+    def record_path(self, engine_name, start_time, path, nodes_expanded, cache_hit=False):
+        """
+        Anota una búsqueda de ruta (get_path o el planificador incremental).
+
+        Args:
+            engine_name (str): Motor usado ('indices', 'dstar', ...).
+            start_time (float): Valor de start() al empezar la búsqueda.
+            path: La ruta devuelta (vacía si no hay ruta).
+            nodes_expanded (int | None): Nodos expandidos, o None si el motor no los cuenta.
+            cache_hit (bool): True si la ruta salió de la caché de rutas.
+        """
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        queue_wait_ms = getattr(self._request_state, 'queue_wait_ms', None)
+        self._request_state.queue_wait_ms = None  # Una búsqueda por petición lleva su espera
+        length = len(path)
+        self.add('get_path', elapsed_ms)
+        self.add('longitud_ruta', length)
+        if nodes_expanded is not None:
+            self.add('nodos_expandidos', nodes_expanded)
+        with self.lock:
+            self.trace.append((self.frame, engine_name, elapsed_ms, queue_wait_ms, nodes_expanded, length,
+                               length > 0, cache_hit))
+
+    def summaries(self):
+        """Devuelve {métrica: resumen} (ver RingCounter.summary), ordenado por nombre."""
+        with self.lock:
+            return {name: self.counters[name].summary() for name in sorted(self.counters)}
+
+    def export(self, path):
+        """
+        Guarda la traza de búsquedas y los resúmenes: en CSV (una fila por búsqueda, los resúmenes
+        en un .resumen.csv al lado) o en JSON si path termina en .json.
+        """
+        with self.lock:
+            trace = list(self.trace)
+        summaries = self.summaries()
+        if path.endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as trace_output:
+                json.dump({'frames': self.frame, 'resumen': summaries,
+                           'busquedas': [dict(zip(TRACE_FIELDS, record)) for record in trace]},
+                          trace_output, indent=1)
+            return
+
+        with open(path, 'w', newline='', encoding='utf-8') as trace_output:
+            writer = csv.writer(trace_output)
+            writer.writerow(TRACE_FIELDS)
+            writer.writerows(trace)
+        summary_path = f"{path.rsplit('.', 1)[0]}.resumen.csv"
+        with open(summary_path, 'w', newline='', encoding='utf-8') as summary_output:
+            writer = csv.writer(summary_output)
+            writer.writerow(('metrica', 'n', 'total', 'p50', 'p95', 'p99', 'max'))
+            for name, summary in summaries.items():
+                writer.writerow((name, summary['n'], summary['total'], summary['p50'], summary['p95'], summary['p99'],
+                                 summary['max']))
+
+    def report_lines(self):
+        """Una línea de texto por métrica con sus percentiles."""
+        return [f"{name}: p50 {summary['p50']:.2f}  p95 {summary['p95']:.2f}  p99 {summary['p99']:.2f}  "
+                f"max {summary['max']:.2f}  (n={summary['n']})"
+                for name, summary in self.summaries().items()]
+
+    def overlay(self, refresh_frames=30):
+        """
+        Superficie semitransparente con report_lines() para dibujar sobre el juego.
+
+        Se vuelve a componer cada refresh_frames frames: renderizar texto en cada frame costaría
+        más que lo que se mide.
+        """
+        if self._overlay is None or self.frame - self._overlay_frame >= refresh_frames:
+            if self._font is None:
+                self._font = pygame.font.Font(None, 20)
+            lines = [self._font.render(line, True, (255, 255, 255)) for line in self.report_lines()]
+            width = max((line.get_width() for line in lines), default=0) + 8
+            height = sum(line.get_height() for line in lines) + 8
+            overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            overlay.fill((0, 0, 0, 170))
+            y = 4
+            for line in lines:
+                overlay.blit(line, (4, y))
+                y += line.get_height()
+            self._overlay = overlay
+            self._overlay_frame = self.frame
+        return self._overlay
+
+
+if __name__ == '__main__':
+    # Coste de una medida (start + stop) frente a no medir.
+    profiler = Profiler()
+    iterations = 100000
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        phase_start = profiler.start()
+        profiler.stop('fase', phase_start)
+    per_measure = (time.perf_counter() - start_time) / iterations
+    print(f"Una medida: {per_measure * 1e6:.2f} µs")
+    print("\n".join(profiler.report_lines()))
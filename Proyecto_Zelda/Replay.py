@@ -0,0 +1,355 @@
+# Replay.py
+
+import argparse
+import hashlib
+import json
+import os
+import zlib
+import numpy as np
+from Grid import hash_grid
+
+# Grabación de una partida (.npz, ver RunRecorder.finish):
+#   meta: JSON (en bytes) con la versión, semillas, hash del mapa, configuración, ticks, resultado y
+#         la huella de cada modelo aplicado
+#   times: int64 (ticks + 1), tiempo de juego (get_time) congelado en cada tick (-1 = no se pidió)
+#   checksums: uint32 (ticks + 1), CRC32 de las posiciones de todos los agentes al final de cada tick
+#   deliveries: int32 (n, 2), (tick, agente) de cada ruta entregada; agente 0 = jugador, 1.. = enemigos
+REPLAY_VERSION = 2
+
+# Partidas de replays/ (python Replay.py --record-fixtures las vuelve a grabar):
+#   nombre -> (mapa en replays/, cambios de Settings, con ventana)
+# Son partidas largas (de mil a varios miles de ticks) para que el coste de cada fase no quede
+# por debajo del ruido del reloj. La de ventana usa hilos para las rutas y entrena en segundo plano.
+# Las de campo de flujo cubren los modos pensados para muchos enemigos, que no son los de por defecto.
+FIXTURES = {
+    'laberinto': ('laberinto_64x48.zmap', {}, False),
+    'laberinto_flujo': ('laberinto_64x48.zmap',
+                        {'enemy_use_flow_field': True, 'player_use_incremental_planner': True}, False),
+    'laberinto_politica': ('laberinto_64x48.zmap', {'use_learned_policy': True}, False),
+    'laberinto_ventana': ('laberinto_64x48.zmap', {}, True),
+    'abierto_lejanos': ('abierto_256x192.zmap', {'enemy_use_flow_field': True}, False),
+}
+# Mapas de las partidas: archivo -> (mapa de Batch_Runner.load_map_spec, enemigos, distancia
+# mínima de los enemigos al jugador en tiles)
+FIXTURE_MAPS = {
+    'laberinto_64x48.zmap': ('laberinto:64x48:2', 10, 30),
+    'abierto_256x192.zmap': ('abierto:256x192:1', 60, 150),
+}
+
+
+def _settings_snapshot(settings):
+    """Atributos de Settings que se pueden guardar en JSON (las tuplas pasan a listas)."""
+    return {name: list(value) if isinstance(value, tuple) else value
+            for name, value in vars(settings).items()
+            if isinstance(value, (bool, int, float, str, tuple, type(None)))}
+
+
+def _model_fingerprint(model, scaler):
+    """Resumen de los pesos de un modelo y de su escalador (distingue modelos entrenados con otra semilla)."""
+    digest = hashlib.sha256()
+    for array in [*model.coefs_, *model.intercepts_, scaler.mean_, scaler.scale_]:
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _positions_checksum(game):
+    """CRC32 de las posiciones del jugador y de los enemigos (en el orden del grupo)."""
+    if game.agent_store is not None:
+        enemies = game.agent_store.positions
+    else:
+        enemies = np.array([enemy.position for enemy in game.enemies_group], dtype=float).reshape(-1, 2)
+    checksum = zlib.crc32(np.ascontiguousarray(game.player.position, dtype=float).tobytes())
+    return zlib.crc32(np.ascontiguousarray(enemies, dtype=float).tobytes(), checksum)
+
+
+class _RunLog:
+    """
+    Lo común a grabar y reproducir: el juego llama a estos métodos (game.run_log) en los puntos
+    donde la partida depende de algo externo a la simulación (el reloj, cuándo llega una ruta de
+    un hilo, cuándo termina el entrenamiento en segundo plano, la semilla del entrenamiento).
+    """
+
+    def __init__(self):
+        self.times = [-1]  # Índice = tick
+        self.checksums = [0]
+        self.agent_indices = {}  # id(entidad) -> índice de agente
+
+    def _agent_index(self, game, entity):
+        if not self.agent_indices:
+            agents = [game.player, *game.enemies_group]
+            self.agent_indices = {id(agent): index for index, agent in enumerate(agents)}
+        return self.agent_indices[id(entity)]
+
+    def _grow(self, tick):
+        while len(self.times) <= tick:
+            self.times.append(-1)
+            self.checksums.append(0)
+
+
+class RunRecorder(_RunLog):
+    """
+    Graba una partida (con o sin ventana) para repetirla después tick a tick (ver RunReplayer).
+
+    Con ventana, el tiempo de juego se congela al principio de cada tick (todas las llamadas a
+    get_time de un tick ven el mismo valor) para poder repetirlo exactamente.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.meta = {'version': REPLAY_VERSION}
+        self.deliveries = []
+        self.model_ticks = {}
+        self.model_fingerprints = {}
+
+    def start(self, game):
+        """Anota el mapa y la configuración (el mapa ya está cargado; las entidades, aún no)."""
+        self.meta['map_hash'] = hash_grid(game.map.tile_types)
+        self.meta['settings'] = _settings_snapshot(game.settings)
+
+    def time(self, game):
+        self._grow(game.ticks)
+        if self.times[game.ticks] < 0:
+            self.times[game.ticks] = game.clock_time()
+        return self.times[game.ticks]
+
+    def training_seed(self, seed):
+        self.meta['training_seed'] = seed
+        return seed
+
+    def accept_model(self, game, name, model, scaler):
+        self.model_ticks[name] = game.ticks
+        self.model_fingerprints[name] = _model_fingerprint(model, scaler)
+        return True
+
+    def accept_path(self, game, entity):
+        self.deliveries.append((game.ticks, self._agent_index(game, entity)))
+        return True
+
+    def begin_tick(self, game):
+        pass
+
+    def end_tick(self, game):
+        self._grow(game.ticks)
+        self.checksums[game.ticks] = _positions_checksum(game)
+
+    def finish(self, game, outcome):
+        """Guarda la grabación (escritura atómica)."""
+        self.meta.update(ticks=game.ticks, result=outcome, model_ticks=self.model_ticks,
+                         model_fingerprints=self.model_fingerprints)
+        self._grow(game.ticks)
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as replay_output:
+            np.savez_compressed(replay_output,
+                                meta=np.frombuffer(json.dumps(self.meta).encode('utf-8'), dtype=np.uint8),
+                                times=np.array(self.times, dtype=np.int64),
+                                checksums=np.array(self.checksums, dtype=np.uint32),
+                                deliveries=np.array(self.deliveries, dtype=np.int32).reshape(-1, 2))
+        os.replace(temporary_path, self.path)
+        print(f"Partida grabada en {self.path} ({game.ticks} ticks, {len(self.deliveries)} rutas entregadas)")
+
+
+class RunReplayer(_RunLog):
+    """
+    Repite una partida grabada sin ventana: mismo mapa, configuración y semilla, el tiempo de
+    juego grabado en cada tick, cada ruta entregada en el tick en que se entregó y cada modelo
+    aplicado en el tick en que se aplicó. Al final de cada tick compara las posiciones con las
+    grabadas para detectar en qué tick se separa la partida, y anota en model_mismatches los
+    modelos cuyos pesos no son los de la grabación (por ejemplo, si la caché guarda otro).
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        with np.load(path, allow_pickle=False) as replay_input:
+            self.meta = json.loads(replay_input['meta'].tobytes().decode('utf-8'))
+            self.recorded_times = replay_input['times']
+            self.recorded_checksums = replay_input['checksums']
+            deliveries = replay_input['deliveries']
+        if self.meta.get('version') != REPLAY_VERSION:
+            raise ValueError(f"{path} tiene la versión de grabación {self.meta.get('version')}; "
+                             f"se esperaba {REPLAY_VERSION}")
+
+        self.delivery_ticks = {}  # agente -> ticks en que recibió cada ruta, en orden
+        for tick, agent in deliveries.tolist():
+            self.delivery_ticks.setdefault(agent, []).append(tick)
+        self.delivered = {}  # agente -> rutas entregadas hasta ahora
+        self.held_models = []  # (tick, nombre, modelo, scaler) a la espera de su tick
+        self.model_mismatches = set()  # Modelos distintos de los grabados
+        self.first_divergence = None  # Primer tick con posiciones distintas de las grabadas
+
+    def apply_settings(self, settings):
+        """Copia la configuración grabada (sin ventana y con tantos ticks como la partida grabada)."""
+        for name, value in self.meta['settings'].items():
+            if hasattr(settings, name) and isinstance(getattr(settings, name), tuple):
+                value = tuple(value)
+            setattr(settings, name, value)
+        settings.headless = True
+        settings.headless_max_ticks = self.meta['ticks']
+        settings.record_file = None
+
+    def start(self, game):
+        map_hash = hash_grid(game.map.tile_types)
+        if map_hash != self.meta['map_hash']:
+            raise ValueError(f"El mapa no coincide con el de la grabación ({map_hash} != {self.meta['map_hash']})")
+
+    def time(self, game):
+        if game.ticks < len(self.recorded_times) and self.recorded_times[game.ticks] >= 0:
+            return int(self.recorded_times[game.ticks])
+        return game.clock_time()
+
+    def training_seed(self, seed):
+        return self.meta.get('training_seed', seed)
+
+    def accept_model(self, game, name, model, scaler):
+        if _model_fingerprint(model, scaler) != self.meta['model_fingerprints'].get(name):
+            self.model_mismatches.add(name)
+        tick = self.meta['model_ticks'].get(name)
+        if tick is None:
+            return False  # La partida grabada terminó antes de tener este modelo
+        if tick <= game.ticks:
+            return True
+        self.held_models.append((tick, name, model, scaler))
+        return False
+
+    def accept_path(self, game, entity):
+        agent = self._agent_index(game, entity)
+        delivered = self.delivered.get(agent, 0)
+        ticks = self.delivery_ticks.get(agent, ())
+        if delivered >= len(ticks) or ticks[delivered] > game.ticks:
+            return False  # Aún no (o nunca, si la grabación terminó antes de entregarla)
+        self.delivered[agent] = delivered + 1
+        return True
+
+    def begin_tick(self, game):
+        due = [held for held in self.held_models if held[0] <= game.ticks]
+        for held in due:
+            self.held_models.remove(held)
+            game._apply_model(*held[1:])
+
+    def end_tick(self, game):
+        if self.first_divergence is not None or game.ticks >= len(self.recorded_checksums):
+            return
+        if _positions_checksum(game) != self.recorded_checksums[game.ticks]:
+            self.first_divergence = game.ticks
+
+    def finish(self, game, outcome):
+        pass
+
+
+def replay_run(path, repeats=1):
+    """
+    Repite una partida grabada sin ventana y mide el bucle de simulación con el perfilado activo.
+
+    Args:
+        path (str): Grabación (.npz de RunRecorder).
+        repeats (int): Veces que se repite (el resultado usa la más rápida).
+
+    Returns:
+        dict: Ticks, segundos del bucle, si coincidió con la grabación (y el primer tick distinto)
+              y los percentiles de cada fase (ver Profiler.summaries).
+    """
+    from main import ZeldaLikeGame
+    from Settings import Settings
+
+    best = None
+    for _ in range(repeats):
+        replayer = RunReplayer(path)
+        settings = Settings()
+        replayer.apply_settings(settings)
+        settings.profile = True
+        game = ZeldaLikeGame(headless=True, settings=settings, run_log=replayer)
+        result = game.run_headless()
+        report = {
+            'ticks': result['ticks'],
+            'seconds': result['seconds'],
+            'result': result['result'],
+            'matches': (replayer.first_divergence is None and result['ticks'] == replayer.meta['ticks']
+                        and not replayer.model_mismatches),
+            'first_divergence': replayer.first_divergence,
+            'model_mismatches': sorted(replayer.model_mismatches),
+            'phases': game.profiler.summaries(),
+        }
+        if best is None or report['seconds'] < best['seconds']:
+            best = report
+    return best
+
+
+def record_run(path, map_file, overrides=None, windowed=False):
+    """
+    Graba una partida nueva con la configuración de Settings más overrides.
+
+    Args:
+        path (str): Grabación (.npz) a escribir.
+        map_file (str): Mapa .zmap de la partida (settings.map_file).
+        overrides (dict | None): Cambios de Settings.
+        windowed (bool): Jugarla con ventana (hilos de rutas, entrenamiento en segundo plano y FPS
+                         limitados) hasta ganar o perder. Con SDL_VIDEODRIVER=dummy no se ve nada,
+                         pero la partida es igual que con la ventana abierta.
+    """
+    from main import ZeldaLikeGame
+    from Settings import Settings
+
+    settings = Settings()
+    for name, value in (overrides or {}).items():
+        setattr(settings, name, value)
+    settings.map_file = map_file
+    settings.record_file = path
+    game = ZeldaLikeGame(headless=not windowed, settings=settings)
+    if windowed:
+        game.run(close_on_end=True)
+    else:
+        game.run_headless()
+
+
+def record_fixtures(directory='replays'):
+    """Vuelve a generar los mapas de FIXTURE_MAPS y a grabar las partidas de FIXTURES en directory."""
+    from Batch_Runner import load_map_spec, with_enemy_count
+    from Map_Format import save_map
+
+    os.makedirs(directory, exist_ok=True)
+    for map_name, (spec, num_enemies, min_distance) in FIXTURE_MAPS.items():
+        save_map(os.path.join(directory, map_name),
+                 with_enemy_count(load_map_spec(spec), num_enemies, seed=0, min_distance=min_distance))
+    for name, (map_name, overrides, windowed) in FIXTURES.items():
+        # Sin la caché de modelos: cada grabación entrena sus modelos con la semilla que guarda
+        record_run(os.path.join(directory, f"{name}.npz"), os.path.join(directory, map_name),
+                   dict(overrides, use_model_cache=False), windowed)
+
+
+if __name__ == '__main__':
+    # Repetir partidas grabadas (por ejemplo, las de replays/) y comparar su coste entre versiones.
+    import pygame
+
+    parser = argparse.ArgumentParser(description="Repite partidas grabadas sin ventana y mide su coste.")
+    parser.add_argument('replays', nargs='*', help="Grabaciones .npz (settings.record_file)")
+    parser.add_argument('--repeats', type=int, default=3, help="Repeticiones por grabación (se usa la más rápida)")
+    parser.add_argument('--json', help="Guardar los resultados en este archivo")
+    parser.add_argument('--record-fixtures', action='store_true',
+                        help="Volver a grabar las partidas de replays/ (FIXTURES) antes de repetirlas")
+    args = parser.parse_args()
+
+    if args.record_fixtures:
+        record_fixtures()
+
+    results = {}
+    for replay_path in args.replays:
+        report = replay_run(replay_path, args.repeats)
+        results[replay_path] = report
+        problems = []
+        if report['model_mismatches']:
+            problems.append(f"MODELOS DISTINTOS ({', '.join(report['model_mismatches'])})")
+        if report['first_divergence'] is not None:
+            problems.append(f"DIVERGE en el tick {report['first_divergence']}")
+        if not report['matches'] and not problems:
+            problems.append("termina en otro tick")
+        status = ', '.join(problems) or 'coincide'
+        print(f"{replay_path}: {report['ticks']} ticks en {report['seconds'] * 1000:.1f} ms ({status})")
+        for name in ('frame', 'actualizar', 'estado', 'get_path', 'gen_next_route'):
+            if name in report['phases']:
+                summary = report['phases'][name]
+                print(f"  {name}: total {summary['total']:.1f} ms, p50 {summary['p50']:.3f}, "
+                      f"p95 {summary['p95']:.3f}, p99 {summary['p99']:.3f} ms (n={summary['n']})")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as results_output:
+            json.dump(results, results_output, indent=1)
+    pygame.quit()
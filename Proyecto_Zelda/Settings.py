@@ -11,9 +11,21 @@ class Settings:
 
     def __init__(self):
         # 📺 Dimensiones y color de la pantalla
-        self.screen_width = 800  # Se ajustará dinámicamente en main.py
+        self.screen_width = 800  # Se ajustará dinámicamente en main.py (el mapa, hasta viewport_tiles)
         self.screen_height = 600  # Se ajustará dinámicamente en main.py
+        self.world_width = 800  # Tamaño del mapa entero en píxeles (también se ajusta en main.py)
+        self.world_height = 600
         self.bg_color = (0, 0, 0)  # Fondo negro
+        self.fps = 60  # Ticks por segundo del bucle con ventana (y del reloj simulado sin ventana)
+
+        # 🖥️ Simulación sin ventana (python main.py --headless): sin límite de FPS, con los cálculos
+        # de rutas síncronos y una semilla fija, para repetir exactamente la misma partida
+        self.headless = False
+        self.random_seed = 42
+        self.headless_max_ticks = 5000  # La partida termina en empate si nadie gana antes
+        # 🎬 Grabar la partida (semillas, mapa, configuración y lo que ocurre en cada tick) en este
+        # archivo .npz para repetirla exactamente sin ventana con `python Replay.py archivo`
+        self.record_file = None
 
         # 👤 Jugador (Ahora una IA)
         self.player_speed = 3
@@ -25,15 +37,100 @@ class Settings:
 
         # 🧱 Tiles del mapa
         self.tile_size = 32  # Tamaño de cada tile en píxeles
+        # Mapa binario .zmap (ver Map_Format.py, que también convierte mapas de texto); None = Mapa.MAP_DATA
+        self.map_file = None
+
+        # 🎥 Mundo por chunks (ver World_Chunks.py): la pantalla mide como mucho viewport_tiles
+        # (columnas, filas) y la cámara sigue al jugador. Solo se cargan (y se simulan en cada tick)
+        # los chunks visibles y los que están a active_chunk_radius chunks del jugador; los enemigos
+        # de fuera avanzan de golpe cada coarse_tick_interval ticks (0 = suspendidos hasta que se
+        # acerquen)
+        self.viewport_tiles = (60, 32)
+        self.chunk_size = 16  # Lado de cada chunk en tiles
+        self.active_chunk_radius = 2
+        self.coarse_tick_interval = 8
 
         # 🧠 Configuración de la IA
         self.training_samples_player = 600  # Muestras para el entrenamiento de la IA del jugador
         self.training_samples_enemy = 300  # Muestras para el entrenamiento de la IA del enemigo
+        # Etiquetado por lotes: una BFS inversa por meta etiqueta todos los inicios a la vez y las
+        # muestras se reparten entre estas metas. 0 = un A* por muestra (mucho más lento).
+        self.training_goals = 20
+        # ⚙️ Entrenamiento en paralelo (ver Training_Orchestrator.py): con train_in_background el
+        # juego arranca moviéndose solo con A* y los modelos se cambian en caliente al terminar
+        self.train_in_background = True
+        self.training_processes = 2
+        # Semilla de los datos de entrenamiento: la misma semilla (y los mismos procesos) da los
+        # mismos modelos, que la caché reutiliza entre partidas. None = una al azar en cada partida
+        # (sin ventana, a partir de random_seed)
+        self.training_seed = 0
+        # 💾 Caché en disco de modelos entrenados (ver Model_Cache.py): con el mismo mapa y la misma
+        # configuración de entrenamiento, el arranque carga el modelo en lugar de entrenarlo
+        self.use_model_cache = True
+        self.model_cache_dir = '.model_cache'
+        self.model_cache_max_mb = 64
+        # 🤖 Con use_learned_policy los agentes con modelo se mueven tile a tile según su predicción
+        # (una sola pasada de NumPy por tick para todos, ver Learned_Policy.py) en lugar de con A*.
+        # Si el tile predicho está bloqueado, policy_fallback_to_astar usa A* en ese tick.
+        self.use_learned_policy = False
+        self.policy_fallback_to_astar = True
 
         # 🕒 Control de recálculo de rutas para ambas IAs
         self.player_recalculate_path_interval = 350  # ms para el jugador
         self.enemy_recalculate_path_interval = 200  # ms para el enemigo
 
+        # ♻️ El jugador repara su ruta con D* Lite (solo procesa los tiles que cambiaron) en lugar
+        # de lanzar un A* desde cero con las zonas de peligro en cada replanificación. Las rutas
+        # tienen la misma longitud pero no siempre pasan por los mismos tiles que las de A* (otro
+        # desempate), y además se refrescan a mitad de camino: el jugador esquiva de otra forma y
+        # en el mapa incluido pierde. Por eso no es el modo por defecto.
+        self.player_use_incremental_planner = False
+
+        # 🧵 Hilos trabajadores del servicio de rutas (ver Path_Service.py)
+        self.path_workers = 2
+        # Procesos para buscar rutas en paralelo real, sin el GIL (ver Process_Path_Pool.py).
+        # 0 = buscar dentro de los hilos del servicio. Compensa con muchos agentes en mapas grandes.
+        self.path_processes = 0
+
+        # 🧭 Motor de búsqueda de rutas (ver A_Star_Pathfinder.PATHFINDING_ENGINES)
+        # 'clasico': A* con diccionarios y tuplas de píxeles; 'indices': A* sobre arreglos de tiles
+        # (las mismas rutas que 'clasico', tile a tile, en mucho menos tiempo);
+        # 'jps': Jump Point Search (mismas longitudes de ruta y muchos menos nodos expandidos, aunque
+        # cada salto escanea tiles; comparar con `python Jump_Point_Search.py`);
+        # 'jerarquico': HPA* por clusters con refinamiento perezoso, pensado para mapas grandes
+        self.pathfinding_engine = 'indices'
+        self.hpa_cluster_size = 10  # Lado (en tiles) de cada cluster del motor 'jerarquico'
+
+        # 🗃️ Caché LRU de rutas compartida por agentes y entrenador (ver Path_Cache.py)
+        self.use_path_cache = True
+        self.path_cache_size = 4096  # Número máximo de rutas guardadas
+
+        # 🌊 Los enemigos siguen un campo de flujo compartido hacia el jugador en lugar de
+        # calcular cada uno su propio A* (el coste por tick no crece con el número de enemigos).
+        # Cambia la persecución: con A* cada enemigo replanifica cada enemy_recalculate_path_interval
+        # desde la esquina de su tile (y retrocede un poco cada vez); con el campo avanza sin pausas
+        # hacia el tile actual del jugador, así que alcanza antes (en el mapa incluido el jugador
+        # pierde). Pensado para mapas con muchos enemigos, donde el A* por enemigo no escala.
+        self.enemy_use_flow_field = False
+        # 📦 Con el campo de flujo, los enemigos se guardan en arreglos de NumPy y se mueven todos con
+        # un solo paso vectorizado por tick (ver Agent_Store.py); sus sprites solo se usan para dibujar.
+        # No se usa con use_learned_policy: la política mueve a todos los enemigos, uno por sprite
+        self.enemy_use_agent_store = True
+        # 🧲 Zonas de peligro del jugador: solo las de los enemigos a menos de player_danger_radius
+        # tiles de él o de los próximos player_danger_lookahead nodos de su ruta (ver Spatial_Hash.py).
+        # None = lo que un enemigo puede recorrer antes de que el jugador replanifique (ver
+        # ZeldaLikeGame._danger_radius): todos con A*, unos 13 tiles con el planificador incremental
+        self.player_danger_radius = None
+        self.player_danger_lookahead = 10
+
         # 🗺️ Opciones de visualización (para depuración)
         self.show_path = False  # Mostrar el camino calculado por la IA
-        self.show_graph = False  # Mostrar el grafo de nodos (no implementado visualmente)
\ No newline at end of file
+        self.show_graph = False  # Mostrar el grafo de nodos (no implementado visualmente)
+        self.show_profiler = False  # Mostrar los percentiles del perfilado sobre el juego (necesita profile)
+
+        # ⏱️ Perfilado (ver Profiler.py): tiempo de cada fase del bucle, de gen_next_route y de cada
+        # búsqueda de ruta (con nodos expandidos, longitud y espera en cola) en contadores de anillo de
+        # profile_capacity muestras. Desactivado, cada punto de medida es una sola comprobación.
+        self.profile = False
+        self.profile_capacity = 1024
+        self.profile_trace_file = None  # Al terminar, la traza y los percentiles ('traza.csv' o 'traza.json')
\ No newline at end of file
@@ -0,0 +1,120 @@
+# Spatial_Hash.py
+
+import math
+import pygame
+
+
+class SpatialHash:
+    """
+    Rejilla uniforme de agentes (enemigos) por celda, para consultas de vecindad y colisión.
+
+    Cada agente se guarda en la celda de su posición; move() solo toca las celdas cuando el
+    agente cambia de celda, así que mantenerla al día cuesta O(1) por agente y tick. Las
+    consultas (near, colliding) solo miran las celdas alrededor del punto o rect consultado,
+    con un coste proporcional a los agentes cercanos y no al total.
+
+    Las celdas guardan los agentes en diccionarios (orden de inserción) para que el resultado
+    de las consultas sea reproducible.
+    """
+
+    def __init__(self, cell_size, agent_size):
+        """
+        Args:
+            cell_size (int): Lado de cada celda en píxeles (el tamaño de tile).
+            agent_size (tuple): (ancho, alto) del rect de cada agente, centrado en su posición.
+        """
+        self.cell_size = cell_size
+        self.agent_size = agent_size
+        self.cells = {}  # (columna, fila) -> {agente: None}
+        self.agent_cells = {}  # agente -> (columna, fila)
+
+    def __len__(self):
+        return len(self.agent_cells)
+
+    def _cell_of(self, position):
+        return (math.floor(position[0] / self.cell_size), math.floor(position[1] / self.cell_size))
+
+    def move(self, agent, position):
+        """Registra o actualiza la posición de un agente (solo cambia algo si cambió de celda)."""
+        self.move_to_cell(agent, self._cell_of(position))
+
+    def move_to_cell(self, agent, cell):
+        """Como move, con la celda (columna, fila) ya calculada (ver AgentStore.step)."""
+        old_cell = self.agent_cells.get(agent)
+        if old_cell == cell:
+            return
+        if old_cell is not None:
+            bucket = self.cells[old_cell]
+            del bucket[agent]
+            if not bucket:
+                del self.cells[old_cell]
+        self.cells.setdefault(cell, {})[agent] = None
+        self.agent_cells[agent] = cell
+
+    def remove(self, agent):
+        """Quita un agente de la rejilla (si estaba)."""
+        cell = self.agent_cells.pop(agent, None)
+        if cell is not None:
+            bucket = self.cells[cell]
+            del bucket[agent]
+            if not bucket:
+                del self.cells[cell]
+
+    def _agents_in_cells(self, col_start, col_end, row_start, row_end):
+        """
+        Agentes de las celdas del rango [inicio, fin] (ambos incluidos) de columnas y filas.
+
+        Si el rango tiene más celdas que celdas ocupadas hay en la rejilla (un radio grande), se
+        recorren las ocupadas en lugar de buscar cada celda del rango.
+        """
+        cells = self.cells
+        if (col_end - col_start + 1) * (row_end - row_start + 1) > len(cells):
+            for (col, row), bucket in cells.items():
+                if col_start <= col <= col_end and row_start <= row <= row_end:
+                    yield from bucket
+            return
+        for row in range(row_start, row_end + 1):
+            for col in range(col_start, col_end + 1):
+                bucket = cells.get((col, row))
+                if bucket:
+                    yield from bucket
+
+    def near(self, position, radius_tiles):
+        """
+        Devuelve los agentes a menos de radius_tiles tiles (distancia euclídea) de una posición.
+
+        Args:
+            position (tuple/list/np.ndarray): Punto en píxeles.
+            radius_tiles (float): Radio en tiles.
+
+        Returns:
+            list: Los agentes cercanos, en un orden reproducible.
+        """
+        radius = radius_tiles * self.cell_size
+        col_start, row_start = self._cell_of((position[0] - radius, position[1] - radius))
+        col_end, row_end = self._cell_of((position[0] + radius, position[1] + radius))
+        radius_squared = radius * radius
+        return [agent for agent in self._agents_in_cells(col_start, col_end, row_start, row_end)
+                if (agent.position[0] - position[0]) ** 2 + (agent.position[1] - position[1]) ** 2 <= radius_squared]
+
+    def agent_rect(self, agent):
+        """Rect del agente centrado en su posición actual (igual que su sprite tras mover rect.center)."""
+        rect = pygame.Rect((0, 0), self.agent_size)
+        rect.center = agent.position
+        return rect
+
+    def colliding(self, rect):
+        """
+        Devuelve un agente cuyo rect choca con el rect dado, o None (como spritecollideany).
+
+        Args:
+            rect (pygame.Rect): El rect a comprobar (el del jugador).
+        """
+        half_width = self.agent_size[0] / 2 + 1
+        half_height = self.agent_size[1] / 2 + 1
+        col_start, row_start = self._cell_of((rect.left - half_width, rect.top - half_height))
+        col_end, row_end = self._cell_of((rect.right + half_width, rect.bottom + half_height))
+        for agent in self._agents_in_cells(col_start, col_end, row_start, row_end):
+            if rect.colliderect(self.agent_rect(agent)):
+                return agent
+        return None
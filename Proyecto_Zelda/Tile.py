@@ -1,8 +1,13 @@
 # Tile.py
 
+import time
 import pygame
-import os
-from Mapa import MURO, CAMINO, BLOQUE, META, JUGADOR, ENEMIGO  # Importar las definiciones de caracteres
+from Asset_Cache import load_image
+import numpy as np
+from Mapa import MURO, CAMINO, BLOQUE, META  # Importar las definiciones de caracteres
+from Grid import hash_grid, LIBRE, OCUPADO
+from Map_Format import MapFile, map_from_ascii, occupancy_from_tiles, VACIO, TILE_MURO, TILE_BLOQUE, TILE_META
+from HPA_Star import HierarchicalPathfinder
 
 
 class Tile(pygame.sprite.Sprite):
@@ -22,90 +27,181 @@ class Tile(pygame.sprite.Sprite):
 class Map:
     """
     Gestiona la carga y el dibujo del mapa del juego.
+
+    El mapa se guarda como un arreglo de tipos de tile (ver Map_Format.py), no como un sprite por
+    tile: el fondo se dibuja por chunks directamente desde el arreglo (World_Chunks.py) y los Tile
+    se crean solo cuando alguien los pide (get_tile). Así el tiempo de carga y la memoria dependen
+    de lo que se usa, no del tamaño del mapa.
     """
 
-    def __init__(self, game_settings, map_data_list):
+    def __init__(self, game_settings, map_source):
+        """
+        Args:
+            game_settings (Settings): La configuración del juego.
+            map_source (MapFile | list[str]): Mapa binario (Map_Format.load_map) o en texto (MAP_DATA).
+        """
         self.settings = game_settings
-        self.map_data = map_data_list  # Ahora es directamente la lista de strings del mapa
         self.tile_size = self.settings.tile_size
 
-        self.player_start_pos = None
-        self.enemy_start_positions = []
-        self.goal_pos = None
+        start_time = time.perf_counter()
+        self.map_file = map_source if isinstance(map_source, MapFile) else map_from_ascii(map_source)
+        self.tile_types = self.map_file.tiles  # uint8 (filas, columnas); ver Map_Format
+
+        self.player_start_pos = self._tile_center(self.map_file.player)
+        self.goal_pos = self._tile_center(self.map_file.goal)
+        self.enemy_start_positions = [self._tile_center(spawn) for spawn in self.map_file.enemies.tolist()]
 
-        self.all_sprites = pygame.sprite.Group()
-        self.walls = pygame.sprite.Group()  # Muros y bloques (todos colisionables inicialmente)
+        self.all_sprites = pygame.sprite.Group()  # Tiles creados hasta ahora (ver get_tile)
+        self.walls = pygame.sprite.Group()  # De ellos, muros y bloques
         self.movable_blocks = pygame.sprite.Group()  # Solo los bloques que el jugador puede empujar
-        self.goal_tile = None  # Referencia al tile de la meta
+        self.tiles = {}  # (fila, columna) -> Tile
+
+        # Zonas (en píxeles del mundo) de los tiles que cambiaron desde el último frame; quien
+        # dibuja el mapa (World_Chunks.ChunkManager) las vuelve a dibujar
+        self.dirty_rects = []
+
+        # Cuadrícula de ocupación compartida por el jugador, los enemigos y el entrenador de la IA
+        self.occupancy_grid = occupancy_from_tiles(self.tile_types)
 
+        # Versión de los obstáculos estáticos para la caché de rutas: un resumen del contenido de la
+        # cuadrícula, que se recalcula cuando un tile cambia de verdad (set_tile_blocked). Al depender
+        # solo del contenido, dos partidas del mismo proceso (Batch_Runner, Replay) comparten la caché
+        # sin que la ruta de un mapa responda a una consulta sobre otro.
+        self.grid_hash = hash_grid(self.occupancy_grid)
+
+        # Registro de (índice, bloqueado) de cada tile que cambia; los planificadores incrementales
+        # guardan hasta dónde lo han leído para saber qué cambió desde su última consulta.
+        self.tile_change_log = []
+
+        # Clusters, entradas y distancias internas para el motor jerárquico (HPA*)
+        self.hierarchy = None
+        if self.settings.pathfinding_engine == 'jerarquico':
+            self.hierarchy = HierarchicalPathfinder(self.occupancy_grid, self.settings.hpa_cluster_size)
+        # Tiempos de arranque (ver ZeldaLikeGame.startup_timings)
+        self.build_seconds = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
         self._load_tile_images()
-        self._build_map_sprites()
+        self.load_seconds = time.perf_counter() - start_time
+
+    def _tile_center(self, tile):
+        """Centro en píxeles de un tile (columna, fila), o None."""
+        if tile is None:
+            return None
+        col, row = tile
+        return (col * self.tile_size + self.tile_size // 2, row * self.tile_size + self.tile_size // 2)
 
     def _load_tile_images(self):
-        """Carga las imágenes necesarias para los diferentes tipos de tiles."""
-        image_path = "imagenes"  # Asegúrate de que esta carpeta exista y contenga las imágenes
+        """Carga las imágenes necesarias para los diferentes tipos de tiles (compartidas, ver Asset_Cache.py)."""
+        tile_size = (self.tile_size, self.tile_size)
         self.images = {
-            MURO: pygame.transform.scale(pygame.image.load(os.path.join(image_path, 'muro.png')).convert(),
-                                         (self.tile_size, self.tile_size)),
-            CAMINO: pygame.transform.scale(pygame.image.load(os.path.join(image_path, 'camino.png')).convert(),
-                                           (self.tile_size, self.tile_size)),
-            BLOQUE: pygame.transform.scale(pygame.image.load(os.path.join(image_path, 'bloque.png')).convert(),
-                                           (self.tile_size, self.tile_size)),
-            META: pygame.transform.scale(pygame.image.load(os.path.join(image_path, 'meta.png')).convert_alpha(),
-                                         (self.tile_size, self.tile_size)),
+            MURO: load_image('muro.png', tile_size, alpha=False),
+            CAMINO: load_image('camino.png', tile_size, alpha=False),
+            BLOQUE: load_image('bloque.png', tile_size, alpha=False),
+            META: load_image('meta.png', tile_size),
             # El jugador y el enemigo se cargarán en sus propias clases
         }
 
-    def _build_map_sprites(self):
-        """Construye los objetos Tile y los agrega a los grupos de sprites."""
-        for y, row_str in enumerate(self.map_data):
-            for x, char in enumerate(row_str):
-                pos_x = x * self.tile_size
-                pos_y = y * self.tile_size
-
-                # Por defecto, se crea un tile de camino debajo de los personajes y otros elementos
-                tile_image = self.images[CAMINO]
-                is_collidable = False
-                is_goal = False
-                is_movable = False
-
-                # Determinar el tipo de tile y sus propiedades basadas en el carácter
-                if char == MURO:
-                    tile_image = self.images[MURO]
-                    is_collidable = True
-                elif char == BLOQUE:
-                    tile_image = self.images[BLOQUE]
-                    is_collidable = True
-                    is_movable = True
-                elif char == META:
-                    tile_image = self.images[META]
-                    is_goal = True
-                    # Almacena la posición central de la meta
-                    self.goal_pos = (pos_x + self.tile_size // 2, pos_y + self.tile_size // 2)
-                elif char == JUGADOR:
-                    # Almacena la posición central del jugador
-                    self.player_start_pos = (pos_x + self.tile_size // 2, pos_y + self.tile_size // 2)
-                elif char == ENEMIGO:
-                    # Añadimos cada posición de enemigo a la lista
-                    self.enemy_start_positions.append((pos_x + self.tile_size // 2, pos_y + self.tile_size // 2))
-
-                # Crea el tile y agrégalo a los grupos de sprites
-                tile = Tile(pos_x, pos_y, tile_image, is_collidable=is_collidable, is_goal=is_goal,
-                            is_movable=is_movable)
-                self.all_sprites.add(tile)
-
-                # Agrega a los grupos específicos si es colisionable o movible
-                if is_collidable:
-                    self.walls.add(tile)
-                if is_movable:
-                    self.movable_blocks.add(tile)
-                if is_goal:
-                    self.goal_tile = tile
-
-    def draw(self, screen):
-        """Dibuja todos los tiles del mapa en la pantalla."""
-        self.all_sprites.draw(screen)
+    def image_for(self, tile_type):
+        """Imagen de un tipo de tile; cualquier otro carácter se dibuja como camino (None si es un hueco)."""
+        if tile_type == VACIO:
+            return None
+        return self.images.get(chr(tile_type), self.images[CAMINO])
+
+    def get_tile(self, col, row):
+        """
+        Devuelve el Tile de una posición, creándolo la primera vez que se pide.
+
+        Returns:
+            Tile | None: El tile, o None fuera del mapa o en un hueco de una fila corta.
+        """
+        tile = self.tiles.get((row, col))
+        if tile is not None:
+            return tile
+        if not (0 <= row < self.tile_types.shape[0] and 0 <= col < self.tile_types.shape[1]):
+            return None
+        tile_type = int(self.tile_types[row, col])
+        image = self.image_for(tile_type)
+        if image is None:
+            return None
+
+        is_collidable = tile_type in (TILE_MURO, TILE_BLOQUE)
+        is_movable = tile_type == TILE_BLOQUE
+        tile = Tile(col * self.tile_size, row * self.tile_size, image, is_collidable=is_collidable,
+                    is_goal=tile_type == TILE_META, is_movable=is_movable)
+        self.tiles[(row, col)] = tile
+        self.all_sprites.add(tile)
+        if is_collidable:
+            self.walls.add(tile)
+        if is_movable:
+            self.movable_blocks.add(tile)
+        return tile
+
+    @property
+    def goal_tile(self):
+        """Tile de la meta (se crea al pedirlo)."""
+        if self.map_file.goal is None:
+            return None
+        return self.get_tile(*self.map_file.goal)
+
+    def release_tiles(self, col_start, col_end, row_start, row_end):
+        """
+        Suelta los Tile creados dentro de un rango de columnas y filas [inicio, fin) (por ejemplo,
+        al descargar un chunk lejano). Se volverán a crear si alguien los pide.
+        """
+        for key in [key for key in self.tiles if row_start <= key[0] < row_end and col_start <= key[1] < col_end]:
+            self.tiles.pop(key).kill()
+
+    def mark_tile_dirty(self, col, row):
+        """Anota que un tile cambió de aspecto para volver a dibujarlo en el próximo frame."""
+        self.dirty_rects.append(pygame.Rect(col * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size))
+
+    def take_dirty_rects(self):
+        """Devuelve (y olvida) las zonas de tiles que cambiaron desde la última llamada."""
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
 
     def get_collidable_rects(self):
         """Retorna una lista de rectángulos de todos los objetos con los que se puede colisionar (muros y bloques)."""
-        return [tile.rect for tile in self.walls]
\ No newline at end of file
+        return [pygame.Rect(col * self.tile_size, row * self.tile_size, self.tile_size, self.tile_size)
+                for row, col in np.argwhere(self.occupancy_grid == OCUPADO).tolist()]
+
+    def obstacle_version(self):
+        """
+        Devuelve la versión de los obstáculos estáticos (clave para la caché de rutas): el contenido
+        de la cuadrícula y lo que cambia la forma de las rutas (motor, clusters y tamaño de tile).
+        """
+        settings = self.settings
+        return (settings.pathfinding_engine, settings.hpa_cluster_size, self.tile_size, self.grid_hash)
+
+    def set_tile_blocked(self, col, row, blocked):
+        """
+        Cambia el estado de un tile (por ejemplo, al mover un bloque) y actualiza las estructuras
+        de búsqueda. Con el motor jerárquico solo se reconstruye el cluster afectado.
+        """
+        new_value = OCUPADO if blocked else LIBRE
+        if self.occupancy_grid[row, col] == new_value:
+            return
+        self.occupancy_grid[row, col] = new_value
+        self.tile_change_log.append((row * self.occupancy_grid.shape[1] + col, bool(blocked)))
+        self.grid_hash = hash_grid(self.occupancy_grid)
+        if self.hierarchy is not None:
+            self.hierarchy.update_tile(row * self.occupancy_grid.shape[1] + col)
+
+        # Un bloque que aparece o se va: cambiar su tipo (el archivo del mapa no se modifica, ver
+        # Map_Format.load_map), su Tile si ya existe y volver a dibujar solo ese tile
+        if self.tile_types[row, col] == TILE_META:
+            return
+        self.tile_types[row, col] = TILE_BLOQUE if blocked else ord(CAMINO)
+        tile = self.tiles.get((row, col))
+        if tile is not None:
+            tile.image = self.images[BLOQUE if blocked else CAMINO]
+            tile.is_collidable = tile.is_movable = bool(blocked)
+            if blocked:
+                self.walls.add(tile)
+                self.movable_blocks.add(tile)
+            else:
+                self.walls.remove(tile)
+                self.movable_blocks.remove(tile)
+        self.mark_tile_dirty(col, row)
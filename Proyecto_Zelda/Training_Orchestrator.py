@@ -0,0 +1,274 @@
+# Training_Orchestrator.py
+
+import multiprocessing
+import random
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from AI_Trainer import (create_model, scale_training_data, generate_raw_training_data,
+                        generate_raw_training_data_batch, pick_training_goals)
+from Model_Cache import training_cache_key
+
+
+class TrainingJob:
+    """Un modelo a entrenar: su nombre, el número de muestras y las metas del etiquetado por lotes."""
+
+    def __init__(self, name, num_samples, num_goals=0):
+        """
+        Args:
+            name (str): Nombre con el que se entrega el modelo (por ejemplo, 'jugador').
+            num_samples (int): Muestras en total.
+            num_goals (int): Metas para generate_raw_training_data_batch; 0 = un A* por muestra.
+        """
+        self.name = name
+        self.num_samples = num_samples
+        self.num_goals = num_goals
+
+
+def training_jobs(settings):
+    """Los modelos que usa el juego: uno para el jugador y uno genérico compartido por todos los enemigos."""
+    return [TrainingJob('jugador', settings.training_samples_player, settings.training_goals),
+            TrainingJob('enemigo', settings.training_samples_enemy, settings.training_goals)]
+
+
+def _generate_shard(occupancy_grid, tile_size, screen_width, screen_height, num_samples, goals, seed):
+    """
+    Tarea de un proceso: genera una parte de las muestras de un trabajo, sin escalar.
+
+    Con goals (su parte de las metas del trabajo, elegidas en el proceso principal) se etiqueta por
+    lotes; con None se hace un A* por muestra.
+    """
+    if goals is not None:
+        return generate_raw_training_data_batch(len(goals), occupancy_grid, tile_size, screen_width, screen_height,
+                                                samples_per_goal=max(1, num_samples // max(1, len(goals))),
+                                                np_rng=np.random.default_rng(seed), goals=goals)
+    return generate_raw_training_data(num_samples, occupancy_grid, tile_size, screen_width, screen_height,
+                                      rng=random.Random(seed))
+
+
+def _fit_model(X_scaled, y):
+    """Tarea de un proceso: entrena un modelo con las muestras ya escaladas."""
+    model = create_model()
+    model.fit(X_scaled, y)
+    return model
+
+
+def _split(total, parts):
+    """Reparte 'total' en 'parts' partes enteras lo más parecidas posible (sin partes vacías)."""
+    parts = max(1, min(parts, total))
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+class TrainingOrchestrator:
+    """
+    Entrena varios modelos a la vez en un pool de procesos.
+
+    Cada trabajo se divide en partes que se generan en paralelo; cuando todas las partes de un
+    trabajo terminan, sus muestras se escalan en el proceso principal y el ajuste del modelo se
+    lanza en otro proceso, así que el ajuste del jugador y el de los enemigos se solapan.
+
+    Para cada trabajo se guarda el tiempo de cada fase en timings[nombre]: 'generacion' (desde
+    que se lanzan sus partes hasta que termina la última), 'escalado' y 'ajuste'.
+
+    Con start() todo ocurre en un hilo aparte y los modelos terminados se recogen con poll()
+    desde el hilo principal, igual que las rutas del PathService.
+
+    Con model_cache (ver Model_Cache.py), los trabajos que ya tienen un modelo guardado se cargan
+    sin entrenar ('cache' en timings) y los modelos nuevos se guardan al terminar.
+    """
+
+    def __init__(self, occupancy_grid, tile_size, screen_width, screen_height, num_processes=2, model_cache=None):
+        self.occupancy_grid = occupancy_grid
+        self.tile_size = tile_size
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.num_processes = max(1, num_processes)
+        self.model_cache = model_cache
+
+        self.timings = {}
+        self.lock = threading.Lock()
+        self.ready = deque()  # (nombre, modelo, escalador) pendientes de recoger con poll()
+        self.thread = None
+        self.executor = None
+        self.cancelled = False
+
+    def plan_shards(self, job, rng):
+        """
+        Reparte un trabajo entre los procesos.
+
+        En el modo por lotes las metas se eligen una sola vez, aquí, y cada parte recibe un tramo
+        distinto de la lista: dos procesos nunca etiquetan la misma meta.
+
+        Args:
+            job (TrainingJob): El trabajo.
+            rng (random.Random): Generador del trabajo (elige las metas).
+
+        Returns:
+            list[tuple]: (muestras, metas) por parte; metas es None en el modo de un A* por muestra.
+        """
+        if job.num_goals <= 0:
+            return [(samples, None) for samples in _split(job.num_samples, self.num_processes)]
+
+        goals = pick_training_goals(job.num_goals, self.occupancy_grid, self.tile_size,
+                                    self.screen_width, self.screen_height, rng)
+        samples_per_goal = max(1, job.num_samples // job.num_goals)
+        shards = []
+        offset = 0
+        for count in _split(len(goals), self.num_processes):
+            shards.append((count * samples_per_goal, goals[offset:offset + count]))
+            offset += count
+        return shards
+
+    def run(self, jobs, seed=None, on_model_ready=None):
+        """
+        Entrena todos los trabajos y espera a que terminen.
+
+        Args:
+            jobs (list[TrainingJob]): Modelos a entrenar.
+            seed (int | None): Semilla base de las partes (None = al azar). Con la misma semilla
+                               (y el mismo número de procesos) se obtienen los mismos datos y los
+                               mismos modelos.
+            on_model_ready (callable | None): Se llama como on_model_ready(nombre, modelo, escalador)
+                                              en cuanto termina cada modelo.
+
+        Returns:
+            dict: nombre -> (modelo, escalador); (None, None) si no hubo datos para ese trabajo.
+        """
+        rng = random.Random(seed)
+        results = {}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.num_processes, mp_context=context) as executor:
+            self.executor = executor
+            phase_of = {}  # future -> (trabajo, fase, número de parte o escalador del ajuste)
+            shards_left = {}
+            shard_results = {}
+            started = {}
+            cache_keys = {}
+
+            for job in jobs:
+                self.timings[job.name] = {}
+                # Cada trabajo tiene su semilla, tomada aunque su modelo salga de la caché: así las
+                # semillas de los demás trabajos no dependen de lo que ya esté guardado.
+                job_seed = rng.getrandbits(32)
+                shard_rng = random.Random(job_seed)
+                shards = self.plan_shards(job, shard_rng)
+
+                if self.model_cache is not None:
+                    start_time = time.perf_counter()
+                    cache_keys[job.name] = training_cache_key(
+                        self.occupancy_grid, self.tile_size, self.screen_width, self.screen_height,
+                        job.num_samples, job.num_goals, create_model().get_params(), job_seed, len(shards))
+                    cached = self.model_cache.load(cache_keys[job.name])
+                    if cached is not None:
+                        self.timings[job.name]['cache'] = time.perf_counter() - start_time
+                        results[job.name] = cached
+                        print(f"  IA '{job.name}' cargada de la caché en {self.timings[job.name]['cache']:.3f} s")
+                        if on_model_ready is not None:
+                            on_model_ready(job.name, *cached)
+                        continue
+
+                started[job.name] = time.perf_counter()
+                shard_results[job.name] = [None] * len(shards)
+                shards_left[job.name] = len(shards)
+                for shard, (num_samples, goals) in enumerate(shards):
+                    future = executor.submit(_generate_shard, self.occupancy_grid, self.tile_size, self.screen_width,
+                                             self.screen_height, num_samples, goals, shard_rng.getrandbits(32))
+                    phase_of[future] = (job, 'generacion', shard)
+
+            pending = set(phase_of)
+            while pending and not self.cancelled:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, phase, detail = phase_of.pop(future)
+                    timings = self.timings[job.name]
+                    if phase == 'generacion':
+                        # Cada parte va en su sitio: las muestras (y el modelo) no dependen de
+                        # qué proceso termina antes
+                        shard_results[job.name][detail] = future.result()
+                        shards_left[job.name] -= 1
+                        if shards_left[job.name]:
+                            continue
+                        timings['generacion'] = time.perf_counter() - started[job.name]
+
+                        start_time = time.perf_counter()
+                        parts = [part for part in shard_results.pop(job.name) if part[0].size]
+                        X = np.concatenate([X_part for X_part, _ in parts]) if parts else np.array([])
+                        y = np.concatenate([y_part for _, y_part in parts]) if parts else np.array([])
+                        X_scaled, y, scaler = scale_training_data(X, y)
+                        timings['escalado'] = time.perf_counter() - start_time
+                        timings['muestras'] = len(y)
+
+                        if X_scaled.size == 0 or y.size == 0:
+                            print(f"No hay datos suficientes para entrenar la IA '{job.name}'.")
+                            results[job.name] = (None, None)
+                            continue
+                        started[job.name] = time.perf_counter()
+                        fit_future = executor.submit(_fit_model, X_scaled, y)
+                        phase_of[fit_future] = (job, 'ajuste', scaler)
+                        pending.add(fit_future)
+                    else:
+                        timings['ajuste'] = time.perf_counter() - started[job.name]
+                        model, scaler = future.result(), detail
+                        results[job.name] = (model, scaler)
+                        if self.model_cache is not None:
+                            self.model_cache.store(cache_keys[job.name], model, scaler)
+                        print(f"  IA '{job.name}' lista: {timings['muestras']} muestras; generación "
+                              f"{timings['generacion']:.2f} s, escalado {timings['escalado']:.3f} s, "
+                              f"ajuste {timings['ajuste']:.2f} s")
+                        if on_model_ready is not None:
+                            on_model_ready(job.name, model, scaler)
+            self.executor = None
+        return results
+
+    def start(self, jobs, seed=None):
+        """Lanza run() en un hilo aparte; los modelos terminados se recogen con poll()."""
+        def collect(name, model, scaler):
+            with self.lock:
+                self.ready.append((name, model, scaler))
+
+        def background():
+            try:
+                self.run(jobs, seed, on_model_ready=collect)
+            except Exception:
+                if not self.cancelled:
+                    traceback.print_exc()
+
+        self.thread = threading.Thread(target=background, name="TrainingOrchestrator", daemon=True)
+        self.thread.start()
+
+    def poll(self):
+        """
+        Devuelve los modelos terminados desde la última llamada. Debe llamarse desde el hilo principal.
+
+        Returns:
+            list[tuple]: (nombre, modelo, escalador) de cada modelo nuevo.
+        """
+        with self.lock:
+            ready = list(self.ready)
+            self.ready.clear()
+        return ready
+
+    def shutdown(self):
+        """Cancela el entrenamiento en curso (si lo hay) sin esperar a que termine."""
+        self.cancelled = True
+        executor = self.executor
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == '__main__':
+    # Entrena los dos modelos del juego sobre el mapa incluido y muestra el desglose de tiempos.
+    from Mapa import MAP_DATA
+    from Grid import build_occupancy_grid
+
+    grid = build_occupancy_grid(MAP_DATA)
+    tile_size = 32
+    orchestrator = TrainingOrchestrator(grid, tile_size, len(MAP_DATA[0]) * tile_size, len(MAP_DATA) * tile_size)
+    start_time = time.perf_counter()
+    orchestrator.run([TrainingJob('jugador', 600, 20), TrainingJob('enemigo', 300, 20)], seed=0)
+    print(f"Entrenamiento completo en {time.perf_counter() - start_time:.2f} s")
+    for job_name, job_timings in orchestrator.timings.items():
+        print(f"  {job_name}: {job_timings}")
@@ -5,44 +5,142 @@ import pygame
 import math  # Asegúrate de que math esté importado
 
 
+class MovementBuffer:
+    """
+    Buffer de pasos de movimiento de una entidad: un arreglo preasignado con un cursor de lectura.
+
+    Sustituye a la lista de listas [x, y] que se consumía con pop(0). Sacar un paso es O(1) y no
+    crea objetos; al añadir pasos se reaprovecha el espacio ya leído y el arreglo solo crece
+    (al doble) si los pasos pendientes no caben.
+    """
+
+    def __init__(self, capacity=64):
+        self._data = np.empty((capacity, 2), dtype=float)
+        self._start = 0  # Siguiente paso a leer
+        self._end = 0  # Fin de los pasos escritos
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __bool__(self):
+        return self._end > self._start
+
+    def pop(self):
+        """
+        Saca el siguiente paso.
+
+        Returns:
+            np.ndarray: Vista (x, y) dentro del buffer; es válida hasta la siguiente llamada a extend().
+        """
+        if self._start == self._end:
+            raise IndexError("el buffer de movimiento está vacío")
+        position = self._data[self._start]
+        self._start += 1
+        return position
+
+    def last(self):
+        """Devuelve el último paso pendiente (donde termina el movimiento ya encolado)."""
+        if self._start == self._end:
+            raise IndexError("el buffer de movimiento está vacío")
+        return self._data[self._end - 1]
+
+    def extend(self, positions):
+        """Añade al final los pasos de un arreglo (n, 2)."""
+        count = len(positions)
+        pending = self._end - self._start
+        if self._end + count > len(self._data):
+            if pending + count > len(self._data):
+                data = np.empty((max(2 * len(self._data), pending + count), 2), dtype=float)
+                data[:pending] = self._data[self._start:self._end]
+                self._data = data
+            else:
+                self._data[:pending] = self._data[self._start:self._end]
+            self._start, self._end = 0, pending
+        self._data[self._end:self._end + count] = positions
+        self._end += count
+
+    def clear(self):
+        self._start = self._end = 0
+
+
+class PathView:
+    """
+    Vista de solo lectura del final de una ruta (lista de posiciones) a partir de un desplazamiento.
+
+    gen_next_route la usa en lugar de path[m:], que copiaba el resto de la ruta cada vez que se
+    consumían nodos. Igual que LazyPath (HPA_Star.py), path[m:] devuelve otra vista en O(1); la
+    ruta original no se modifica, así que puede ser la misma lista que guarda la caché de rutas.
+    """
+
+    def __init__(self, positions, offset=0):
+        self._positions = positions
+        self._offset = min(offset, len(positions))
+
+    def __len__(self):
+        return len(self._positions) - self._offset
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if key.stop is None and step == 1:
+                return PathView(self._positions, self._offset + start)
+            return self._positions[self._offset + start:self._offset + stop:step]
+
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("índice de ruta fuera de rango")
+        return self._positions[self._offset + index]
+
+    def __iter__(self):
+        return iter(self._positions[self._offset:])
+
+
 # Genera la siguiente ruta paso a paso desde la posición actual hasta un subconjunto del camino total.
 # Divide la ruta en pequeños pasos de acuerdo a la velocidad para movimiento suave.
 def gen_next_route(entity, speed, m=5):
     """
     Genera una secuencia de posiciones intermedias para un movimiento suave.
 
+    Los m tramos se interpolan de una vez con NumPy, con los mismos pasos que np.linspace en
+    cada tramo, y se escriben en el MovementBuffer de la entidad (entity.path_positions).
+
     Args:
         entity: El objeto (Player o Enemy) que se va a mover.
         speed: La velocidad de movimiento de la entidad.
         m: El número de nodos A* del camino a considerar para generar los pasos suaves.
     """
-    current_pos = entity.position
-    # Itera sobre los primeros 'm' nodos del camino A* de la entidad
-    for i, node_pos in enumerate(entity.path[:min(len(entity.path), m)]):
-        dx = abs(node_pos[0] - current_pos[0])
-        dy = abs(node_pos[1] - current_pos[1])
-
-        # Calcula el número de pasos necesarios para moverse entre los nodos
-        # Asegura al menos 1 paso si la distancia es muy pequeña o cero
-        num_steps = max(
-            int(dx / speed),
-            int(dy / speed),
-            1
-        )
-
-        # Interpola coordenadas entre el punto actual y el nodo destino para cada paso
-        x_arr = np.linspace(current_pos[0], node_pos[0], num_steps).tolist()
-        y_arr = np.linspace(current_pos[1], node_pos[1], num_steps).tolist()
-
-        # Agrega las posiciones interpoladas al buffer de movimiento de la entidad
-        # zip combina x e y, y list(par) convierte cada tupla (x,y) en una lista [x,y]
-        entity.path_positions.extend([list(par) for par in zip(x_arr, y_arr)])
-
-        # Actualiza la posición de referencia para el siguiente segmento de interpolación
-        current_pos = node_pos
-
-    # Elimina los nodos del camino A* que ya han sido procesados
-    entity.path = entity.path[min(len(entity.path), m):]
+    count = min(len(entity.path), m)
+    if count == 0:
+        return
+    profiler = getattr(getattr(entity, 'game', None), 'profiler', None)
+    start_time = profiler.start() if profiler is not None else 0.0
+
+    # Nodos de los tramos: la posición actual seguida de los primeros 'count' nodos del camino
+    nodes = np.empty((count + 1, 2), dtype=float)
+    nodes[0] = entity.position
+    nodes[1:] = entity.path[:count]
+    starts = nodes[:-1]
+    deltas = nodes[1:] - starts
+
+    # Número de pasos de cada tramo (al menos 1 si la distancia es muy pequeña o cero)
+    num_steps = np.maximum((np.abs(deltas) / speed).astype(int).max(axis=1), 1)
+    segment = np.repeat(np.arange(count), num_steps)
+    step_index = np.arange(len(segment)) - (np.cumsum(num_steps) - num_steps)[segment]
+
+    # Como np.linspace: inicio + k * (delta / (pasos - 1)), con el último paso igual al nodo destino
+    step_sizes = deltas / np.maximum(num_steps - 1, 1)[:, None]
+    positions = step_index[:, None] * step_sizes[segment] + starts[segment]
+    with_end = num_steps > 1
+    positions[(np.cumsum(num_steps) - 1)[with_end]] = nodes[1:][with_end]
+    entity.path_positions.extend(positions)
+
+    # Descarta los nodos ya procesados sin copiar el resto del camino
+    if isinstance(entity.path, (list, tuple)):
+        entity.path = PathView(entity.path, count)
+    else:
+        entity.path = entity.path[count:]
+    if profiler is not None:
+        profiler.stop('gen_next_route', start_time)
 
 
 # Actualiza la posición del objeto y su rectángulo en pantalla (función auxiliar)
@@ -0,0 +1,221 @@
+# World_Chunks.py
+
+import math
+import numpy as np
+import pygame
+
+
+class Camera:
+    """
+    Ventana del tamaño de la pantalla sobre el mundo, centrada en el jugador y sin salirse del mapa.
+
+    Attributes:
+        rect (pygame.Rect): Zona del mundo (en píxeles) que se ve en pantalla.
+    """
+
+    def __init__(self, view_width, view_height, world_width, world_height):
+        self.rect = pygame.Rect(0, 0, min(view_width, world_width), min(view_height, world_height))
+        self.world_rect = pygame.Rect(0, 0, world_width, world_height)
+
+    def follow(self, position):
+        """
+        Centra la cámara en una posición (dentro de los límites del mundo).
+
+        Returns:
+            bool: True si la cámara se movió (hay que volver a dibujar toda la pantalla).
+        """
+        rect = self.rect.copy()
+        rect.center = (int(position[0]), int(position[1]))
+        rect.clamp_ip(self.world_rect)
+        moved = rect.topleft != self.rect.topleft
+        self.rect = rect
+        return moved
+
+    def to_screen(self, rect):
+        """Pasa un rect del mundo a coordenadas de pantalla."""
+        return rect.move(-self.rect.x, -self.rect.y)
+
+
+class ChunkManager:
+    """
+    Divide el mundo en chunks cuadrados de chunk_size tiles y solo mantiene cargados los cercanos.
+
+    Cada chunk cargado tiene su propia superficie de fondo, que se dibuja desde Map.tile_types la
+    primera vez que se ve. Se conservan los chunks que tocan la cámara (más un chunk de margen,
+    para no dibujarlos al borde de la pantalla) y los que están a active_radius chunks o menos
+    del jugador; el resto se descarta junto con sus Tile (ver Map.release_tiles). Así la memoria y
+    el coste de dibujo dependen del tamaño de la pantalla y no del mapa.
+
+    Esos mismos chunks forman la región activa, la que se simula en cada tick: todo lo que se ve
+    en pantalla se mueve a velocidad normal, y los enemigos de fuera solo se actualizan en los
+    ticks gruesos (ver active_mask).
+    """
+
+    def __init__(self, game_map, chunk_size, active_radius, bg_color):
+        """
+        Args:
+            game_map (Map): El mapa (tipos de tile, imágenes y tiles que cambiaron).
+            chunk_size (int): Lado de cada chunk en tiles.
+            active_radius (int): Chunks alrededor del del jugador que se mantienen activos aunque no
+                                 se vean.
+            bg_color (tuple): Color de los huecos del mapa.
+        """
+        self.map = game_map
+        self.tile_size = game_map.tile_size
+        self.chunk_size = chunk_size
+        self.chunk_pixels = chunk_size * self.tile_size
+        self.active_radius = active_radius
+        self.bg_color = bg_color
+
+        rows, cols = game_map.tile_types.shape
+        self.num_chunks = (math.ceil(cols / chunk_size), math.ceil(rows / chunk_size))  # (columnas, filas)
+        self.surfaces = {}  # (columna, fila) de chunk -> superficie de fondo
+        self.loaded = set()  # Chunks que se conservan: la región activa (ver update)
+        self.active = np.zeros(self.num_chunks[::-1], dtype=bool)  # La misma región, [fila, columna]
+        self._loaded_key = None
+
+    def chunk_of(self, position):
+        """Chunk (columna, fila) que contiene una posición en píxeles."""
+        return (math.floor(position[0] / self.chunk_pixels), math.floor(position[1] / self.chunk_pixels))
+
+    def _chunks_in(self, world_rect, margin=0):
+        """Chunks dentro del mapa que tocan un rect del mundo, ampliado margin chunks por lado."""
+        col_start, row_start = self.chunk_of(world_rect.topleft)
+        col_end, row_end = self.chunk_of((world_rect.right - 1, world_rect.bottom - 1))
+        return [(col, row)
+                for row in range(max(row_start - margin, 0), min(row_end + margin, self.num_chunks[1] - 1) + 1)
+                for col in range(max(col_start - margin, 0), min(col_end + margin, self.num_chunks[0] - 1) + 1)]
+
+    def _chunks_around(self, chunk, radius):
+        col, row = chunk
+        return [(c, r)
+                for r in range(max(row - radius, 0), min(row + radius, self.num_chunks[1] - 1) + 1)
+                for c in range(max(col - radius, 0), min(col + radius, self.num_chunks[0] - 1) + 1)]
+
+    def is_active(self, position):
+        """True si la posición está en la región activa (la del último update)."""
+        col, row = self.chunk_of(position)
+        col = min(max(col, 0), self.num_chunks[0] - 1)
+        row = min(max(row, 0), self.num_chunks[1] - 1)
+        return bool(self.active[row, col])
+
+    def active_mask(self, positions):
+        """
+        Versión vectorizada de is_active.
+
+        Args:
+            positions (np.ndarray): float (n, 2) de posiciones en píxeles (como AgentStore.positions).
+
+        Returns:
+            np.ndarray: Máscara booleana (n,) de las posiciones dentro de la región activa.
+        """
+        chunks = np.floor(positions / self.chunk_pixels).astype(np.int64)
+        cols = np.clip(chunks[:, 0], 0, self.num_chunks[0] - 1)
+        rows = np.clip(chunks[:, 1], 0, self.num_chunks[1] - 1)
+        return self.active[rows, cols]
+
+    def update(self, view_rect, center_chunk):
+        """
+        Recalcula la región activa y descarta las superficies y los Tile de los chunks que salen de ella.
+
+        Args:
+            view_rect (pygame.Rect): Zona del mundo que se ve (Camera.rect).
+            center_chunk (tuple): Chunk del jugador.
+        """
+        key = (self.chunk_of(view_rect.topleft), center_chunk)
+        if key == self._loaded_key:
+            return
+        self._loaded_key = key
+        keep = set(self._chunks_in(view_rect, margin=1))
+        keep.update(self._chunks_around(center_chunk, self.active_radius))
+        for chunk in self.loaded - keep:
+            self.surfaces.pop(chunk, None)
+            col_start, row_start = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+            self.map.release_tiles(col_start, col_start + self.chunk_size, row_start, row_start + self.chunk_size)
+        self.loaded = keep
+        self.active[:] = False
+        for col, row in keep:
+            self.active[row, col] = True
+
+    def _surface(self, chunk):
+        """Superficie de fondo de un chunk, dibujada desde los tipos de tile la primera vez."""
+        surface = self.surfaces.get(chunk)
+        if surface is None:
+            surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels)).convert()
+            surface.fill(self.bg_color)
+            col_start, row_start = chunk[0] * self.chunk_size, chunk[1] * self.chunk_size
+            tile_types = self.map.tile_types[row_start:row_start + self.chunk_size,
+                                             col_start:col_start + self.chunk_size]
+            tile_size = self.tile_size
+            blits = []
+            for row, row_types in enumerate(tile_types.tolist()):
+                for col, tile_type in enumerate(row_types):
+                    image = self.map.image_for(tile_type)
+                    if image is not None:
+                        blits.append((image, (col * tile_size, row * tile_size)))
+            surface.blits(blits, doreturn=False)
+            self.surfaces[chunk] = surface
+        return surface
+
+    def redraw_tiles(self, world_rects):
+        """Vuelve a dibujar en su chunk (si está cargado) cada tile que cambió (Map.take_dirty_rects)."""
+        for rect in world_rects:
+            surface = self.surfaces.get(self.chunk_of(rect.topleft))
+            if surface is None:
+                continue  # Se dibujará con el tipo nuevo al cargarse
+            col, row = rect.x // self.tile_size, rect.y // self.tile_size
+            local = (rect.x % self.chunk_pixels, rect.y % self.chunk_pixels)
+            image = self.map.image_for(int(self.map.tile_types[row, col]))
+            if image is None:
+                surface.fill(self.bg_color, pygame.Rect(local, rect.size))
+            else:
+                surface.blit(image, local)
+
+    def draw_area(self, screen, screen_rect, view_rect):
+        """
+        Copia el fondo de una zona de la pantalla desde las superficies de los chunks.
+
+        Args:
+            screen (pygame.Surface): La pantalla.
+            screen_rect (pygame.Rect): Zona a dibujar, en coordenadas de pantalla.
+            view_rect (pygame.Rect): Zona del mundo que se ve (Camera.rect).
+        """
+        world_rect = screen_rect.move(view_rect.topleft).clip(view_rect)
+        if not world_rect:
+            return
+        for chunk in self._chunks_in(world_rect):
+            chunk_rect = pygame.Rect(chunk[0] * self.chunk_pixels, chunk[1] * self.chunk_pixels,
+                                     self.chunk_pixels, self.chunk_pixels)
+            area = chunk_rect.clip(world_rect)
+            screen.blit(self._surface(chunk), (area.x - view_rect.x, area.y - view_rect.y),
+                        area.move(-chunk_rect.x, -chunk_rect.y))
+
+
+if __name__ == '__main__':
+    # Recorrer un mapa grande con una pantalla fija: el número de chunks cargados no crece con el mapa.
+    import os
+    import time
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    from Settings import Settings
+    from Tile import Map
+    from Map_Generator import generate_map
+
+    pygame.init()
+    settings = Settings()
+    screen = pygame.display.set_mode((40 * settings.tile_size, 24 * settings.tile_size))
+    for size in (64, 256, 1024):
+        game_map = Map(settings, generate_map('abierto', size, size, seed=0))
+        world_width, world_height = size * settings.tile_size, size * settings.tile_size
+        camera = Camera(screen.get_width(), screen.get_height(), world_width, world_height)
+        chunks = ChunkManager(game_map, 16, 2, settings.bg_color)
+        frames = 200
+        start_time = time.perf_counter()
+        for frame in range(frames):
+            position = (frame * world_width / frames, frame * world_height / frames)
+            camera.follow(position)
+            chunks.update(camera.rect, chunks.chunk_of(position))
+            chunks.draw_area(screen, screen.get_rect(), camera.rect)
+        per_frame = (time.perf_counter() - start_time) / frames
+        print(f"{size}x{size} tiles: {per_frame * 1000:.2f} ms por frame, "
+              f"{len(chunks.surfaces)} superficies de chunk cargadas")
+    pygame.quit()
@@ -1,115 +1,470 @@
 # main.py
 
-import pygame
+import time
+
+# Inicio del arranque: el informe de tiempos (ver _report_startup) cuenta desde aquí
+STARTUP_TIME = time.perf_counter()
+
+import os
+import random
 import sys
+import numpy as np
+import pygame
 from Settings import Settings
 from Player import Player
 from Enemy import Enemy
 from Tile import Map
+from Map_Format import load_map, map_from_ascii
+from Flow_Field import FlowField
 from Mapa import MAP_DATA
-from AI_Trainer import train_ia
+from Training_Orchestrator import TrainingOrchestrator, training_jobs
+from Model_Cache import ModelCache
 from Utils import show_text, d
+from Path_Cache import PATH_CACHE
+from Path_Service import PathService
+from Process_Path_Pool import ProcessPathPool
+from Learned_Policy import PolicyStep
+from Agent_Store import AgentStore
+from Spatial_Hash import SpatialHash
+from Asset_Cache import load_image
+from World_Chunks import Camera, ChunkManager
+from Profiler import Profiler
+from Replay import RunRecorder
+
+IMPORT_SECONDS = time.perf_counter() - STARTUP_TIME
 
 
 class ZeldaLikeGame:
-    def __init__(self):
+    def __init__(self, headless=None, settings=None, run_log=None, map_source=None):
+        """
+        Args:
+            headless (bool | None): Fuerza (o desactiva) el modo sin ventana; None usa settings.headless.
+            settings (Settings | None): Configuración a usar (None = la de Settings.py).
+            run_log (RunRecorder | RunReplayer | None): Grabación o repetición de la partida (ver
+                Replay.py); None graba en settings.record_file si está indicado.
+            map_source (MapFile | None): Mapa ya cargado (ver Batch_Runner.py); None = settings.map_file
+                o Mapa.MAP_DATA.
+        """
+        self.settings = settings if settings is not None else Settings()
+        if headless is not None:
+            self.settings.headless = headless
+        if self.settings.headless:
+            # El driver 'dummy' permite crear la pantalla y convertir imágenes sin abrir ventana
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
         pygame.init()
-        self.settings = Settings()
 
-        map_width_tiles = len(MAP_DATA[0])
-        map_height_tiles = len(MAP_DATA)
-        calculated_screen_width = map_width_tiles * self.settings.tile_size
-        calculated_screen_height = map_height_tiles * self.settings.tile_size
+        # Mapa binario (se abre con np.memmap, ver Map_Format.py) o el mapa en texto de Mapa.py
+        start_time = time.perf_counter()
+        if map_source is None:
+            if self.settings.map_file:
+                map_source = load_map(self.settings.map_file)
+            else:
+                map_source = map_from_ascii(MAP_DATA)
+        map_read_seconds = time.perf_counter() - start_time
+
+        # El mundo mide lo que el mapa; la pantalla, lo mismo hasta viewport_tiles (la cámara sigue
+        # al jugador por el resto del mapa)
+        self.settings.world_width = map_source.width * self.settings.tile_size
+        self.settings.world_height = map_source.height * self.settings.tile_size
+        calculated_screen_width = min(self.settings.world_width, self.settings.viewport_tiles[0] * self.settings.tile_size)
+        calculated_screen_height = min(self.settings.world_height, self.settings.viewport_tiles[1] * self.settings.tile_size)
 
-        self.screen = pygame.display.set_mode((calculated_screen_width, calculated_screen_height))
+        if self.settings.headless:
+            # Sin ventana no se dibuja nada: una pantalla mínima basta para convert()
+            self.screen = pygame.display.set_mode((1, 1))
+        else:
+            self.screen = pygame.display.set_mode((calculated_screen_width, calculated_screen_height))
         pygame.display.set_caption("Proyecto IA Zelda")
 
-        self.settings.screen_width = self.screen.get_width()
-        self.settings.screen_height = self.screen.get_height()
+        self.settings.screen_width = calculated_screen_width
+        self.settings.screen_height = calculated_screen_height
+
+        # Tiempos de cada fase del arranque, en segundos (se muestran con el primer frame)
+        self.startup_timings = {'importacion': IMPORT_SECONDS}
 
-        self.map = Map(self.settings, MAP_DATA)
+        self.map = Map(self.settings, map_source)
+        # Grabación o repetición de la partida: el reloj, la llegada de rutas y modelos y la semilla
+        # del entrenamiento pasan por aquí (ver Replay.py)
+        if run_log is None and self.settings.record_file:
+            run_log = RunRecorder(self.settings.record_file)
+        self.run_log = run_log
+        if run_log is not None:
+            run_log.start(self)
+        start_time = time.perf_counter()
+        # Las imágenes de los personajes se decodifican aquí una vez; cada instancia comparte la suya
+        load_image('jugador.png', self.settings.player_size)
+        load_image('enemigo.png', self.settings.enemy_size)
+        self.startup_timings['recursos'] = self.map.load_seconds + time.perf_counter() - start_time
+        self.startup_timings['mapa'] = map_read_seconds + self.map.build_seconds
+        PATH_CACHE.set_max_entries(self.settings.path_cache_size)
         self.clock = pygame.time.Clock()
         self.game_active = False
         self.game_over = False
         self.game_won = False
+        self.ticks = 0  # Ticks simulados (ver get_time)
+        # Tiempos por fase y por búsqueda de ruta (None = perfilado desactivado, sin coste)
+        self.profiler = Profiler(self.settings.profile_capacity) if self.settings.profile else None
 
         # Instanciar al jugador (sigue siendo uno solo)
         self.player = Player(self, self.map.player_start_pos, self.map.goal_pos)
-        self.map.all_sprites.add(self.player)
+        # Cámara y chunks del mundo: el fondo se dibuja desde los chunks cercanos y, mientras la
+        # cámara no se mueve, solo se actualizan en pantalla las zonas que cambian (ver _update_screen)
+        self.camera = Camera(self.settings.screen_width, self.settings.screen_height,
+                             self.settings.world_width, self.settings.world_height)
+        self.chunks = ChunkManager(self.map, self.settings.chunk_size, self.settings.active_chunk_radius,
+                                   self.settings.bg_color)
+        # Los personajes se dibujan aparte de los tiles, encima del fondo de los chunks
+        self.actors = pygame.sprite.Group(self.player)
+        self.drawn_rects = []  # Zonas de pantalla de los personajes dibujados en el último frame
+        self.full_redraw = True  # El primer frame copia el fondo entero
 
         # --- CAMBIO: CREAR UN GRUPO PARA LOS ENEMIGOS ---
         self.enemies_group = pygame.sprite.Group()
         # --- FIN DEL CAMBIO ---
 
+        # Pool de procesos opcional sobre una cuadrícula en memoria compartida. Cada hilo del
+        # servicio espera a un proceso, así que hacen falta al menos tantos hilos como procesos.
+        self.path_pool = None
+        num_workers = self.settings.path_workers
+        if self.settings.headless:
+            num_workers = 0  # Servicio síncrono: las rutas llegan siempre en el mismo tick
+        elif self.settings.path_processes > 0:
+            num_workers = max(num_workers, self.settings.path_processes)
+        if self.settings.path_processes > 0:
+            self.path_pool = ProcessPathPool(self.settings, self.map, self.settings.path_processes)
+
+        # Servicio de rutas con trabajadores fijos (en lugar de un hilo por replanificación)
+        self.path_service = PathService(num_workers, self.profiler)
+
+        # Entrenamiento de las IAs en un pool de procesos (ver _setup_agents)
+        model_cache = None
+        if self.settings.use_model_cache:
+            model_cache = ModelCache(self.settings.model_cache_dir, self.settings.model_cache_max_mb * 1024 * 1024)
+        self.trainer = TrainingOrchestrator(self.map.occupancy_grid, self.settings.tile_size,
+                                            self.settings.world_width, self.settings.world_height,
+                                            self.settings.training_processes, model_cache)
+
+        # Campo de flujo hacia el jugador, compartido por todos los enemigos
+        self.flow_field = FlowField(self.settings.tile_size)
+
+        # Movimiento con los modelos entrenados, todos los agentes en una sola pasada por tick
+        self.policy = PolicyStep(self, self.settings.policy_fallback_to_astar)
+        # Enemigos en arreglos con movimiento vectorizado (se crea en _setup_agents)
+        self.agent_store = None
+        # Enemigos por tile, para las colisiones y las zonas de peligro cercanas al jugador
+        self.enemy_hash = SpatialHash(self.settings.tile_size, self.settings.enemy_size)
+
         self.running = True
 
-    def run(self):
-        # 1. Fase de Entrenamiento para el JUGADOR
-        print("Iniciando el entrenamiento de la IA del JUGADOR. Por favor, espere...")
-        player_ia_model, player_scaler = train_ia(
-            self.settings.training_samples_player, self.map.get_collidable_rects(),
-            self.settings.tile_size, self.settings.screen_width, self.settings.screen_height)
-        if player_ia_model and player_scaler:
-            self.player.set_model(player_ia_model, player_scaler)
-        print("¡Entrenamiento de la IA del JUGADOR finalizado!")
-
-        # 2. Fase de Entrenamiento para el ENEMIGO (SOLO UN MODELO GENÉRICO)
-        # Entrenamos una única IA que será compartida por todos los enemigos.
-        print("Iniciando el entrenamiento de la IA del ENEMIGO. Por favor, espere...")
-        enemy_ia_model, enemy_scaler = train_ia(
-            self.settings.training_samples_enemy, self.map.get_collidable_rects(),
-            self.settings.tile_size, self.settings.screen_width, self.settings.screen_height)
-        print("¡Entrenamiento de la IA del ENEMIGO finalizado!")
+    def get_time(self):
+        """
+        Tiempo de juego en milisegundos para los intervalos de recálculo de las entidades.
+
+        Con ventana es el reloj de pygame; sin ventana se deriva de los ticks simulados (a
+        settings.fps), para que la partida no dependa de la velocidad de la máquina. Al grabar o
+        repetir una partida es el tiempo de cada tick de la grabación.
+        """
+        if self.run_log is not None:
+            return self.run_log.time(self)
+        return self.clock_time()
+
+    def clock_time(self):
+        """El reloj de get_time sin pasar por la grabación."""
+        if self.settings.headless:
+            return self.ticks * 1000 // self.settings.fps
+        return pygame.time.get_ticks()
 
+    def _setup_agents(self):
+        """
+        Crea un enemigo por cada posición de inicio y entrena las IAs del jugador y de los enemigos.
+
+        Con settings.train_in_background el entrenamiento sigue en segundo plano mientras se juega
+        (las entidades se mueven solo con A*) y los modelos se asignan al terminar (ver
+        _apply_model). Sin ventana se espera siempre, para que la partida sea reproducible.
+        """
         # --- CAMBIO: CREAR Y CONFIGURAR MÚLTIPLES ENEMIGOS ---
         # Usamos un bucle para crear un enemigo por cada posición de inicio encontrada en el mapa.
+        # La política aprendida mueve a cada enemigo por su sprite (ver PolicyStep), así que con ella
+        # los enemigos no van al registro aunque sigan el campo de flujo
+        use_agent_store = (self.settings.enemy_use_agent_store and self.settings.enemy_use_flow_field
+                           and not self.settings.use_learned_policy)
         for start_pos in self.map.enemy_start_positions:
             enemy = Enemy(self, start_pos, self.player.position)  # El objetivo inicial es el jugador
-            if enemy_ia_model and enemy_scaler:
-                enemy.set_model(enemy_ia_model, enemy_scaler)  # Le asignamos el modelo de IA compartido
-
             self.enemies_group.add(enemy)  # Añadimos el enemigo al grupo de enemigos
-            self.map.all_sprites.add(enemy)  # Y al grupo general para que se dibuje
+            if not use_agent_store:
+                self.actors.add(enemy)  # Y al grupo de personajes para que se dibuje
+                self.enemy_hash.move(enemy, enemy.position)
         # --- FIN DEL CAMBIO ---
+        if use_agent_store:
+            # El registro mueve y dibuja a los enemigos (solo los visibles) y los mantiene en la rejilla
+            self.agent_store = AgentStore(self.enemies_group.sprites(), self.settings.tile_size,
+                                          self.settings.enemy_speed, self.settings.enemy_size, self.enemy_hash)
+
+        # Una IA para el jugador y una única IA genérica compartida por todos los enemigos
+        jobs = training_jobs(self.settings)
+        seed = self.settings.training_seed
+        if seed is None:
+            seed = random.getrandbits(32)  # Sin ventana, random ya está sembrado con settings.random_seed
+        if self.run_log is not None:
+            seed = self.run_log.training_seed(seed)
+
+        if self.settings.train_in_background and not self.settings.headless:
+            print("Entrenando las IAs del JUGADOR y del ENEMIGO en segundo plano (mientras tanto, solo A*)...")
+            self.trainer.start(jobs, seed)
+        else:
+            print("Iniciando el entrenamiento de las IAs del JUGADOR y del ENEMIGO. Por favor, espere...")
+            self.trainer.run(jobs, seed, on_model_ready=self._apply_model)
+            print("¡Entrenamiento de las IAs finalizado!")
+
+    def _apply_model(self, name, model, scaler):
+        """Asigna en caliente un modelo recién entrenado a sus entidades."""
+        if model is None:
+            return
+        if self.run_log is not None and not self.run_log.accept_model(self, name, model, scaler):
+            return  # Una repetición lo aplica en el tick en que se aplicó en la grabación
+        if name == 'jugador':
+            self.player.set_model(model, scaler)
+        elif name == 'enemigo':
+            for enemy in self.enemies_group:
+                enemy.set_model(model, scaler)  # Le asignamos el modelo de IA compartido
+
+    def _timed_setup_agents(self):
+        start_time = time.perf_counter()
+        self._setup_agents()
+        self.startup_timings['agentes'] = time.perf_counter() - start_time
+
+    def _report_startup(self):
+        """Muestra cuánto tardó cada fase del arranque y el tiempo total hasta el primer frame."""
+        self.startup_timings['primer_frame'] = time.perf_counter() - STARTUP_TIME
+        timings = self.startup_timings
+        print(f"Arranque: importación {timings['importacion']:.2f} s, recursos {timings['recursos']:.3f} s, "
+              f"mapa {timings['mapa']:.3f} s, agentes {timings['agentes']:.2f} s; "
+              f"primer frame a los {timings['primer_frame']:.2f} s")
+
+    def run(self, close_on_end=False):
+        """
+        Bucle con ventana.
+
+        Args:
+            close_on_end (bool): Cerrar al ganar o perder en lugar de mostrar la pantalla final
+                                 (para grabar partidas sin nadie delante, ver Replay.record_run).
+        """
+        self._timed_setup_agents()
 
         print("Abriendo la ventana del juego...")
         self.game_active = True
         while self.running:
             self._check_events()
             if self.game_active and not self.game_over and not self.game_won:
-                self._update_elements()
-                self._check_game_state()
-                self._update_screen()
-                self.clock.tick(60)
+                self._tick(draw=True)
+                if 'primer_frame' not in self.startup_timings:
+                    self._report_startup()
+                self.clock.tick(self.settings.fps)
+            elif close_on_end:
+                self.running = False
             elif self.game_over:
                 self._update_screen_game_over()
             elif self.game_won:
                 self._update_screen_game_won()
 
+        self._shutdown()
+
+    def run_headless(self):
+        """
+        Simula una partida sin dibujar y sin límite de FPS, de forma reproducible.
+
+        Usa settings.random_seed para el entrenamiento y termina al ganar, al perder o tras
+        settings.headless_max_ticks ticks.
+
+        Returns:
+            dict: Resultado ('ganado', 'perdido' o 'sin terminar'), ticks simulados y ticks por segundo.
+        """
+        random.seed(self.settings.random_seed)
+        np.random.seed(self.settings.random_seed)
+        self._timed_setup_agents()
+        self._report_startup()  # Sin ventana, el "primer frame" es el primer tick simulado
+
+        print("Simulando la partida sin ventana...")
+        self.game_active = True
+        start_time = time.perf_counter()
+        while self.ticks < self.settings.headless_max_ticks and not self.game_over and not self.game_won:
+            self._tick(draw=False)
+        elapsed = time.perf_counter() - start_time
+
+        outcome = self._outcome()
+        result = {
+            'result': outcome,
+            'ticks': self.ticks,
+            'seconds': elapsed,
+            'ticks_per_second': self.ticks / elapsed if elapsed > 0 else 0.0,
+        }
+        print(f"Resultado: {outcome} en {self.ticks} ticks ({elapsed:.2f} s, "
+              f"{result['ticks_per_second']:.0f} ticks/s)")
+
+        self._shutdown()
+        return result
+
+    def _tick(self, draw):
+        """Un tick del bucle: simular, comprobar el estado y (con ventana) dibujar, midiendo cada fase si se perfila."""
+        profiler = self.profiler
+        if profiler is None:
+            self._update_elements()
+            self._check_game_state()
+            if draw:
+                self._update_screen()
+            return
+
+        frame_start = profiler.start()
+        phase_start = frame_start
+        self._update_elements()
+        profiler.stop('actualizar', phase_start)
+        phase_start = profiler.start()
+        self._check_game_state()
+        profiler.stop('estado', phase_start)
+        if draw:
+            phase_start = profiler.start()
+            self._update_screen()
+            profiler.stop('dibujar', phase_start)
+        profiler.stop('frame', frame_start)
+        profiler.end_frame()
+
+    def _outcome(self):
+        if self.game_won:
+            return 'ganado'
+        if self.game_over:
+            return 'perdido'
+        return 'sin terminar'
+
+    def _shutdown(self):
+        """Detiene el entrenamiento y los trabajadores de rutas y muestra las estadísticas de la caché."""
+        self.trainer.shutdown()
+        self.path_service.shutdown()
+        if self.path_pool is not None:
+            self.path_pool.close()
+        if self.run_log is not None:
+            self.run_log.finish(self, self._outcome())
+
+        if self.profiler is not None:
+            print("Perfilado (ms; nodos y longitud en tiles):")
+            for line in self.profiler.report_lines():
+                print(f"  {line}")
+            if self.settings.profile_trace_file:
+                try:
+                    self.profiler.export(self.settings.profile_trace_file)
+                    print(f"Traza de perfilado guardada en {self.settings.profile_trace_file}")
+                except OSError as error:
+                    print(f"Error: no se pudo guardar la traza de perfilado ({error}).")
+
+        cache_stats = PATH_CACHE.stats()
+        print(f"Caché de rutas: {cache_stats['hits']} aciertos, {cache_stats['subpath_hits']} aciertos por subruta, "
+              f"{cache_stats['misses']} fallos ({cache_stats['hit_rate']:.0%}), "
+              f"{cache_stats['entries']}/{cache_stats['max_entries']} entradas")
+
     def _check_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
 
     def _update_elements(self):
-        static_obstacles = self.map.get_collidable_rects()
+        self.ticks += 1
+        run_log = self.run_log
+        if run_log is not None:
+            run_log.begin_tick(self)
 
-        # --- CAMBIO: EL JUGADOR DEBE EVITAR A TODOS LOS ENEMIGOS ---
-        # Creamos una lista de zonas de peligro, una por cada enemigo.
-        dynamic_obstacles = []
-        for enemy in self.enemies_group:
-            danger_zone = enemy.rect.inflate(self.settings.tile_size * 2, self.settings.tile_size * 2)
-            dynamic_obstacles.append(danger_zone)
+        # Aplicar las rutas que los trabajadores terminaron desde el tick anterior
+        self.path_service.deliver(None if run_log is None else lambda entity: run_log.accept_path(self, entity))
+        # Y los modelos que el entrenamiento en segundo plano haya terminado
+        for name, model, scaler in self.trainer.poll():
+            self._apply_model(name, model, scaler)
 
-        # Actualizamos al jugador, que ahora conoce todos los peligros
-        self.player.update(static_obstacles, dynamic_obstacles)
+        static_obstacles = self.map.occupancy_grid
+
+        if self.settings.use_learned_policy:
+            agents = [(self.player, self.player.goal_pos, self.settings.player_speed)]
+            agents.extend((enemy, self.player.position, self.settings.enemy_speed) for enemy in self.enemies_group)
+            self.policy.step(agents, static_obstacles)
+
+        # --- CAMBIO: EL JUGADOR DEBE EVITAR A LOS ENEMIGOS ---
+        # Actualizamos al jugador, que conoce los peligros de su camino: las zonas de peligro de los
+        # enemigos solo se calculan cuando pide una ruta
+        self.player.update(static_obstacles, self._danger_zones)
         # --- FIN DEL CAMBIO ---
 
+        # Una sola BFS por cambio de tile del jugador sirve a todos los enemigos
+        if self.settings.enemy_use_flow_field:
+            self.flow_field.update(self.player.position, static_obstacles, self.map.obstacle_version())
+
+        # La cámara sigue al jugador también sin ventana: la región activa depende de lo que se ve
+        if self.camera.follow(self.player.position):
+            self.full_redraw = True
+        self.chunks.update(self.camera.rect, self.chunks.chunk_of(self.player.position))
+
         # --- CAMBIO: ACTUALIZAR TODO EL GRUPO DE ENEMIGOS ---
-        # Pygame se encarga de llamar al método .update() de cada enemigo en el grupo.
-        self.enemies_group.update(self.player.position, static_obstacles)
+        # Los enemigos de la región activa (lo que se ve y los chunks cercanos al jugador) se
+        # actualizan en cada tick. Los de fuera se ponen al día en los ticks gruesos, con todos los
+        # pasos de los ticks que se saltaron (o no se mueven, con coarse_tick_interval = 0).
+        interval = self.settings.coarse_tick_interval
+        coarse_tick = interval > 0 and self.ticks % interval == 0
+        if self.agent_store is not None:
+            active = self.chunks.active_mask(self.agent_store.positions)
+            if coarse_tick:
+                self.agent_store.step(self.flow_field, static_obstacles.shape, ~active, steps=interval)
+            self.agent_store.step(self.flow_field, static_obstacles.shape, active)
+        else:
+            for enemy in self.enemies_group:
+                if self.chunks.is_active(enemy.position):
+                    updates = 1
+                elif coarse_tick:
+                    updates = interval
+                else:
+                    continue
+                for _ in range(updates):
+                    enemy.update(self.player.position, static_obstacles)
+                self.enemy_hash.move(enemy, enemy.position)
         # --- FIN DEL CAMBIO ---
 
+        if run_log is not None:
+            run_log.end_tick(self)
+
+    def _danger_radius(self):
+        """
+        Radio (en tiles) alrededor del jugador y de los próximos nodos de su ruta dentro del cual un
+        enemigo cuenta como peligro, o None para contar a todos.
+
+        Sin settings.player_danger_radius, el radio es lo que un enemigo puede recorrer hasta que la
+        ruta se vuelva a planificar, más la mitad de su zona. Con A* el jugador sigue la ruta hasta
+        el final sin replanificar, así que cualquier enemigo puede llegar a ella: cuentan todos, y
+        la ruta esquiva lo mismo que si no hubiera filtro. Con el planificador incremental la ruta
+        se repara cada player_recalculate_path_interval: basta con los enemigos que alcanzan los
+        próximos player_danger_lookahead nodos en lo que el jugador tarda en recorrerlos más un
+        intervalo.
+        """
+        settings = self.settings
+        if settings.player_danger_radius is not None:
+            return settings.player_danger_radius
+        if not settings.player_use_incremental_planner:
+            return None
+        horizon_ticks = (settings.player_recalculate_path_interval * settings.fps / 1000
+                         + settings.player_danger_lookahead * settings.tile_size / settings.player_speed)
+        return settings.enemy_speed * horizon_ticks / settings.tile_size + 1.5
+
+    def _danger_zones(self):
+        """
+        Devuelve las zonas de peligro (rect del enemigo ampliado un tile por lado) de los enemigos
+        que están cerca del jugador o de los próximos nodos de su ruta (ver _danger_radius).
+        """
+        radius = self._danger_radius()
+        if radius is None:
+            nearby = self.enemies_group
+        else:
+            nearby = {}
+            for point in [self.player.position, *self.player.path[:self.settings.player_danger_lookahead]]:
+                for enemy in self.enemy_hash.near(point, radius):
+                    nearby[enemy] = None
+        margin = self.settings.tile_size * 2
+        return [self.enemy_hash.agent_rect(enemy).inflate(margin, margin) for enemy in nearby]
+
     def _check_game_state(self):
         if d(self.player.position, self.map.goal_pos) < self.settings.tile_size / 2:
             self.game_won = True
@@ -117,17 +472,50 @@ class ZeldaLikeGame:
             print("¡JUGADOR HA GANADO!")
 
         # --- CAMBIO: COMPROBAR COLISIÓN CON CUALQUIER ENEMIGO DEL GRUPO ---
-        # pygame.sprite.spritecollideany comprueba si un sprite (jugador) choca con alguno de un grupo.
-        if pygame.sprite.spritecollideany(self.player, self.enemies_group):
+        # La rejilla de enemigos solo mira los que están en los tiles alrededor del jugador.
+        if self.enemy_hash.colliding(self.player.rect) is not None:
             self.game_over = True
             self.game_active = False
             print("¡GAME OVER! Un enemigo te atrapó.")
         # --- FIN DEL CAMBIO ---
 
     def _update_screen(self):
-        self.screen.fill(self.settings.bg_color)
-        self.map.all_sprites.draw(self.screen)  # all_sprites ahora contiene al jugador y a todos los enemigos
-        pygame.display.flip()
+        view_rect = self.camera.rect  # La cámara y los chunks ya siguieron al jugador en _update_elements
+
+        # Tiles que cambiaron (por ejemplo, un bloque movido): primero en su chunk
+        changed_tiles = self.map.take_dirty_rects()
+        self.chunks.redraw_tiles(changed_tiles)
+
+        screen_rect = self.screen.get_rect()
+        if self.full_redraw:
+            self.chunks.draw_area(self.screen, screen_rect, view_rect)
+            dirty_rects = None
+        else:
+            # Borrar a todos los personajes con el fondo antes de dibujar ninguno
+            dirty_rects = [self.camera.to_screen(rect) for rect in changed_tiles] + self.drawn_rects
+            for rect in dirty_rects:
+                self.chunks.draw_area(self.screen, rect, view_rect)
+
+        # Con el registro de enemigos solo se dibujan los que están en pantalla
+        actors = self.actors.sprites()
+        if self.agent_store is not None:
+            self.agent_store.sync_sprites(view_rect)
+            actors.extend(self.agent_store.visible)
+        self.drawn_rects = []
+        for sprite in actors:
+            rect = self.camera.to_screen(sprite.rect)
+            if rect.colliderect(screen_rect):
+                self.screen.blit(sprite.image, rect)
+                self.drawn_rects.append(rect)
+        # Percentiles del perfilado encima de todo (se borran como un personaje más)
+        if self.settings.show_profiler and self.profiler is not None:
+            self.drawn_rects.append(self.screen.blit(self.profiler.overlay(), (0, 0)))
+
+        if dirty_rects is None:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(dirty_rects + self.drawn_rects)
 
     def _update_screen_game_over(self):
         self.screen.fill((150, 0, 0))
@@ -147,7 +535,10 @@ class ZeldaLikeGame:
 
 
 if __name__ == '__main__':
-    game = ZeldaLikeGame()
-    game.run()
+    game = ZeldaLikeGame(headless=True if '--headless' in sys.argv else None)
+    if game.settings.headless:
+        game.run_headless()
+    else:
+        game.run()
     pygame.quit()
     sys.exit()
\ No newline at end of file
@@ -0,0 +1,9 @@
+# conftest.py
+
+import os
+import sys
+
+# Los módulos del juego se importan por su nombre desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
@@ -0,0 +1,29 @@
+# test_ai_trainer.py
+
+import random
+import numpy as np
+from AI_Trainer import generate_raw_training_data, generate_raw_training_data_batch
+from Grid import build_occupancy_grid
+from Mapa import MAP_DATA
+
+TILE_SIZE = 32
+GRID = build_occupancy_grid(MAP_DATA)
+WIDTH, HEIGHT = GRID.shape[1] * TILE_SIZE, GRID.shape[0] * TILE_SIZE
+
+
+def test_seeded_generators_leave_global_state_alone():
+    """Con generadores propios, la misma semilla da los mismos datos y random/np.random no cambian."""
+    random.seed(7)
+    np.random.seed(7)
+    global_state, np_global_state = random.getstate(), np.random.get_state()[1].copy()
+
+    batches = [generate_raw_training_data_batch(5, GRID, TILE_SIZE, WIDTH, HEIGHT, samples_per_goal=20,
+                                                rng=random.Random(3), np_rng=np.random.default_rng(3))
+               for _ in range(2)]
+    searches = [generate_raw_training_data(30, GRID, TILE_SIZE, WIDTH, HEIGHT, rng=random.Random(3))
+                for _ in range(2)]
+    for (X_first, y_first), (X_second, y_second) in (batches, searches):
+        assert np.array_equal(X_first, X_second) and np.array_equal(y_first, y_second)
+
+    assert random.getstate() == global_state
+    assert np.array_equal(np.random.get_state()[1], np_global_state)
@@ -0,0 +1,27 @@
+# test_batch_runner.py
+
+from Batch_Runner import Episode, SPAWN_JITTER, load_map_spec, unique_episodes, _player_distances
+from Flow_Field import UNREACHABLE
+
+
+def test_seeds_move_the_map_enemies():
+    """Sin --enemies, cada semilla coloca a los enemigos del mapa en otros tiles libres y alcanzables."""
+    map_file = load_map_spec('base')
+    distances = _player_distances(map_file.tiles, map_file.player)
+    cols = map_file.width
+    placements = set()
+    for seed in range(5):
+        spawns = Episode('base', seed).map_source(map_file).enemies
+        assert len(spawns) == len(map_file.enemies)
+        assert len({tuple(spawn) for spawn in spawns.tolist()}) == len(spawns)
+        assert all(distances[row * cols + col] != UNREACHABLE for col, row in spawns.tolist())
+        placements.add(spawns.tobytes())
+    assert len(placements) == 5
+
+
+def test_repeated_episodes_are_played_once():
+    """Sin desplazamiento ni --enemies, las semillas dan la misma partida: solo se juega una."""
+    episodes = [Episode('base', seed, spawn_jitter=0) for seed in range(4)] + [Episode('base', 0)]
+    unique, repeated = unique_episodes(episodes)
+    assert [(episode.seed, episode.spawn_jitter) for episode in unique] == [(0, 0), (0, SPAWN_JITTER)]
+    assert repeated == 3
@@ -0,0 +1,45 @@
+# test_d_star_lite.py
+
+import random
+import numpy as np
+from A_Star_Pathfinder import IndexedAStar
+from D_Star_Lite import DStarLite
+
+
+def test_replans_match_astar_lengths():
+    """
+    500 replanificaciones al azar (10 cuadrículas de 50): tiles que se bloquean y se liberan y
+    un inicio que avanza por la ruta o salta a otro tile. Cada ruta reparada tiene la longitud de
+    un A* desde cero sobre la cuadrícula actual.
+    """
+    rng = random.Random(0)
+    rows, cols = 20, 30
+    for _ in range(10):
+        grid = (np.array([[rng.random() < 0.25 for _ in range(cols)] for _ in range(rows)])).astype(np.uint8)
+        goal = rng.randrange(rows * cols)
+        grid.flat[goal] = 0
+        planner = DStarLite(grid, goal)
+        astar = IndexedAStar(rows, cols)
+        start = rng.randrange(rows * cols)
+        path = []
+
+        for _ in range(50):
+            changes = []
+            for index in rng.sample(range(rows * cols), rng.randint(0, 6)):
+                if index != goal:
+                    grid.flat[index] ^= 1
+                    changes.append((index, bool(grid.flat[index])))
+
+            if len(path) > 1 and rng.random() < 0.8:
+                start = path[1]  # Un paso por la ruta anterior
+            else:
+                start = rng.randrange(rows * cols)
+
+            path = planner.plan(start, changes)
+            expected = astar.search(grid.ravel(), start, goal)
+            assert len(path) == len(expected)
+            # La ruta es válida: tiles vecinos y libres (salvo el inicio, como en A*)
+            for previous, current in zip(path, path[1:]):
+                assert abs(previous - current) == cols or (
+                        abs(previous - current) == 1 and previous // cols == current // cols)
+                assert not grid.flat[current]
@@ -0,0 +1,71 @@
+# test_hpa_star.py
+
+import random
+import pytest
+from A_Star_Pathfinder import IndexedAStar
+from Grid import LIBRE, pos_to_index
+from HPA_Star import HierarchicalPathfinder
+from Map_Format import map_from_ascii, occupancy_from_tiles
+from Map_Generator import generate_map, MAP_KINDS
+from Mapa import MAP_DATA
+
+TILE_SIZE = 32
+MAPS = [('base', MAP_DATA)] + [(kind, generate_map(kind, 60, 40, 1)) for kind in MAP_KINDS]
+
+
+def check_queries(hpa, astar, grid, free_tiles, rng, num_queries):
+    """
+    Compara num_queries rutas de HPA* con IndexedAStar: la misma alcanzabilidad, rutas válidas
+    tile a tile y nunca más cortas que la óptima. Devuelve las longitudes (hpa, astar) sumadas.
+    """
+    rows, cols = grid.shape
+    blocked = grid.ravel()
+    hpa_total = astar_total = 0
+    for _ in range(num_queries):
+        start, goal = rng.choice(free_tiles), rng.choice(free_tiles)
+        expected = astar.search(blocked, start, goal)
+        path = [pos_to_index(pos, TILE_SIZE, grid.shape) for pos in hpa.find_path(start, goal, TILE_SIZE)]
+        assert bool(path) == bool(expected)
+        if not path:
+            continue
+        assert path[0] == start and path[-1] == goal
+        for previous, current in zip(path, path[1:]):
+            assert abs(previous - current) == cols or (
+                    abs(previous - current) == 1 and previous // cols == current // cols)
+            assert not blocked[current]
+        assert len(path) >= len(expected)
+        hpa_total += len(path)
+        astar_total += len(expected)
+    return hpa_total, astar_total
+
+
+@pytest.mark.parametrize('name, map_data', MAPS, ids=[name for name, _ in MAPS])
+def test_hpa_paths_are_valid_and_near_optimal(name, map_data):
+    """Las rutas jerárquicas son válidas y, en conjunto, apenas más largas que las de A*."""
+    grid = occupancy_from_tiles(map_from_ascii(map_data).tiles)
+    free_tiles = [int(index) for index in (grid.ravel() == LIBRE).nonzero()[0]]
+    hpa = HierarchicalPathfinder(grid, 10)
+    astar = IndexedAStar(*grid.shape)
+
+    hpa_total, astar_total = check_queries(hpa, astar, grid, free_tiles, random.Random(0), 100)
+    assert hpa_total <= astar_total * 1.15
+
+
+def test_hpa_updates_match_full_rebuilds():
+    """Tras bloquear y liberar tiles con update_tile, el grafo es el de reconstruirlo desde cero."""
+    grid = occupancy_from_tiles(map_from_ascii(generate_map('habitaciones', 60, 40, 2)).tiles)
+    free_tiles = [int(index) for index in (grid.ravel() == LIBRE).nonzero()[0]]
+    hpa = HierarchicalPathfinder(grid, 10)
+    astar = IndexedAStar(*grid.shape)
+
+    rng = random.Random(3)
+    for _ in range(5):
+        for index in rng.sample(free_tiles, 20):
+            grid.flat[index] ^= 1
+            hpa.update_tile(index)
+        rebuilt = HierarchicalPathfinder(grid, 10)
+        assert hpa.transitions == rebuilt.transitions
+        assert hpa.intra_edges == rebuilt.intra_edges
+
+        open_tiles = [int(index) for index in (grid.ravel() == LIBRE).nonzero()[0]]
+        check_queries(hpa, astar, grid, open_tiles, rng, 40)
@@ -0,0 +1,60 @@
+# test_jump_point_search.py
+
+import random
+import numpy as np
+import pytest
+from A_Star_Pathfinder import IndexedAStar
+from Grid import LIBRE
+from Jump_Point_Search import JumpPointSearch
+from Map_Format import map_from_ascii, occupancy_from_tiles
+from Map_Generator import generate_map, MAP_KINDS
+from Mapa import MAP_DATA
+
+MAPS = [('base', MAP_DATA)] + [(kind, generate_map(kind, 40, 30, 1)) for kind in MAP_KINDS]
+
+
+def assert_valid_path(path, start, goal, blocked, cols):
+    """La ruta va de start a goal por tiles vecinos y libres (salvo el inicio, como en A*)."""
+    assert path[0] == start and path[-1] == goal
+    for previous, current in zip(path, path[1:]):
+        assert abs(previous - current) == cols or (
+                abs(previous - current) == 1 and previous // cols == current // cols)
+        assert not blocked[current]
+
+
+@pytest.mark.parametrize('name, map_data', MAPS, ids=[name for name, _ in MAPS])
+def test_jps_paths_are_as_short_as_astar(name, map_data):
+    """JPS devuelve rutas tile a tile válidas y de la misma longitud que IndexedAStar."""
+    grid = occupancy_from_tiles(map_from_ascii(map_data).tiles)
+    rows, cols = grid.shape
+    free_tiles = [int(index) for index in (grid.ravel() == LIBRE).nonzero()[0]]
+    jps = JumpPointSearch(rows, cols)
+    astar = IndexedAStar(rows, cols)
+
+    rng = random.Random(0)
+    for _ in range(100):
+        blocked = grid.ravel().copy()
+        blocked[rng.sample(free_tiles, 15)] = 1
+        start, goal = rng.choice(free_tiles), rng.choice(free_tiles)
+        expected = astar.search(blocked, start, goal)
+        path = jps.search(blocked, start, goal)
+        assert len(path) == len(expected)
+        if path:
+            assert_valid_path(path, start, goal, blocked, cols)
+
+
+def test_jps_on_random_grids():
+    """Cuadrículas al azar con muchos obstáculos sueltos, donde abundan los vecinos forzados."""
+    rng = random.Random(1)
+    rows, cols = 15, 20
+    jps = JumpPointSearch(rows, cols)
+    astar = IndexedAStar(rows, cols)
+    for _ in range(300):
+        blocked = np.array([rng.random() < 0.3 for _ in range(rows * cols)], dtype=np.uint8)
+        start, goal = rng.randrange(rows * cols), rng.randrange(rows * cols)
+        blocked[goal] = 0
+        expected = astar.search(blocked, start, goal)
+        path = jps.search(blocked, start, goal)
+        assert len(path) == len(expected)
+        if path:
+            assert_valid_path(path, start, goal, blocked, cols)
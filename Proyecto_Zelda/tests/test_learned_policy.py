@@ -0,0 +1,29 @@
+# test_learned_policy.py
+
+import os
+from Batch_Runner import load_map_spec
+from Settings import Settings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_policy_moves_enemies_with_flow_field(monkeypatch):
+    """Con el campo de flujo (y el registro de enemigos activado) la política mueve también a los enemigos."""
+    from main import ZeldaLikeGame
+
+    monkeypatch.chdir(PROJECT_DIR)  # Las imágenes se cargan desde imagenes/
+    settings = Settings()
+    settings.use_learned_policy = True
+    settings.enemy_use_flow_field = True
+    settings.enemy_use_agent_store = True
+    settings.use_model_cache = False
+    settings.training_samples_player = settings.training_samples_enemy = 40
+    settings.training_processes = 1
+    settings.headless_max_ticks = 1
+    game = ZeldaLikeGame(headless=True, settings=settings, map_source=load_map_spec('base'))
+    game.run_headless()
+
+    assert game.agent_store is None
+    assert len(game.enemies_group) > 0
+    assert all(enemy.policy_controlled or enemy.path_positions for enemy in game.enemies_group)
+    assert game.policy.moves + game.policy.blocked_moves >= 1 + len(game.enemies_group)
@@ -0,0 +1,60 @@
+# test_map_format.py
+
+import numpy as np
+import pytest
+from Map_Format import MapFile, map_from_ascii, save_map, load_map, HEADER_SIZE
+from Map_Generator import generate_map
+from Mapa import MAP_DATA
+
+MAPS = [('base', MAP_DATA), ('laberinto', generate_map('laberinto', 64, 48, 3)),
+        ('habitaciones', generate_map('habitaciones', 100, 40, 1))]
+
+
+def assert_same_map(loaded, original):
+    assert loaded.tiles.shape == original.tiles.shape
+    assert np.array_equal(loaded.tiles, original.tiles)
+    assert loaded.player == (None if original.player is None else tuple(original.player))
+    assert loaded.goal == (None if original.goal is None else tuple(original.goal))
+    assert np.array_equal(loaded.enemies, original.enemies)
+
+
+@pytest.mark.parametrize('name, map_data', MAPS, ids=[name for name, _ in MAPS])
+def test_round_trip(tmp_path, name, map_data):
+    original = map_from_ascii(map_data)
+    path = str(tmp_path / f"{name}.zmap")
+    save_map(path, original)
+    assert_same_map(load_map(path), original)
+
+
+def test_round_trip_without_player_goal_or_enemies(tmp_path):
+    original = MapFile(np.full((3, 4), ord('#'), dtype=np.uint8), None, None, [])
+    path = str(tmp_path / 'vacio.zmap')
+    save_map(path, original)
+    assert_same_map(load_map(path), original)
+
+
+def test_changes_stay_in_memory(tmp_path):
+    """Los tiles cargados son de copia en escritura: modificarlos no cambia el archivo."""
+    path = str(tmp_path / 'base.zmap')
+    save_map(path, map_from_ascii(MAP_DATA))
+    loaded = load_map(path)
+    loaded.tiles[1, 1] = ord('B')
+    assert load_map(path).tiles[1, 1] != ord('B')
+
+
+@pytest.mark.parametrize('damage', ['firma', 'version', 'truncado', 'cabecera'])
+def test_invalid_files_raise(tmp_path, damage):
+    path = tmp_path / 'base.zmap'
+    save_map(str(path), map_from_ascii(MAP_DATA))
+    data = bytearray(path.read_bytes())
+    if damage == 'firma':
+        data[:4] = b'NOPE'
+    elif damage == 'version':
+        data[4] = 99
+    elif damage == 'truncado':
+        data = data[:-3]
+    else:
+        data = data[:HEADER_SIZE - 1]
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        load_map(str(path))
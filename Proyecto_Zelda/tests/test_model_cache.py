@@ -0,0 +1,70 @@
+# test_model_cache.py
+
+import os
+import pytest
+from Model_Cache import ModelCache
+
+
+def entry_path(cache, key):
+    return os.path.join(cache.directory, f"{key}.pkl")
+
+
+def test_round_trip(tmp_path):
+    cache = ModelCache(str(tmp_path), 1 << 20)
+    assert cache.load('a') is None
+    cache.store('a', {'pesos': [1, 2, 3]}, 'escalador')
+    assert cache.load('a') == ({'pesos': [1, 2, 3]}, 'escalador')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'flip', 'header'])
+def test_corrupted_entries_are_dropped(tmp_path, damage):
+    """Un archivo truncado o con bytes cambiados es un fallo y se borra, no un error."""
+    cache = ModelCache(str(tmp_path), 1 << 20)
+    cache.store('a', list(range(100)), None)
+    path = entry_path(cache, 'a')
+    data = bytearray(open(path, 'rb').read())
+    if damage == 'truncate':
+        data = data[:len(data) // 2]
+    elif damage == 'flip':
+        data[-10] ^= 0xFF
+    else:
+        data[0] ^= 0xFF
+    with open(path, 'wb') as cache_file:
+        cache_file.write(data)
+
+    assert cache.load('a') is None
+    assert not os.path.exists(path)
+    assert cache.misses == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    """Al pasar del límite se borran las entradas usadas hace más tiempo, nunca la recién guardada."""
+    payload = bytes(1000)
+    cache = ModelCache(str(tmp_path), 2500)
+    cache.store('a', payload, None)
+    cache.store('b', payload, None)
+    # Fechas explícitas: 'a' se usó después que 'b'
+    os.utime(entry_path(cache, 'b'), (1, 1))
+    os.utime(entry_path(cache, 'a'), (2, 2))
+
+    cache.store('c', payload, None)
+    assert not os.path.exists(entry_path(cache, 'b'))
+    assert cache.load('a') is not None and cache.load('c') is not None
+
+    # Una entrada más grande que el límite se guarda igual (es la que se acaba de pedir)
+    cache.store('grande', bytes(5000), None)
+    assert os.listdir(tmp_path) == ['grande.pkl']
+
+
+def test_hit_survives_failed_touch(tmp_path, monkeypatch):
+    """Si no se puede actualizar la fecha de uso, el modelo cargado sigue siendo un acierto."""
+    cache = ModelCache(str(tmp_path), 1 << 20)
+    cache.store('a', 'modelo', 'escalador')
+
+    def failing_utime(path, *args, **kwargs):
+        raise PermissionError(path)
+
+    monkeypatch.setattr(os, 'utime', failing_utime)
+    assert cache.load('a') == ('modelo', 'escalador')
+    assert cache.hits == 1
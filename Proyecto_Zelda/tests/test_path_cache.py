@@ -0,0 +1,49 @@
+# test_path_cache.py
+
+import os
+import numpy as np
+import pytest
+from Grid import LIBRE, hash_tiles
+from Mapa import MAP_DATA
+from Settings import Settings
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def make_map(monkeypatch):
+    """Crea mapas como los de una partida (las imágenes se cargan desde la carpeta del proyecto)."""
+    import pygame
+    from Tile import Map
+
+    monkeypatch.chdir(PROJECT_DIR)
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    return lambda map_data, **overrides: Map(_settings(**overrides), map_data)
+
+
+def _settings(**overrides):
+    settings = Settings()
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    return settings
+
+
+def test_obstacle_version_depends_only_on_content(make_map):
+    """Dos partidas sobre el mismo mapa comparten versión; un tile distinto o otro motor, no."""
+    first, second = make_map(MAP_DATA), make_map(MAP_DATA)
+    assert first.obstacle_version() == second.obstacle_version()
+    assert make_map(MAP_DATA, pathfinding_engine='jps').obstacle_version() != first.obstacle_version()
+
+    row, col = np.argwhere(first.occupancy_grid == LIBRE)[0].tolist()
+    original = first.obstacle_version()
+    first.set_tile_blocked(col, row, True)
+    assert first.obstacle_version() != original
+    first.set_tile_blocked(col, row, False)
+    assert first.obstacle_version() == original
+
+
+def test_overlay_hash_ignores_order():
+    """La clave de las zonas de peligro solo depende de qué tiles cubren."""
+    assert hash_tiles({5, 40, 7}) == hash_tiles([40, 7, 5])
+    assert hash_tiles({5, 40, 7}) != hash_tiles({5, 40})
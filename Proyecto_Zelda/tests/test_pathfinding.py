@@ -0,0 +1,40 @@
+# test_pathfinding.py
+
+import random
+import pytest
+from A_Star_Pathfinder import get_path_classic, get_path_indexed
+from Grid import LIBRE
+from Map_Format import map_from_ascii, occupancy_from_tiles
+from Map_Generator import generate_map, MAP_KINDS
+from Mapa import MAP_DATA
+
+
+class MockSettings:
+    def __init__(self):
+        self.tile_size = 32
+
+
+class MockGame:
+    def __init__(self):
+        self.settings = MockSettings()
+
+
+MAPS = [('base', MAP_DATA)] + [(kind, generate_map(kind, 40, 30, 1)) for kind in MAP_KINDS]
+
+
+@pytest.mark.parametrize('name, map_data', MAPS, ids=[name for name, _ in MAPS])
+def test_indexed_engine_returns_the_classic_routes(name, map_data):
+    """'indices' no solo encuentra rutas igual de largas: pasa por los mismos tiles que 'clasico'."""
+    game = MockGame()
+    tile_size = game.settings.tile_size
+    static_grid = occupancy_from_tiles(map_from_ascii(map_data).tiles)
+    free_tiles = [(int(col) * tile_size, int(row) * tile_size) for row, col in zip(*(static_grid == LIBRE).nonzero())]
+
+    rng = random.Random(0)
+    for _ in range(100):
+        # Zonas de peligro al azar, como las que el jugador estampa sobre los muros
+        grid = static_grid.copy()
+        for x, y in rng.sample(free_tiles, 15):
+            grid[y // tile_size, x // tile_size] = 1
+        start_pos, end_pos = rng.choice(free_tiles), rng.choice(free_tiles)
+        assert get_path_indexed(game, start_pos, end_pos, grid) == get_path_classic(game, start_pos, end_pos, grid)
@@ -0,0 +1,44 @@
+# test_player.py
+
+import os
+import pytest
+from Batch_Runner import load_map_spec, with_enemy_count
+from Settings import Settings
+from Utils import snap_to_grid
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def play_without_enemies(incremental):
+    """Juega el mapa incluido sin enemigos y devuelve el resultado y los tiles que pisó el jugador."""
+    from main import ZeldaLikeGame
+
+    settings = Settings()
+    settings.player_use_incremental_planner = incremental
+    # Los modelos no mueven al jugador (sin use_learned_policy): basta con entrenarlos poco
+    settings.use_model_cache = False
+    settings.training_samples_player = settings.training_samples_enemy = 40
+    settings.training_processes = 1
+    game = ZeldaLikeGame(headless=True, settings=settings,
+                         map_source=with_enemy_count(load_map_spec('base'), 0, seed=0))
+    visited = []  # Tiles del jugador, sin repetir consecutivos
+    tick = game._tick
+
+    def tick_and_track(draw):
+        tick(draw)
+        tile = snap_to_grid(game.player.position, game.settings.tile_size)
+        if not visited or visited[-1] != tile:
+            visited.append(tile)
+
+    game._tick = tick_and_track
+    return game.run_headless(), visited
+
+
+@pytest.mark.parametrize('incremental', [False, True], ids=['astar', 'incremental'])
+def test_refreshed_routes_never_step_back(incremental, monkeypatch):
+    """Con las rutas refrescadas a mitad de camino, el jugador nunca vuelve al tile que acaba de dejar."""
+    monkeypatch.chdir(PROJECT_DIR)  # Las imágenes se cargan desde imagenes/
+    result, visited = play_without_enemies(incremental)
+    assert result['result'] == 'ganado'
+    reversals = [visited[i - 1] for i in range(2, len(visited)) if visited[i] == visited[i - 2]]
+    assert reversals == []
@@ -0,0 +1,61 @@
+# test_process_path_pool.py
+
+import numpy as np
+import pytest
+from Path_Cache import PATH_CACHE
+from Process_Path_Pool import ProcessPathPool
+
+
+class MockSettings:
+    def __init__(self):
+        self.tile_size = 32
+        self.pathfinding_engine = 'indices'
+        self.use_path_cache = True
+
+
+class MockMap:
+    def __init__(self):
+        self.occupancy_grid = np.zeros((5, 8), dtype=np.uint8)
+        self.tile_change_log = []
+
+    def set_tile_blocked(self, index, blocked):
+        self.occupancy_grid.flat[index] = blocked
+        self.tile_change_log.append((index, blocked))
+
+
+@pytest.fixture
+def pool_and_map():
+    game_map = MockMap()
+    path_pool = ProcessPathPool(MockSettings(), game_map, 2)
+    PATH_CACHE.clear()
+    yield path_pool, game_map
+    path_pool.close()
+    PATH_CACHE.clear()
+
+
+def test_searches_see_map_changes(pool_and_map):
+    """Un muro que aparece en el mapa llega a la cuadrícula compartida antes de la búsqueda."""
+    path_pool, game_map = pool_and_map
+    start, goal = (0, 64), (7 * 32, 64)
+    assert len(path_pool.get_path(start, goal)) == 8
+
+    for row in range(4):  # Muro en la columna 3 con un hueco en la última fila
+        game_map.set_tile_blocked(row * 8 + 3, True)
+    path = path_pool.get_path(start, goal, overlay_tiles={4 * 8 + 5})
+    assert len(path) == 12
+    assert (3 * 32, 4 * 32) in path and (5 * 32, 4 * 32) not in path
+    assert path_pool.active_searches == 0
+
+
+def test_results_for_stale_versions_are_not_cached(pool_and_map):
+    """Si el mapa cambió después de tomar la versión, la ruta no se guarda con esa versión."""
+    path_pool, game_map = pool_and_map
+    start, goal = (0, 0), (7 * 32, 0)
+    stale_position = len(game_map.tile_change_log)
+    game_map.set_tile_blocked(3, True)
+
+    path_pool.get_path(start, goal, version='vieja', log_position=stale_position)
+    assert PATH_CACHE.get(start, goal, 'vieja') is None
+
+    path = path_pool.get_path(start, goal, version='nueva', log_position=len(game_map.tile_change_log))
+    assert PATH_CACHE.get(start, goal, 'nueva') == tuple(path)
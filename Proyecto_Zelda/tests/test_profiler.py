@@ -0,0 +1,59 @@
+# test_profiler.py
+
+import csv
+import json
+import pytest
+from Profiler import Profiler, RingCounter, TRACE_FIELDS
+
+
+def test_ring_counter_keeps_the_last_samples():
+    counter = RingCounter(4)
+    for value in range(10):
+        counter.add(value)
+    summary = counter.summary()
+    assert summary['n'] == 10 and summary['total'] == sum(range(10))
+    assert summary['max'] == 9 and summary['p50'] == 7.5  # Solo quedan 6, 7, 8 y 9
+    assert RingCounter(4).summary()['n'] == 0
+
+
+def profile_two_frames(trace_capacity=None):
+    profiler = Profiler(capacity=8, trace_capacity=trace_capacity)
+    profiler.begin_request(2.5)
+    profiler.record_path('indices', profiler.start(), [(0, 0), (32, 0)], 3)
+    profiler.end_frame()
+    profiler.record_path('dstar', profiler.start(), [], None, cache_hit=True)
+    profiler.add('logica', 1.0)
+    profiler.end_frame()
+    return profiler
+
+
+def test_export_json(tmp_path):
+    path = str(tmp_path / 'traza.json')
+    profile_two_frames().export(path)
+    with open(path, encoding='utf-8') as trace_input:
+        data = json.load(trace_input)
+
+    assert data['frames'] == 2
+    first, second = data['busquedas']
+    assert set(first) == set(TRACE_FIELDS)
+    assert (first['frame'], first['motor'], first['espera_cola_ms'], first['nodos_expandidos'], first['longitud'],
+            first['exito'], first['cache']) == (0, 'indices', 2.5, 3, 2, True, False)
+    # La espera en cola es de la petición, no de cada búsqueda del hilo
+    assert (second['frame'], second['espera_cola_ms'], second['exito'], second['cache']) == (1, None, False, True)
+    assert data['resumen']['logica']['n'] == 1 and data['resumen']['get_path']['n'] == 2
+
+
+def test_export_csv(tmp_path):
+    path = str(tmp_path / 'traza.csv')
+    profile_two_frames(trace_capacity=1).export(path)
+    with open(path, newline='', encoding='utf-8') as trace_input:
+        rows = list(csv.reader(trace_input))
+    assert rows[0] == list(TRACE_FIELDS)
+    assert len(rows) == 2 and rows[1][1] == 'dstar'  # La traza acotada guarda solo la última búsqueda
+
+    with open(tmp_path / 'traza.resumen.csv', newline='', encoding='utf-8') as summary_input:
+        summary_rows = list(csv.reader(summary_input))
+    assert summary_rows[0] == ['metrica', 'n', 'total', 'p50', 'p95', 'p99', 'max']
+    assert [row[0] for row in summary_rows[1:]] == ['cola_rutas', 'get_path', 'logica', 'longitud_ruta',
+                                                    'nodos_expandidos']
+    assert pytest.approx(float(summary_rows[4][2])) == 2.0  # Longitudes 2 y 0
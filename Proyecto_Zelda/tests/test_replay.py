@@ -0,0 +1,73 @@
+# test_replay.py
+
+import json
+import os
+import numpy as np
+import pytest
+from Batch_Runner import load_map_spec, with_enemy_count
+from Map_Format import save_map
+from Replay import record_run, replay_run
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def recording(tmp_path_factory):
+    """Una partida corta grabada sin ventana en el mapa incluido, con tres enemigos."""
+    directory = tmp_path_factory.mktemp('replays')
+    map_path = str(directory / 'base.zmap')
+    save_map(map_path, with_enemy_count(load_map_spec('base'), 3, seed=0))
+    path = str(directory / 'partida.npz')
+    current_directory = os.getcwd()
+    os.chdir(PROJECT_DIR)  # Las imágenes se cargan desde la carpeta del proyecto
+    try:
+        record_run(path, map_path, {'headless_max_ticks': 300, 'use_model_cache': False, 'training_processes': 1,
+                                    'training_samples_player': 40, 'training_samples_enemy': 40})
+    finally:
+        os.chdir(current_directory)
+    return path
+
+
+def rewrite(path, target, **changes):
+    """Copia una grabación a target cambiando algunos de sus arreglos o de sus metadatos."""
+    with np.load(path) as replay_input:
+        arrays = dict(replay_input)
+    meta = json.loads(arrays['meta'].tobytes().decode('utf-8'))
+    meta.update(changes.pop('meta', {}))
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    arrays.update(changes)
+    np.savez_compressed(target, **arrays)
+    return str(target)
+
+
+def test_replay_matches_recording(recording, monkeypatch):
+    monkeypatch.chdir(PROJECT_DIR)
+    report = replay_run(recording)
+    assert report['matches'], report
+    assert report['first_divergence'] is None and report['model_mismatches'] == []
+
+
+def test_replay_reports_first_divergent_tick(recording, tmp_path, monkeypatch):
+    """Si las posiciones grabadas de un tick no coinciden, la repetición dice cuál es el primero."""
+    with np.load(recording) as replay_input:
+        checksums = replay_input['checksums'].copy()
+    checksums[120] ^= 1
+    checksums[200] ^= 1
+    perturbed = rewrite(recording, tmp_path / 'perturbada.npz', checksums=checksums)
+
+    monkeypatch.chdir(PROJECT_DIR)
+    report = replay_run(perturbed)
+    assert not report['matches']
+    assert report['first_divergence'] == 120
+
+
+def test_replay_reports_model_mismatches(recording, tmp_path, monkeypatch):
+    with np.load(recording) as replay_input:
+        meta = json.loads(replay_input['meta'].tobytes().decode('utf-8'))
+    fingerprints = dict(meta['model_fingerprints'], jugador='0' * 16)
+    perturbed = rewrite(recording, tmp_path / 'otro_modelo.npz', meta={'model_fingerprints': fingerprints})
+
+    monkeypatch.chdir(PROJECT_DIR)
+    report = replay_run(perturbed)
+    assert not report['matches']
+    assert report['model_mismatches'] == ['jugador']
@@ -0,0 +1,28 @@
+# test_spatial_hash.py
+
+import math
+import random
+import numpy as np
+import pytest
+from Spatial_Hash import SpatialHash
+
+
+class Agent:
+    def __init__(self, position):
+        self.position = np.array(position, dtype=float)
+
+
+@pytest.mark.parametrize('radius', [0.5, 3, 40])
+def test_near_matches_brute_force(radius):
+    """Con radios pequeños se buscan las celdas del cuadrado y con grandes las ocupadas: el resultado es el mismo."""
+    rng = random.Random(0)
+    spatial_hash = SpatialHash(32, (32, 32))
+    agents = [Agent((rng.uniform(0, 1920), rng.uniform(0, 960))) for _ in range(50)]
+    for agent in agents:
+        spatial_hash.move(agent, agent.position)
+
+    for _ in range(50):
+        point = (rng.uniform(-100, 2000), rng.uniform(-100, 1000))
+        expected = {agent for agent in agents
+                    if math.dist(agent.position, point) <= radius * 32}
+        assert set(spatial_hash.near(point, radius)) == expected
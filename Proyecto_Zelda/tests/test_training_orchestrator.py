@@ -0,0 +1,31 @@
+# test_training_orchestrator.py
+
+import random
+from AI_Trainer import pick_training_goals
+from Grid import build_occupancy_grid
+from Mapa import MAP_DATA
+from Training_Orchestrator import TrainingJob, TrainingOrchestrator
+
+TILE_SIZE = 32
+GRID = build_occupancy_grid(MAP_DATA)
+WIDTH, HEIGHT = GRID.shape[1] * TILE_SIZE, GRID.shape[0] * TILE_SIZE
+
+
+def test_shards_get_disjoint_slices_of_one_goal_list():
+    """Las metas se eligen una vez por trabajo y cada proceso etiqueta un tramo distinto."""
+    job = TrainingJob('jugador', 600, 20)
+    expected = pick_training_goals(20, GRID, TILE_SIZE, WIDTH, HEIGHT, random.Random(5))
+    for num_processes in (1, 3, 4):
+        orchestrator = TrainingOrchestrator(GRID, TILE_SIZE, WIDTH, HEIGHT, num_processes)
+        shards = orchestrator.plan_shards(job, random.Random(5))
+        assert len(shards) == num_processes
+        goals = [goal for _, shard_goals in shards for goal in shard_goals]
+        assert goals == expected and len(set(goals)) == len(goals)
+        assert [samples for samples, _ in shards] == [len(shard_goals) * 30 for _, shard_goals in shards]
+
+
+def test_search_mode_splits_samples():
+    """Sin metas (un A* por muestra), cada parte genera su parte de las muestras."""
+    orchestrator = TrainingOrchestrator(GRID, TILE_SIZE, WIDTH, HEIGHT, 3)
+    assert orchestrator.plan_shards(TrainingJob('enemigo', 100), random.Random(0)) == [(34, None), (33, None),
+                                                                                         (33, None)]